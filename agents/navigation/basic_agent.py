@@ -27,7 +27,7 @@ class BasicAgent(object):
     as well as to change its parameters in case a different driving mode is desired.
     """
 
-    def __init__(self, vehicle, target_speed=20, opt_dict={}, map_inst=None, grp_inst=None):
+    def __init__(self, vehicle, target_speed=20, opt_dict={}, map_inst=None, grp_inst=None, world_state=None):
         """
         Initialization the agent paramters, the local and the global planner.
 
@@ -37,10 +37,13 @@ class BasicAgent(object):
                 This also applies to parameters related to the LocalPlanner.
             :param map_inst: carla.Map instance to avoid the expensive call of getting it.
             :param grp_inst: GlobalRoutePlanner instance to avoid the expensive call of getting it.
+            :param world_state: per tick state of the world (actor lists by type, transforms and
+                velocities from the snapshot) to avoid fetching the actors on every step.
 
         """
         self._vehicle = vehicle
         self._world = self._vehicle.get_world()
+        self._world_state = world_state
         if map_inst:
             if isinstance(map_inst, carla.Map):
                 self._map = map_inst
@@ -191,9 +194,9 @@ class BasicAgent(object):
         hazard_detected = False
 
         # Retrieve all relevant actors
-        vehicle_list = self._world.get_actors().filter("*vehicle*")
+        vehicle_list = self._get_vehicles()
 
-        vehicle_speed = get_speed(self._vehicle) / 3.6
+        vehicle_speed = self._get_speed(self._vehicle) / 3.6
 
         # Check for possible vehicle obstacles
         max_vehicle_distance = self._base_vehicle_threshold + self._speed_ratio * vehicle_speed
@@ -203,7 +206,8 @@ class BasicAgent(object):
 
         # Check if the vehicle is affected by a red traffic light
         max_tlight_distance = self._base_tlight_threshold + self._speed_ratio * vehicle_speed
-        affected_by_tlight, _ = self._affected_by_traffic_light(self._lights_list, max_tlight_distance)
+        lights_list = self._world_state.traffic_lights if self._world_state is not None else self._lights_list
+        affected_by_tlight, _ = self._affected_by_traffic_light(lights_list, max_tlight_distance)
         if affected_by_tlight:
             hazard_detected = True
 
@@ -233,6 +237,40 @@ class BasicAgent(object):
         """Sets an offset for the vehicle"""
         self._local_planner.set_offset(offset)
 
+    def _get_vehicles(self):
+        """Returns all vehicles of the world, taken from the world state if available"""
+        if self._world_state is not None:
+            return self._world_state.vehicles
+        return self._world.get_actors().filter("*vehicle*")
+
+    def _get_walkers(self):
+        """Returns all pedestrians of the world, taken from the world state if available"""
+        if self._world_state is not None:
+            return self._world_state.walkers
+        return self._world.get_actors().filter("*walker.pedestrian*")
+
+    def _get_traffic_lights(self):
+        """Returns all traffic lights of the world, taken from the world state if available"""
+        if self._world_state is not None:
+            return self._world_state.traffic_lights
+        return self._world.get_actors().filter("*traffic_light*")
+
+    def _get_transform(self, actor):
+        if self._world_state is not None:
+            return self._world_state.transform(actor)
+        return actor.get_transform()
+
+    def _get_location(self, actor):
+        if self._world_state is not None:
+            return self._world_state.location(actor)
+        return actor.get_location()
+
+    def _get_speed(self, actor):
+        """Speed of the actor in Km/h"""
+        if self._world_state is not None:
+            return self._world_state.speed(actor)
+        return get_speed(actor)
+
     def lane_change(self, direction, same_lane_time=0, other_lane_time=0, lane_change_time=2):
         """
         Changes the path so that the vehicle performs a lane change.
@@ -268,7 +306,7 @@ class BasicAgent(object):
             return (False, None)
 
         if not lights_list:
-            lights_list = self._world.get_actors().filter("*traffic_light*")
+            lights_list = self._get_traffic_lights()
 
         if not max_distance:
             max_distance = self._base_tlight_threshold
@@ -279,7 +317,7 @@ class BasicAgent(object):
             else:
                 return (True, self._last_traffic_light)
 
-        ego_vehicle_location = self._vehicle.get_location()
+        ego_vehicle_location = self._get_location(self._vehicle)
         ego_vehicle_waypoint = self._map.get_waypoint(ego_vehicle_location)
 
         for traffic_light in lights_list:
@@ -306,7 +344,7 @@ class BasicAgent(object):
             if traffic_light.state != carla.TrafficLightState.Red:
                 continue
 
-            if is_within_distance(trigger_wp.transform, self._vehicle.get_transform(), max_distance, [0, 90]):
+            if is_within_distance(trigger_wp.transform, self._get_transform(self._vehicle), max_distance, [0, 90]):
                 self._last_traffic_light = traffic_light
                 return (True, traffic_light)
 
@@ -350,12 +388,12 @@ class BasicAgent(object):
             return (False, None, -1)
 
         if not vehicle_list:
-            vehicle_list = self._world.get_actors().filter("*vehicle*")
+            vehicle_list = self._get_vehicles()
 
         if not max_distance:
             max_distance = self._base_vehicle_threshold
 
-        ego_transform = self._vehicle.get_transform()
+        ego_transform = self._get_transform(self._vehicle)
         ego_location = ego_transform.location
         ego_wpt = self._map.get_waypoint(ego_location)
 
@@ -378,7 +416,7 @@ class BasicAgent(object):
             if target_vehicle.id == self._vehicle.id:
                 continue
 
-            target_transform = target_vehicle.get_transform()
+            target_transform = self._get_transform(target_vehicle)
             if target_transform.location.distance(ego_location) > max_distance:
                 continue
 
@@ -388,12 +426,12 @@ class BasicAgent(object):
             if (use_bbs or target_wpt.is_junction) and route_polygon:
 
                 target_bb = target_vehicle.bounding_box
-                target_vertices = target_bb.get_world_vertices(target_vehicle.get_transform())
+                target_vertices = target_bb.get_world_vertices(self._get_transform(target_vehicle))
                 target_list = [[v.x, v.y, v.z] for v in target_vertices]
                 target_polygon = Polygon(target_list)
 
                 if route_polygon.intersects(target_polygon):
-                    return (True, target_vehicle, compute_distance(target_vehicle.get_location(), ego_location))
+                    return (True, target_vehicle, compute_distance(self._get_location(target_vehicle), ego_location))
 
             # Simplified approach, using only the plan waypoints (similar to TM)
             else:
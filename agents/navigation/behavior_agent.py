@@ -30,15 +30,16 @@ class BehaviorAgent(BasicAgent):
     are encoded in the agent, from cautious to a more aggressive ones.
     """
 
-    def __init__(self, vehicle, behavior='normal', opt_dict={}, map_inst=None, grp_inst=None):
+    def __init__(self, vehicle, behavior='normal', opt_dict={}, map_inst=None, grp_inst=None, world_state=None):
         """
         Constructor method.
 
             :param vehicle: actor to apply to local planner logic onto
             :param behavior: type of agent to apply
+            :param world_state: per tick state of the world, see BasicAgent
         """
 
-        super().__init__(vehicle, opt_dict=opt_dict, map_inst=map_inst, grp_inst=grp_inst)
+        super().__init__(vehicle, opt_dict=opt_dict, map_inst=map_inst, grp_inst=grp_inst, world_state=world_state)
         self._look_ahead_steps = 0
 
         # Vehicle information
@@ -66,7 +67,7 @@ class BehaviorAgent(BasicAgent):
         This method updates the information regarding the ego
         vehicle based on the surrounding world.
         """
-        self._speed = get_speed(self._vehicle)
+        self._speed = self._get_speed(self._vehicle)
         self._speed_limit = self._vehicle.get_speed_limit()
         self._local_planner.set_speed(self._speed_limit)
         self._direction = self._local_planner.target_road_option
@@ -84,8 +85,7 @@ class BehaviorAgent(BasicAgent):
         """
         This method is in charge of behaviors for red lights.
         """
-        actor_list = self._world.get_actors()
-        lights_list = actor_list.filter("*traffic_light*")
+        lights_list = self._get_traffic_lights()
         affected, _ = self._affected_by_traffic_light(lights_list)
 
         return affected
@@ -107,7 +107,7 @@ class BehaviorAgent(BasicAgent):
 
         behind_vehicle_state, behind_vehicle, _ = self._vehicle_obstacle_detected(vehicle_list, max(
             self._behavior.min_proximity_threshold, self._speed_limit / 2), up_angle_th=180, low_angle_th=160)
-        if behind_vehicle_state and self._speed < get_speed(behind_vehicle):
+        if behind_vehicle_state and self._speed < self._get_speed(behind_vehicle):
             if (right_turn == carla.LaneChange.Right or right_turn ==
                     carla.LaneChange.Both) and waypoint.lane_id * right_wpt.lane_id > 0 and right_wpt.lane_type == carla.LaneType.Driving:
                 new_vehicle_state, _, _ = self._vehicle_obstacle_detected(vehicle_list, max(
@@ -140,8 +140,8 @@ class BehaviorAgent(BasicAgent):
             :return distance: distance to nearby vehicle
         """
 
-        vehicle_list = self._world.get_actors().filter("*vehicle*")
-        def dist(v): return v.get_location().distance(waypoint.transform.location)
+        vehicle_list = self._get_vehicles()
+        def dist(v): return self._get_location(v).distance(waypoint.transform.location)
         vehicle_list = [v for v in vehicle_list if dist(v) < 45 and v.id != self._vehicle.id]
 
         if self._direction == RoadOption.CHANGELANELEFT:
@@ -177,8 +177,8 @@ class BehaviorAgent(BasicAgent):
             :return distance: distance to nearby walker
         """
 
-        walker_list = self._world.get_actors().filter("*walker.pedestrian*")
-        def dist(w): return w.get_location().distance(waypoint.transform.location)
+        walker_list = self._get_walkers()
+        def dist(w): return self._get_location(w).distance(waypoint.transform.location)
         walker_list = [w for w in walker_list if dist(w) < 10]
 
         if self._direction == RoadOption.CHANGELANELEFT:
@@ -204,7 +204,7 @@ class BehaviorAgent(BasicAgent):
             :return control: carla.VehicleControl
         """
 
-        vehicle_speed = get_speed(vehicle)
+        vehicle_speed = self._get_speed(vehicle)
         delta_v = max(1, (self._speed - vehicle_speed) / 3.6)
         ttc = distance / delta_v if delta_v != 0 else distance / np.nextafter(0., 1.)
 
@@ -249,7 +249,7 @@ class BehaviorAgent(BasicAgent):
         if self._behavior.tailgate_counter > 0:
             self._behavior.tailgate_counter -= 1
 
-        ego_vehicle_loc = self._vehicle.get_location()
+        ego_vehicle_loc = self._get_location(self._vehicle)
         ego_vehicle_wp = self._map.get_waypoint(ego_vehicle_loc)
 
         # 1: Red lights and stops behavior
@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from carla_kickstart.sensors.frames import SurfacePool, bgra_view, rgb_view
+
+# Compares the camera frame conversion before and after the surface pool,
+# no Carla server or display needed
+#
+#   python benchmarks/camera_frames.py --width 1280 --height 720 --frames 200
+#
+# numpy allocations are measured with tracemalloc, pygame surfaces are allocated
+# by SDL and are therefore counted separately (surfaces created per frame)
+
+def make_images(width, height, count):
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        raw = rng.integers(0, 256, size = width * height * 4, dtype = np.uint8).tobytes()
+        images.append(SimpleNamespace(raw_data = memoryview(raw), width = width, height = height))
+    return images
+
+class Legacy(object):
+    """
+    The conversion as it was done in CameraSensor._camera_callback and CameraManager._parse_image
+    """
+
+    def convert(self, image):
+        array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
+        array = np.reshape(array, (image.height, image.width, 4))
+        array = array[:, :, :3]
+        array = array[:, :, ::-1]
+        self.last_frame = array
+        self.surface = pygame.surfarray.make_surface(array.swapaxes(0, 1))
+        # make_surface allocates a new surface every frame
+        return 1
+
+class Pooled(object):
+
+    def __init__(self):
+        self.surface_pool = SurfacePool()
+
+    def convert(self, image):
+        bgra = bgra_view(image)
+        self.last_frame = rgb_view(bgra)
+        allocations = self.surface_pool.allocations
+        self.surface = self.surface_pool.blit(bgra)
+        return (self.surface_pool.allocations - allocations) * self.surface_pool.count
+
+def run(converter, images, frames):
+    # warm up (allocates the pool)
+    for image in images:
+        converter.convert(image)
+
+    created = 0
+    start = time.perf_counter()
+    for i in range(frames):
+        created += converter.convert(images[i % len(images)])
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peaks = []
+    for i in range(min(frames, 50)):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        converter.convert(images[i % len(images)])
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    return {
+        "ms": 1000.0 * elapsed / frames,
+        "alloc_kb": sum(peaks) / len(peaks) / 1024.0,
+        "surfaces": created / frames
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the camera frame conversion")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    images = make_images(args.width, args.height, 4)
+    frame_kb = args.width * args.height * 4 / 1024.0
+    print(f"{args.width}x{args.height} BGRA frames ({frame_kb:.0f} kB), {args.frames} frames")
+    print('%-8s %10s %18s %18s' % ('', 'ms/frame', 'numpy kB/frame', 'surfaces/frame'))
+    for name, converter in (("before", Legacy()), ("after", Pooled())):
+        r = run(converter, images, args.frames)
+        print('%-8s %10.3f %18.1f %18.2f' % (name, r["ms"], r["alloc_kb"], r["surfaces"]))
@@ -0,0 +1,145 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from carla_kickstart.sensors.object_detection import postprocess_yolo
+
+# Compares the YOLO post-processing of ObjectDetectionSensor before and after vectorization
+# and checks that the vectorized version matches a per-row reference on the same outputs.
+# The output is not the same as before: the previous groupRectangles dropped boxes without
+# a neighbor and averaged overlapping ones, the NMS keeps single boxes and returns the best
+# scoring box of a cluster. Where groupRectangles is available the frames whose detections
+# changed are counted. tests/test_detection_postprocess.py checks the expected detections
+# on recorded outputs (tests/fixtures/yolo_outputs.npz)
+#
+#   python benchmarks/detection_postprocess.py --frames 50
+#   python benchmarks/detection_postprocess.py --fixtures outputs.npz
+#
+# Without --fixtures, YOLOv3 shaped outputs (3 heads, 85 columns) with clusters of
+# overlapping boxes are generated from a fixed seed. A fixture file holds the recorded
+# outputs of net.forward() as arrays named frame<i>_out<j>
+
+WIDTH = 320
+HEIGHT = 320
+SCORE_THRESHOLD = 0.5
+NMS_THRESHOLD = 0.4
+NUM_CLASSES = 80
+
+def generate_outputs(rng, objects = 8):
+    outs = []
+    for grid in (WIDTH // 32, WIDTH // 16, WIDTH // 8):
+        out = np.zeros((grid * grid * 3, 5 + NUM_CLASSES), dtype=np.float32)
+        out[:, :4] = rng.uniform(0.0, 1.0, size=(len(out), 4)) * (1.0, 1.0, 0.3, 0.3)
+        out[:, 5:] = rng.uniform(0.0, 0.05, size=(len(out), NUM_CLASSES))
+        for _ in range(objects):
+            rows = rng.choice(len(out), size=rng.integers(3, 12), replace=False)
+            box = rng.uniform((0.1, 0.1, 0.05, 0.05), (0.9, 0.9, 0.4, 0.4))
+            out[rows, :4] = box + rng.normal(0.0, 0.01, size=(len(rows), 4))
+            out[rows, 4] = 1.0
+            out[rows, 5 + rng.integers(NUM_CLASSES)] = rng.uniform(0.3, 1.0, size=len(rows))
+        outs.append(out)
+    return outs
+
+def load_fixtures(path):
+    data = np.load(path)
+    frames = {}
+    for key in data.files:
+        frame, out = key.split("_")
+        frames.setdefault(int(frame[5:]), {})[int(out[3:])] = data[key]
+    return [[outs[j] for j in sorted(outs)] for _, outs in sorted(frames.items())]
+
+def decode_rows(outs, width, height):
+    """
+    The per-row loop of the previous ObjectDetectionSensor.detect
+    """
+    orig_detections = {}
+    for out in outs:
+        for detection in out:
+            scores = detection[5:]
+            class_id = np.argmax(scores)
+            confidence = scores[class_id]
+            if confidence > SCORE_THRESHOLD:
+                center_x = int(detection[0] * width)
+                center_y = int(detection[1] * height)
+                w = int(detection[2] * width)
+                h = int(detection[3] * height)
+                x = int(center_x - w / 2)
+                y = int(center_y - h / 2)
+                if not class_id in orig_detections:
+                    orig_detections[class_id] = []
+                orig_detections[class_id].append(((x, y, w, h), float(confidence)))
+    return orig_detections
+
+def legacy(outs):
+    detections = []
+    for class_id, rows in decode_rows(outs, WIDTH, HEIGHT).items():
+        grouped_rects, weights = cv2.groupRectangles([r[0] for r in rows], groupThreshold=1)
+        for r in grouped_rects:
+            detections.append((tuple(int(v) for v in r), int(class_id)))
+    return detections
+
+def reference(outs):
+    """
+    Per-row decoding followed by a NMS per class, the semantics of the vectorized version
+    """
+    detections = []
+    for class_id, rows in decode_rows(outs, WIDTH, HEIGHT).items():
+        boxes = [r[0] for r in rows]
+        scores = [r[1] for r in rows]
+        for i in np.asarray(cv2.dnn.NMSBoxes(boxes, scores, SCORE_THRESHOLD, NMS_THRESHOLD)).reshape(-1):
+            detections.append((boxes[i], int(class_id)))
+    return detections
+
+def vectorized(outs):
+    boxes, _, class_ids = postprocess_yolo(outs, WIDTH, HEIGHT, SCORE_THRESHOLD, NMS_THRESHOLD)
+    return [(tuple(int(v) for v in box), int(class_id)) for box, class_id in zip(boxes, class_ids)]
+
+def measure(function, frames, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for outs in frames:
+            function(outs)
+    return 1000.0 * (time.perf_counter() - start) / (repeat * len(frames))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the YOLO post-processing")
+    parser.add_argument("--frames", type=int, default=50, help="number of generated frames")
+    parser.add_argument("--fixtures", help="npz file with recorded network outputs")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        frames = load_fixtures(args.fixtures)
+    else:
+        rng = np.random.default_rng(0)
+        frames = [generate_outputs(rng) for _ in range(args.frames)]
+
+    mismatches = 0
+    detections = 0
+    for outs in frames:
+        expected = sorted(reference(outs))
+        detections += len(expected)
+        if sorted(vectorized(outs)) != expected:
+            mismatches += 1
+    rows = sum(len(out) for out in frames[0])
+    print(f"{len(frames)} frames, {rows} rows per frame, {detections} detections")
+    print(f"vectorized output matches the per-row reference on {len(frames) - mismatches}/{len(frames)} frames")
+    if hasattr(cv2, "groupRectangles"):
+        changed = sum(1 for outs in frames if sorted(legacy(outs)) != sorted(vectorized(outs)))
+        print(f"detections differ from groupRectangles (single boxes kept, best box instead of the average) on {changed}/{len(frames)} frames")
+
+    # groupRectangles is not available in all OpenCV builds (e.g. OpenCV 5)
+    before_name, before_function = ("before", legacy) if hasattr(cv2, "groupRectangles") else ("per-row", reference)
+    before = measure(before_function, frames, args.repeat)
+    after = measure(vectorized, frames, args.repeat)
+    print('%-12s %10s' % ('', 'ms/frame'))
+    print('%-12s %10.3f' % (before_name, before))
+    print('%-12s %10.3f' % ('vectorized', after))
+    print(f"speedup {before / after:.1f}x")
+    if mismatches > 0:
+        sys.exit(1)
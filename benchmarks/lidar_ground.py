@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from carla_kickstart.config import config
+from carla_kickstart.sensors.ground import segment_ground
+
+# Benchmarks the grid ground segmentation of LidarSensor on synthetic sweeps and compares
+# its labels with the fixed z threshold it replaced, no Carla server needed
+#
+#   python benchmarks/lidar_ground.py --points 250000 --slope 0.08
+#
+# A sweep is a sloped ground plane seen from a sensor 1.8 m above it plus box shaped
+# obstacles (vehicles, pedestrians, poles)
+
+SENSOR_HEIGHT = 1.8
+RANGE = 15.0
+
+def make_sweep(rng, points, slope, obstacles = 12):
+    ground_points = int(points * 0.7)
+    r = RANGE * np.sqrt(rng.uniform(0.02, 1.0, ground_points))
+    a = rng.uniform(0.0, 2.0 * np.pi, ground_points)
+    x, y = r * np.cos(a), r * np.sin(a)
+    z = -SENSOR_HEIGHT + slope * x + rng.normal(0.0, 0.02, ground_points)
+    clouds = [np.stack([x, y, z], axis=1)]
+
+    per_obstacle = (points - ground_points) // obstacles
+    for _ in range(obstacles):
+        center = rng.uniform(-RANGE + 2, RANGE - 2, 2)
+        size = rng.choice([(4.5, 1.8, 1.5), (0.6, 0.6, 1.8), (0.3, 0.3, 3.0)])
+        base = -SENSOR_HEIGHT + slope * center[0]
+        local = rng.uniform(-0.5, 0.5, (per_obstacle, 3)) * size
+        local[:, 2] += 0.5 * size[2] + 0.3
+        clouds.append(local + (center[0], center[1], base))
+
+    cloud = np.concatenate(clouds)
+    labels = np.zeros(len(cloud), dtype=bool)
+    labels[:ground_points] = True
+    intensity = rng.uniform(0.0, 1.0, (len(cloud), 1))
+    return np.hstack([cloud, intensity]).astype(np.float32), labels
+
+def scores(predicted, labels):
+    true_positives = np.count_nonzero(predicted & labels)
+    precision = true_positives / max(1, np.count_nonzero(predicted))
+    recall = true_positives / max(1, np.count_nonzero(labels))
+    return precision, recall
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the lidar ground segmentation")
+    parser.add_argument("--points", type=int, default=250000, help="points per sweep")
+    parser.add_argument("--slope", type=float, default=0.08, help="slope of the ground along x")
+    parser.add_argument("--sweeps", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sweeps = [make_sweep(rng, args.points, args.slope) for _ in range(args.sweeps)]
+
+    def grid(points):
+        return segment_ground(points, config.lidar_ground_cell_size, config.lidar_ground_height_threshold, config.lidar_ground_max_z)
+
+    def threshold(points):
+        return points[:, 2] < -1.5
+
+    print(f"{args.sweeps} sweeps of {len(sweeps[0][0])} points, slope {args.slope}")
+    print('%-10s %10s %12s %10s %8s' % ('', 'ms/sweep', 'Mpoints/s', 'precision', 'recall'))
+    for name, function in (("threshold", threshold), ("grid", grid)):
+        function(sweeps[0][0])
+        start = time.perf_counter()
+        results = [function(points) for points, _ in sweeps]
+        elapsed = (time.perf_counter() - start) / len(sweeps)
+        precision, recall = np.mean([scores(r, labels) for r, (_, labels) in zip(results, sweeps)], axis=0)
+        print('%-10s %10.2f %12.2f %10.3f %8.3f' % (name, 1000.0 * elapsed, len(sweeps[0][0]) / elapsed / 1e6, precision, recall))
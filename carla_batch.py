@@ -0,0 +1,25 @@
+from carla_kickstart.runner import ServerEndpoint, run_jobs, load_jobs, write_summary, print_summary
+import argparse
+import time
+
+# Runs scenario jobs headless on one or more Carla servers in parallel
+#
+#   python carla_batch.py --server 127.0.0.1:2000 --server 127.0.0.1:2010 --jobs jobs.csv
+#
+# jobs.csv (separated by ;): SpawnPoint;ModelIndex;DriverBehavior;RouteFile;MaxTicks
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scenario jobs on multiple Carla servers")
+    parser.add_argument("--server", action="append", required=True, help="host:port of a Carla server, can be given multiple times")
+    parser.add_argument("--jobs", required=True, help="csv file with one job per line")
+    parser.add_argument("--summary", default="batch_summary.csv", help="csv file the per-run results are written to")
+    args = parser.parse_args()
+
+    endpoints = [ServerEndpoint.parse(s) for s in args.server]
+    jobs = load_jobs(args.jobs)
+    print(f"Running {len(jobs)} jobs on {len(endpoints)} servers")
+
+    start = time.perf_counter()
+    results = run_jobs(endpoints, jobs)
+    print_summary(results, time.perf_counter() - start)
+    write_summary(args.summary, results)
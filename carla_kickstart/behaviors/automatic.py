@@ -10,6 +10,9 @@ from carla_kickstart.entities.base import VehicleEngine
 from carla_kickstart.behaviors.base import ActorBehavior
 from carla_kickstart.entities.vehicle import VehicleLight
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.world_state import world_state
 from collections import deque
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,9 @@ class FollowPredefinedRouteBehavior(ActorBehavior):
             self.waypoints = self.__load_waypoints_from_file(filename)
         else:
             self.waypoints = self.__waypoints_from_list(waypoints)
+        self.__initial_waypoints = list(self.waypoints)
+        # the route planner is expensive to build, it is kept over warm restarts
+        self.__global_planner = None
 
         self.current_waypoint = None
 
@@ -77,6 +83,17 @@ class FollowPredefinedRouteBehavior(ActorBehavior):
         ActorBehavior.attach(self, vehicle)
         vehicle.engine = AgentEngineControl()
 
+    def reset(self):
+        if self.agent is not None:
+            self.__global_planner = self.agent.get_global_planner()
+        self.agent = None
+        self.ended = False
+        self.waypoints = deque(self.__initial_waypoints)
+        self.current_waypoint = None
+        self.last_waypoint_distance = None
+        self.wait_for_continue = False
+        super().reset()
+
     def set_next_waypoint(self, waypoint: RouteWaypoint):
         self.current_waypoint = waypoint
         #self.agent.set_destination(self.current_waypoint.destination)
@@ -95,11 +112,11 @@ class FollowPredefinedRouteBehavior(ActorBehavior):
 
         return False
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         if not self.ended:
 
             if self.agent is None:
-                self.agent = BehaviorAgent(self.vehicle.player, self.driver_behavior)
+                self.agent = BehaviorAgent(self.vehicle.player, self.driver_behavior, grp_inst=self.__global_planner, world_state=world_state)
                 self.agent.ignore_traffic_lights()
                 self.agent.ignore_stop_signs()
                 self.agent.ignore_vehicles()
@@ -133,11 +150,11 @@ class FollowPredefinedRouteBehavior(ActorBehavior):
                     self.vehicle.set_light(VehicleLight.Brake, True)
                     brake_control = carla.VehicleControl()
                     brake_control.brake = 5
-                    self.vehicle.player.apply_control(brake_control)
+                    actor_lifecycle.apply_control(self.vehicle.player, brake_control)
             else:
                 control = self.agent.run_step()
                 control.manual_gear_shift = False
-                self.vehicle.player.apply_control(control)
+                actor_lifecycle.apply_control(self.vehicle.player, control)
 
 class AgentEngineControl(VehicleEngine):
     """
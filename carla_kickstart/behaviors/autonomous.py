@@ -1,21 +1,56 @@
 import pygame
 from carla_kickstart.entities.vehicle import Vehicle, VehicleLight
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 from carla_kickstart.behaviors.base import ActorBehavior
 import math
 import numpy as np
 import csv
 
-from carla_kickstart.sensors.camera import CameraSensor
+from carla_kickstart.sensors.bus import BundleQueue, SensorBundle
+from carla_kickstart.sensors.camera import DETECTIONS_SUFFIX
+from carla_kickstart.sensors.object_detection import DetectionResult
 
 class DrivingSafetyBehavior(ActorBehavior):
+    """
+    Reads the sensor data from the newest bundle of the vehicle's SensorBus, so all
+    values it acts on belong to the same frame
+    """
+
+    # subscription to the vehicle's sensor bus, made on attach
+    bundles: BundleQueue = None
 
     def __init__(self):
+        # newest bundle, kept while no newer one has been released
+        self.bundle: SensorBundle = None
         self.situation = "none"
         self.next_junction_has_stop_sign = False
         self.waited_at_stop_sign = False
         self.wait_before_continue = 0
 
+    def reset(self):
+        self.__init__()
+        super().reset()
+
+    def attach(self, vehicle):
+        self.detach()
+        super().attach(vehicle)
+        self.bundles = vehicle.sensor_bus.subscribe(maxsize=2)
+
+    def detach(self):
+        if self.bundles is not None:
+            self.vehicle.sensor_bus.unsubscribe(self.bundles)
+            self.bundles = None
+
+    def detections(self, camera: str = "camera_front"):
+        """
+        Detections of the camera in the current bundle, result.frame is the camera frame they were detected on
+        """
+        if self.bundle is None:
+            return []
+        result: DetectionResult = self.bundle.get(camera + DETECTIONS_SUFFIX)
+        return [] if result is None else result.detections
+
     def on_situation_detected(self, name: str, intent: str):
         print(f"Situation: {name}, Current intent: {intent}")
         self.situation = name
@@ -29,18 +64,21 @@ class DrivingSafetyBehavior(ActorBehavior):
 
         self.waited_at_stop_sign = False
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
 
         if self.wait_before_continue > 0:
             self.wait_before_continue -= clock.get_time()
             if self.wait_before_continue < 0:
                 self.wait_before_continue = 0
 
-        cam: CameraSensor = self.vehicle.get_sensor("camera_front")
-        #if len(cam.detections) > 0:
-        #    print(cam.detections)
+        bundle = self.bundles.latest()
+        if bundle is not None:
+            self.bundle = bundle
+        detections = self.detections()
+        #if len(detections) > 0:
+        #    print(detections)
 
-        stop_signs = [x for x in cam.detections if x.class_name == "stop sign"]
+        stop_signs = [x for x in detections if x.class_name == "stop sign"]
         if len(stop_signs) > 0:
             self.next_junction_has_stop_sign = True
 
@@ -53,7 +91,7 @@ class DrivingSafetyBehavior(ActorBehavior):
                 return
 
         if self.situation == "CrossingZebra":
-            persons = [x for x in cam.detections if x.class_name == "person"]
+            persons = [x for x in detections if x.class_name == "person"]
             if len(persons):
                 self.engine.brake()
                 return
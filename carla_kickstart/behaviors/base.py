@@ -1,5 +1,6 @@
 import pygame
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 from carla_kickstart.entities.base import VehicleBase
 from abc import ABC, abstractmethod
 from carla_kickstart.entities.base import VehicleEngine
@@ -23,8 +24,15 @@ class ActorBehavior(ABC):
     def detach(self):
         pass
 
+    def reset(self):
+        """
+        Called on a warm restart after the actor has been moved back to its spawn point.
+        Re-attaches by default, override to reset state which is set up in __init__
+        """
+        self.attach(self.vehicle)
+
     @abstractmethod
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         # Implement behavior in a base class here
         pass
 
@@ -32,7 +40,7 @@ class NullBehavior(ActorBehavior):
     """
     A behavior which does nothing
     """
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         pass
 
 class CompoundBehavior(ActorBehavior):
@@ -55,6 +63,10 @@ class CompoundBehavior(ActorBehavior):
         for b in self.behaviors:
             b.detach()
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def reset(self):
+        for b in self.behaviors:
+            b.reset()
+
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         for b in self.behaviors:
             b.update(clock, keyboard_state)
\ No newline at end of file
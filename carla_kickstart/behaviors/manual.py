@@ -3,6 +3,7 @@ import carla
 from carla_kickstart.entities.vehicle import VehicleLight
 from carla_kickstart.entities.person import Person
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 from carla_kickstart.behaviors.base import ActorBehavior
 
 class ManualDrivingBehavior(ActorBehavior):
@@ -10,7 +11,7 @@ class ManualDrivingBehavior(ActorBehavior):
     Allows driving with W A S D + Space
     """
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         is_braking = False
 
         if keyboard_state.is_key_down(pygame.K_SPACE):
@@ -47,7 +48,7 @@ class ManualWalkBehavior(ActorBehavior):
         self.player_max_speed = 1.589
         self.player_max_speed_fast = 3.713
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         milliseconds = clock.get_time()
 
         self.control.jump = keyboard_state.was_key_pressed(pygame.K_SPACE)
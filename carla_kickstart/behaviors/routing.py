@@ -8,6 +8,7 @@ from carla_kickstart.entities.base import VehicleEngine
 from carla_kickstart.behaviors.base import ActorBehavior
 from carla_kickstart.entities.vehicle import VehicleLight
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 
 
 class RouteRecorderBehavior(ActorBehavior):
@@ -24,7 +25,13 @@ class RouteRecorderBehavior(ActorBehavior):
         self.record_interval_ms = record_interval_ms
         self.total_time = 0
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def reset(self):
+        self.is_recording = False
+        self.time_since_last_recording = 0
+        self.total_time = 0
+        super().reset()
+
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
 
         do_record = False
         if self.record_interval_ms <= 0:
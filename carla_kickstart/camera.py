@@ -4,6 +4,8 @@ import weakref
 import pygame
 import numpy as np
 from carla_kickstart.config import config
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.frames import SurfacePool, bgra_view
 
 class CameraManager(object):
 
@@ -13,6 +15,7 @@ class CameraManager(object):
     def __init__(self, parent_actor, hud, gamma_correction):
         self.sensor = None
         self.surface = None
+        self.surface_pool = SurfacePool()
         self._parent = parent_actor
         self.hud = hud
         self.recording = False
@@ -57,7 +60,7 @@ class CameraManager(object):
             #['sensor.camera.normals', ColorConverter.Raw, 'Camera Normals', {}],
         ]
         world = self._parent.get_world()
-        bp_library = world.get_blueprint_library()
+        bp_library = actor_lifecycle.blueprint_library(world)
         for item in self.sensors:
             bp = bp_library.find(item[0])
             if item[0].startswith('sensor.camera'):
@@ -86,32 +89,35 @@ class CameraManager(object):
         self.transform_index = (self.transform_index + 1) % len(self._camera_transforms)
         self.set_sensor(self.index, notify=False, force_respawn=True)
 
-    def destroy(self):
-        if self.sensor is not None:
-            self.sensor.stop()
-            self.sensor.destroy()
-
     def set_sensor(self, index, notify=True, force_respawn=False):
         index = index % len(self.sensors)
         needs_respawn = True if self.index is None else \
             (force_respawn or (self.sensors[index][2] != self.sensors[self.index][2]))
         if needs_respawn:
             if self.sensor is not None:
-                self.sensor.destroy()
+                actor_lifecycle.destroy([self.sensor])
+                self.sensor = None
                 self.surface = None
-            self.sensor = self._parent.get_world().spawn_actor(
+            actor_lifecycle.spawn(
+                self._parent.get_world(),
                 self.sensors[index][-1],
                 self._camera_transforms[self.transform_index][0],
-                attach_to=self._parent,
+                self._on_sensor_spawned,
+                parent=self._parent,
                 attachment_type=self._camera_transforms[self.transform_index][1])
-            # We need to pass the lambda a weak reference to self to avoid
-            # circular reference.
-            weak_self = weakref.ref(self)
-            self.sensor.listen(lambda image: CameraManager._parse_image(weak_self, image))
         if notify:
             self.hud.notification(self.sensors[index][2])
         self.index = index
 
+    def _on_sensor_spawned(self, actor):
+        if actor is None:
+            raise(Exception("Could not spawn the spectator camera"))
+        self.sensor = actor
+        # We need to pass the lambda a weak reference to self to avoid
+        # circular reference.
+        weak_self = weakref.ref(self)
+        self.sensor.listen(lambda image: CameraManager._parse_image(weak_self, image))
+
     def next_sensor(self):
         self.set_sensor(self.index + 1)
 
@@ -119,13 +125,17 @@ class CameraManager(object):
         self.recording = not self.recording
         self.hud.notification('Recording %s' % ('On' if self.recording else 'Off'))
 
-    def render(self, display):
-        if self.surface is not None:
-            target_rect = self.surface.get_rect()
+    @staticmethod
+    def render(display, surface):
+        """
+        Draws a surface of the camera (taken from a FrameRecord) scaled to the output resolution
+        """
+        if surface is not None:
+            target_rect = surface.get_rect()
             if target_rect.width != config.output_resolution[0] or target_rect.height != config.output_resolution[1]:
-                target_texture = pygame.transform.smoothscale(self.surface, config.output_resolution)
+                target_texture = pygame.transform.smoothscale(surface, config.output_resolution)
             else:
-                target_texture = self.surface
+                target_texture = surface
             display.blit(target_texture, (0, 0))
 
     @staticmethod
@@ -157,24 +167,16 @@ class CameraManager(object):
             self.surface = pygame.surfarray.make_surface(dvs_img.swapaxes(0, 1))
         elif self.sensors[self.index][0].startswith('sensor.camera.optical_flow'):
             image = image.get_color_coded_flow()
-            array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
-            array = np.reshape(array, (image.height, image.width, 4))
-            array = array[:, :, :3]
-            array = array[:, :, ::-1]
-            self.surface = pygame.surfarray.make_surface(array.swapaxes(0, 1))
+            self.surface = self.surface_pool.blit(bgra_view(image))
         else:
             image.convert(self.sensors[self.index][1])
-            array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
-            array = np.reshape(array, (image.height, image.width, 4))
-            array = array[:, :, :3]
-            array = array[:, :, ::-1]
-            self.surface = pygame.surfarray.make_surface(array.swapaxes(0, 1))
+            self.surface = self.surface_pool.blit(bgra_view(image))
         if self.recording:
             image.save_to_disk('_out/%08d' % image.frame)
 
     def destroy(self):
         if self.sensor is not None:
             self.sensor.stop()
-            self.sensor.destroy()
+            actor_lifecycle.destroy([self.sensor])
             self.sensor = None
             self.index = None
\ No newline at end of file
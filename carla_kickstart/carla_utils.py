@@ -1,5 +1,6 @@
 import carla
 import re # regulkar expressions
+from carla_kickstart.lifecycle import actor_lifecycle
 
 def find_weather_presets():
     rgx = re.compile('.+?(?:(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|$)')
@@ -13,5 +14,5 @@ def get_actor_display_name(actor, truncate=250):
     return (name[:truncate - 1] + u'\u2026') if len(name) > truncate else name
 
 def get_actor_blueprints(world, filter):
-    vehicle_blueprints = list(world.get_blueprint_library().filter(filter))
+    vehicle_blueprints = list(actor_lifecycle.blueprint_library(world).filter(filter))
     return vehicle_blueprints
\ No newline at end of file
@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+import pygame
+
+class SimulationClock(ABC):
+    """
+    Time source which is passed to all update() calls.
+    get_time() returns the milliseconds which passed since the last tick,
+    so the clock can be used in place of a pygame.time.Clock
+    """
+
+    @abstractmethod
+    def tick(self, snapshot = None):
+        pass
+
+    @property
+    @abstractmethod
+    def delta_seconds(self) -> float:
+        pass
+
+    @property
+    @abstractmethod
+    def elapsed_seconds(self) -> float:
+        pass
+
+    def get_time(self) -> float:
+        return 1000.0 * self.delta_seconds
+
+    @abstractmethod
+    def get_fps(self) -> float:
+        """
+        Update rate of the client (in real time)
+        """
+        pass
+
+class WallClock(SimulationClock):
+    """
+    Measures real time, used if the server runs asynchronously
+    """
+
+    def __init__(self):
+        self._clock = pygame.time.Clock()
+        self._delta_seconds = 0.0
+        self._elapsed_seconds = 0.0
+
+    def tick(self, snapshot = None):
+        self._delta_seconds = 1e-3 * self._clock.tick()
+        self._elapsed_seconds += self._delta_seconds
+
+    @property
+    def delta_seconds(self) -> float:
+        return self._delta_seconds
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return self._elapsed_seconds
+
+    def get_fps(self) -> float:
+        return self._clock.get_fps()
+
+class SnapshotClock(SimulationClock):
+    """
+    Reports simulation time taken from the world snapshot.
+    In synchronous mode every tick advances by fixed_delta_seconds, no matter
+    how fast the client runs, so runs are reproducible and can be faster than real time
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self._fps_clock = pygame.time.Clock()
+        self._delta_seconds = 0.0
+        self._elapsed_seconds = 0.0
+        self.frame = 0
+
+    def tick(self, snapshot = None):
+        if snapshot is None:
+            snapshot = self.world.get_snapshot()
+        self._fps_clock.tick()
+        self._delta_seconds = snapshot.timestamp.delta_seconds
+        self._elapsed_seconds = snapshot.timestamp.elapsed_seconds
+        self.frame = snapshot.frame
+
+    @property
+    def delta_seconds(self) -> float:
+        return self._delta_seconds
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return self._elapsed_seconds
+
+    def get_fps(self) -> float:
+        return self._fps_clock.get_fps()
@@ -16,6 +16,69 @@ class Config:
 
     sim_id = get_default_sim_id()
     target_fps = 50
+    # record the duration of each phase of every tick, written to <profile_output>.csv/.json at exit
+    profile = False
+    profile_output = "profile"
+
+    # presentation rate of the window when rendering is decoupled from the simulation
+    display_fps = 30
+
+    # no window, HUD or sensor visualizations (set by DriveApp.connect)
+    headless = False
+
+    # object detection: class names to keep (None keeps all), minimum class score and NMS overlap
+    detection_classes = None
+    detection_score_threshold = 0.5
+    detection_nms_threshold = 0.4
+    # only run the detector on these regions of the frame, (x, y, w, h) relative to the frame size (None: whole frame),
+    # optionally split into (columns, rows) tiles overlapping by detection_tile_overlap, which are resized to
+    # detection_input_size each (use a lower input size with tiles)
+    detection_regions = None
+    detection_tiles = None
+    detection_tile_overlap = 0.1
+    # detector backend ("opencv" or "onnxruntime") and model variant (see detection_backends.MODEL_VARIANTS),
+    # model files and coco.names are looked up in detection_model_dir
+    detection_backend = "opencv"
+    detection_model = "yolov3"
+    detection_model_dir = "yolo"
+    detection_input_size = (320, 320)
+    # inference threads, 0 uses the library default
+    detection_threads = 0
+    # run the detector in a worker process, frames are handed over through a ring of shared memory slots
+    # (each large enough for a RGB frame of detection_ring_slot_size)
+    detection_process = False
+    detection_ring_slots = 4
+    detection_ring_slot_size = (1280, 720)
+    # detect-then-track: run the detector every tracking_interval frames (or when a track's confidence
+    # dropped below tracking_min_confidence) and move the tracked boxes in between
+    tracking = False
+    tracking_interval = 5
+    tracking_iou_threshold = 0.3
+    tracking_min_confidence = 0.4
+    # skip the detection while the camera image does not change: more than motion_gate_threshold of the pixels of
+    # a grayscale version about motion_gate_size pixels wide have to change by motion_gate_pixel_delta gray levels,
+    # the detector runs at least every motion_gate_max_static frames
+    motion_gate = False
+    motion_gate_threshold = 0.01
+    motion_gate_pixel_delta = 15
+    motion_gate_size = 32
+    motion_gate_max_static = 100
+
+    # lidar sweeps kept for LidarSensor.accumulated_points() and the voxel size of downsampled_points() (m)
+    lidar_sweeps = 5
+    lidar_voxel_size = 0.2
+    # ground segmentation: grid cell size (m), height above the local ground which still counts as ground (m)
+    # and the highest local ground relative to the sensor (m)
+    lidar_ground_cell_size = 0.5
+    lidar_ground_height_threshold = 0.25
+    lidar_ground_max_z = -0.5
+    # cluster the non-ground points of every lidar sweep into obstacles (LidarSensor.obstacles_ahead())
+    lidar_obstacles = False
+    # obstacle clustering: cell size the connected components are found on (m) and the minimum points of an obstacle
+    lidar_cluster_cell_size = 0.5
+    lidar_cluster_min_points = 5
+    # also bin every lidar sweep into a channel x azimuth image of 16 bit ranges (LidarSensor.range_image)
+    lidar_range_image = False
 
     render_resolution = (1280*RENDER_SCALE_FACTOR, 720*RENDER_SCALE_FACTOR)
     output_resolution = (1280, 720)
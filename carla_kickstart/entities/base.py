@@ -63,6 +63,10 @@ class VehicleBase(ABC):
     def restart(self):
         pass
 
+    @abstractmethod
+    def reset(self):
+        pass
+
     @property
     @abstractmethod
     def speed(self) -> float:
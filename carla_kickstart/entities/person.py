@@ -5,6 +5,9 @@ from carla_kickstart.entities.base import VehicleEngine
 from carla_kickstart.carla_utils import get_actor_blueprints, get_actor_display_name
 from carla_kickstart.config import config
 from carla_kickstart.behaviors.base import ActorBehavior
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.profiling import profiler
+from carla_kickstart.world_state import world_state
 
 ACTOR_FILTER = 'walker.pedestrian.*'
 ACTOR_GENERATION = '2'
@@ -31,6 +34,32 @@ class Person:
         self.travelled_distance = 0
         self.last_location = None
 
+    @property
+    def needs_respawn(self) -> bool:
+        return self.player is None or self.player.type_id != self.model_id
+
+    def reset(self):
+        '''
+        Warm restart: moves the existing person back to its spawn point and resets
+        its state, falls back to restart() if the model has changed
+        '''
+        if self.needs_respawn:
+            self.restart()
+            return
+
+        self.travelled_distance = 0
+        self.last_location = None
+        self._control = carla.WalkerControl()
+
+        actor_id = self.player.id
+        actor_lifecycle.apply([
+            carla.command.ApplyTransform(actor_id, self.spawn_point),
+            carla.command.ApplyTargetVelocity(actor_id, carla.Vector3D()),
+            carla.command.ApplyWalkerControl(actor_id, self._control)
+        ])
+
+        self.behavior.reset()
+
     def _prepare_blueprint(self):
         available_actors = get_actor_blueprints(self.world, ACTOR_FILTER)
         blueprint = next(filter(lambda x: x.id == self.model_id, available_actors))
@@ -51,7 +80,10 @@ class Person:
         if self.player is not None:
             self.destroy()
 
-        self.player = self.world.try_spawn_actor(blueprint, self.spawn_point)
+        actor_lifecycle.spawn(self.world, blueprint, self.spawn_point, self._on_spawned)
+
+    def _on_spawned(self, actor):
+        self.player = actor
 
         if self.player is None:
             raise(Exception(f"Could not spawn person {self.actor_role_name} at the given location"))
@@ -65,16 +97,17 @@ class Person:
         return None
 
     def update(self, clock, keyboard_state):
-        self.behavior.update(clock, keyboard_state)
-        self.player.apply_control(self._control)
+        with profiler.phase(f"person[{self.player.id}].behavior"):
+            self.behavior.update(clock, keyboard_state)
+        actor_lifecycle.apply_control(self.player, self._control)
 
         if self.last_location is None:
-            self.last_location = self.player.get_transform().location
+            self.last_location = world_state.location(self.player)
         else:
-           current_location = self.player.get_transform().location
+           current_location = world_state.location(self.player)
            self.travelled_distance += self.last_location.distance(current_location)
            self.last_location = current_location
 
     def destroy(self):
-        if self.player is not None:
-            self.player.destroy()
\ No newline at end of file
+        actor_lifecycle.destroy([self.player])
+        self.player = None
\ No newline at end of file
@@ -5,6 +5,10 @@ from carla_kickstart.entities.base import VehicleEngine, VehicleLight, VehicleBa
 from carla_kickstart.carla_utils import get_actor_blueprints, get_actor_display_name
 from carla_kickstart.config import config
 from carla_kickstart.behaviors.base import ActorBehavior
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.profiling import profiler
+from carla_kickstart.sensors.bus import SensorBus
+from carla_kickstart.world_state import world_state
 from enum import Enum
 
 ACTOR_FILTER = 'vehicle.*'
@@ -99,7 +103,7 @@ class DefaultEngineModel(VehicleEngine):
             self.steer(amount)
             self._steer_change = 0
 
-        self.ego.player.apply_control(self._control)
+        actor_lifecycle.apply_control(self.ego.player, self._control)
 
 class Vehicle(VehicleBase):
 
@@ -111,6 +115,8 @@ class Vehicle(VehicleBase):
         self.actor_role_name = "VEHICLE_" + config.sim_id
         self.player = None
         self.sensors = {}
+        # per frame bundles of the sensor data, see SensorBus
+        self.sensor_bus = SensorBus()
         self.behavior = behavior
         self.lights = carla.VehicleLightState.NONE
         self._model_lights = None
@@ -125,6 +131,42 @@ class Vehicle(VehicleBase):
 
         self.spawn()
 
+    @property
+    def needs_respawn(self) -> bool:
+        return self.player is None or self.player.type_id != self.model_id
+
+    def reset(self):
+        '''
+        Warm restart: moves the existing vehicle back to its spawn point and resets
+        its state, keeping the actor and its sensors alive.
+        Falls back to restart() if the model has changed
+        '''
+        if self.needs_respawn:
+            self.restart()
+            return
+
+        self.travelled_distance = 0
+        self.last_location = None
+        self.lights = carla.VehicleLightState.NONE
+        self._model_lights = self.lights
+
+        actor_id = self.player.id
+        actor_lifecycle.apply([
+            carla.command.ApplyTransform(actor_id, self.spawn_point),
+            carla.command.ApplyTargetVelocity(actor_id, carla.Vector3D()),
+            carla.command.ApplyTargetAngularVelocity(actor_id, carla.Vector3D()),
+            carla.command.ApplyVehicleControl(actor_id, carla.VehicleControl()),
+            carla.command.SetVehicleLightState(actor_id, carla.VehicleLightState(self.lights))
+        ])
+
+        for sensor in self.sensors.values():
+            if sensor is not None:
+                sensor.reset()
+        self.sensor_bus.clear()
+
+        self.engine = DefaultEngineModel(self)
+        self.behavior.reset()
+
     def _prepare_blueprint(self):
         available_actors = get_actor_blueprints(self.world, ACTOR_FILTER)
         blueprint = next(filter(lambda x: x.id == self.model_id, available_actors))
@@ -148,12 +190,11 @@ class Vehicle(VehicleBase):
 
     @property
     def speed(self):
-        v = self.player.get_velocity()
-        return 3.6 * math.sqrt(v.x**2 + v.y**2 + v.z**2)
+        return world_state.speed(self.player)
 
     @property
     def location(self) -> carla.Location:
-        return self.player.get_location()
+        return world_state.location(self.player)
 
     def spawn(self):
         # Get a random blueprint.
@@ -162,7 +203,10 @@ class Vehicle(VehicleBase):
         if self.player is not None:
             self.destroy()
 
-        self.player = self.world.try_spawn_actor(blueprint, self.spawn_point)
+        actor_lifecycle.spawn(self.world, blueprint, self.spawn_point, self._on_spawned)
+
+    def _on_spawned(self, actor):
+        self.player = actor
 
         if self.player is None:
             raise(Exception(f"Could not spawn Vehicle {self.actor_role_name} at the given location"))
@@ -170,12 +214,17 @@ class Vehicle(VehicleBase):
         self.show_vehicle_telemetry = False
         self.modify_vehicle_physics(self.player)
 
-        self.setup_default_sensors()
+        # all sensors are spawned with a single batch, inside of an enclosing batch
+        # they are available once that batch has been flushed
+        with actor_lifecycle.batch():
+            self.setup_default_sensors()
         self.engine = DefaultEngineModel(self)
         self.behavior.attach(self)
 
     def attach_sensor(self, name: str, sensor):
         self.sensors[name.lower()] = sensor
+        if sensor is not None:
+            self.sensor_bus.register(name.lower(), sensor)
 
     def setup_default_sensors(self):
         # override in child class
@@ -206,26 +255,40 @@ class Vehicle(VehicleBase):
             pass
 
     def update(self, clock, keyboard_state):
-        self.behavior.update(clock, keyboard_state)
-        self.engine.update(clock)
+        if world_state.snapshot is not None:
+            # opens the bundle of this frame, releases the ones which timed out
+            self.sensor_bus.advance(world_state.frame, world_state.snapshot.timestamp.elapsed_seconds)
+        with profiler.phase(f"vehicle[{self.player.id}].behavior"):
+            self.behavior.update(clock, keyboard_state)
+        with profiler.phase(f"vehicle[{self.player.id}].engine"):
+            self.engine.update(clock)
 
         if self.lights != self._model_lights:
-            self.player.set_light_state(carla.VehicleLightState(self.lights))
+            actor_lifecycle.set_light_state(self.player, carla.VehicleLightState(self.lights))
             self._model_lights = self.lights
 
         if self.last_location is None:
-            self.last_location = self.player.get_transform().location
+            self.last_location = world_state.location(self.player)
         else:
-           current_location = self.player.get_transform().location
+           current_location = world_state.location(self.player)
            self.travelled_distance += self.last_location.distance(current_location)
            self.last_location = current_location
 
     def destroy(self):
         self.behavior.detach()
 
+        # stop all sensors first, then destroy them together with the vehicle in one batch
+        actors = []
         for sensor in self.sensors.values():
             if sensor is not None:
-                sensor.sensor.stop()
-                sensor.sensor.destroy()
-        if self.player is not None:
-            self.player.destroy()
\ No newline at end of file
+                sensor.stop()
+                sensor.release()
+                actors.append(sensor.sensor)
+        actors.append(self.player)
+        actor_lifecycle.destroy(actors)
+
+        for name in list(self.sensors.keys()):
+            self.sensor_bus.unregister(name)
+        self.sensor_bus.clear()
+        self.sensors = {}
+        self.player = None
\ No newline at end of file
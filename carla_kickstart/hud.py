@@ -4,9 +4,31 @@ import os
 import datetime
 import math
 from carla_kickstart.carla_utils import get_actor_display_name
+from carla_kickstart.profiling import profiler, presentation_profiler
+from carla_kickstart.world_state import world_state
 
 WIDTH_OF_SENSOR_BAR = 320
 
+class FrameRecord(object):
+    """
+    Everything the presentation draws for one simulated tick. Built by the simulation
+    thread at the end of the tick and replaced as a whole, never modified afterwards, so
+    the presentation thread does not touch live simulation objects.
+    Surfaces come from SurfacePools, which keep the last frames untouched while they are rendered
+    """
+
+    __slots__ = ("spectator", "camera", "lidar", "info_text", "profile_text", "notification", "show_help")
+
+    def __init__(self, spectator, camera, lidar, info_text, profile_text, notification, show_help: bool):
+        self.spectator = spectator
+        self.camera = camera
+        self.lidar = lidar
+        # None if hidden
+        self.info_text = info_text
+        self.profile_text = profile_text
+        self.notification = notification
+        self.show_help = show_help
+
 class FadingText(object):
     def __init__(self, font, dim, pos):
         self.font = font
@@ -50,9 +72,12 @@ class HelpText(object):
     def toggle(self):
         self._render = not self._render
 
+    @property
+    def visible(self) -> bool:
+        return self._render
+
     def render(self, display):
-        if self._render:
-            display.blit(self.surface, self.pos)
+        display.blit(self.surface, self.pos)
 
 class HUD(object):
     def __init__(self, width, height):
@@ -71,6 +96,9 @@ class HUD(object):
         self.simulation_time = 0
         self._show_info = True
         self._info_text = []
+        self._show_profile = False
+        self._profile_text = []
+        self._profile_refresh = 0
         self._server_clock = pygame.time.Clock()
 
         self._show_ackermann_info = False
@@ -85,12 +113,28 @@ class HUD(object):
     def tick(self, sim, clock):
         self._notifications.tick(sim, clock)
 
+        if self._show_profile and profiler.enabled:
+            # percentiles are expensive, refresh them twice per second
+            self._profile_refresh -= clock.get_time()
+            if self._profile_refresh <= 0:
+                self._profile_text = profiler.summary_lines()
+                if presentation_profiler.enabled:
+                    self._profile_text += [""] + presentation_profiler.summary_lines()
+                sensor_bus = getattr(sim.ego, "sensor_bus", None)
+                if sensor_bus is not None:
+                    self._profile_text += [""] + sensor_bus.summary_lines()
+                if sim.ego.has_sensor("camera_front"):
+                    detection_lines = sim.ego.get_sensor("camera_front").detection_summary_lines()
+                    if len(detection_lines) > 0:
+                        self._profile_text += [""] + detection_lines
+                self._profile_refresh = 500
+
         ego_vehicle = sim.ego
 
         if not self._show_info:
             return
-        t = ego_vehicle.player.get_transform()
-        v = ego_vehicle.player.get_velocity()
+        t = world_state.transform(ego_vehicle.player)
+        v = world_state.velocity(ego_vehicle.player)
         c = ego_vehicle.player.get_control()
         if ego_vehicle.has_sensor("imu"):
             imu = ego_vehicle.get_sensor("imu")
@@ -124,8 +168,8 @@ class HUD(object):
             latitude = 0
             longitude = 0
 
-        vehicles = sim.world.get_actors().filter('vehicle.*')
-        self._info_text = [
+        vehicles = world_state.vehicles
+        info_text = [
             'Server:  % 16.0f FPS' % self.server_fps,
             'Client:  % 16.0f FPS' % clock.get_fps(),
             '',
@@ -143,7 +187,7 @@ class HUD(object):
             'Height:  % 18.0f m' % t.location.z,
             '']
         if isinstance(c, carla.VehicleControl):
-            self._info_text += [
+            info_text += [
                 ('Throttle:', c.throttle, 0.0, 1.0),
                 ('Steer:', c.steer, -1.0, 1.0),
                 ('Brake:', c.brake, 0.0, 1.0),
@@ -152,30 +196,31 @@ class HUD(object):
                 ('Manual:', c.manual_gear_shift),
                 'Gear:        %s' % {-1: 'R', 0: 'N'}.get(c.gear, c.gear)]
             if self._show_ackermann_info:
-                self._info_text += [
+                info_text += [
                     '',
                     'Ackermann Controller:',
                     '  Target speed: % 8.0f km/h' % (3.6*self._ackermann_control.speed),
                 ]
         elif isinstance(c, carla.WalkerControl):
-            self._info_text += [
+            info_text += [
                 ('Speed:', c.speed, 0.0, 5.556),
                 ('Jump:', c.jump)]
-        self._info_text += [
+        info_text += [
             '',
             'Collision:',
             collision,
             '']
             #'Number of vehicles: % 8d' % len(vehicles)]
         #if len(vehicles) > 1:
-        #    self._info_text += ['Nearby vehicles:']
+        #    info_text += ['Nearby vehicles:']
         #    distance = lambda l: math.sqrt((l.x - t.location.x)**2 + (l.y - t.location.y)**2 + (l.z - t.location.z)**2)
-        #    vehicles = [(distance(x.get_location()), x) for x in vehicles if x.id != sim.ego.player.id]
+        #    vehicles = [(distance(world_state.location(x)), x) for x in vehicles if x.id != sim.ego.player.id]
         #    for d, vehicle in sorted(vehicles, key=lambda vehicles: vehicles[0]):
         #        if d > 200.0:
         #            break
         #        vehicle_type = get_actor_display_name(vehicle, truncate=22)
-        #        self._info_text.append('% 4dm %s' % (d, vehicle_type))
+        #        info_text.append('% 4dm %s' % (d, vehicle_type))
+        self._info_text = info_text
 
     def show_ackermann_info(self, enabled):
         self._show_ackermann_info = enabled
@@ -186,21 +231,57 @@ class HUD(object):
     def toggle_info(self):
         self._show_info = not self._show_info
 
+    def toggle_profile(self):
+        if not profiler.enabled:
+            self.notification('Profiling is disabled (config.profile)')
+            return
+        self._show_profile = not self._show_profile
+        self._profile_refresh = 0
+
     def notification(self, text, seconds=2.0):
         self._notifications.set_text(text, seconds=seconds)
 
     def error(self, text):
         self._notifications.set_text('Error: %s' % text, (255, 0, 0))
 
-    def render(self, sim_root, display):
-        if self._show_info:
+    def frame_record(self, sim) -> FrameRecord:
+        """
+        Called by the simulation thread at the end of every tick
+        """
+        camera = sim.ego.get_sensor("camera_front")
+        lidar = sim.ego.get_sensor("lidar")
+        camera_manager = sim.camera_manager
+        return FrameRecord(
+            None if camera_manager is None else camera_manager.surface,
+            None if camera is None else camera.surface,
+            None if lidar is None else lidar.surface,
+            self._info_text if self._show_info else None,
+            self._profile_text if self._show_profile else None,
+            self._notifications.surface,
+            self.help.visible)
+
+    def _render_profile(self, display, profile_text):
+        width = 360
+        profile_surface = pygame.Surface((width, 18 * len(profile_text) + 8))
+        profile_surface.set_alpha(160)
+        x = self.dim[0] - WIDTH_OF_SENSOR_BAR - width
+        display.blit(profile_surface, (x, 0))
+        for n, line in enumerate(profile_text):
+            surface = self._font_mono.render(line, True, (255, 255, 255))
+            display.blit(surface, (x + 8, 4 + n * 18))
+
+    def render(self, record: FrameRecord, display):
+        """
+        Draws the record, may run on the presentation thread
+        """
+        if record.info_text is not None:
             info_surface = pygame.Surface((220, self.dim[1]))
             info_surface.set_alpha(100)
             display.blit(info_surface, (0, 0))
             v_offset = 4
             bar_h_offset = 100
             bar_width = 106
-            for item in self._info_text:
+            for item in record.info_text:
                 if v_offset + 18 > self.dim[1]:
                     break
                 if isinstance(item, list):
@@ -228,16 +309,14 @@ class HUD(object):
                     surface = self._font_mono.render(item, True, (255, 255, 255))
                     display.blit(surface, (8, v_offset))
                 v_offset += 18
-        self._notifications.render(display)
-        self.help.render(display)
-
-        if sim_root.ego.has_sensor("camera_front"):
-            camera_image = sim_root.ego.get_sensor("camera_front").surface
-            if camera_image is not None:
-                display.blit(camera_image, (self.dim[0] - 320, 0))
-
-        if sim_root.ego.has_sensor("lidar"):
-            lidar_image = sim_root.ego.get_sensor("lidar").surface
-            if lidar_image is not None:
-                lidar_image = pygame.transform.rotate(lidar_image, 90)
-                display.blit(lidar_image, (self.dim[0] - 320, 320))
+        if record.profile_text is not None:
+            self._render_profile(display, record.profile_text)
+        display.blit(record.notification, self._notifications.pos)
+        if record.show_help:
+            self.help.render(display)
+
+        if record.camera is not None:
+            display.blit(record.camera, (self.dim[0] - 320, 0))
+
+        if record.lidar is not None:
+            display.blit(record.lidar, (self.dim[0] - 320, 320))
@@ -1,5 +1,6 @@
 import pygame
 import carla
+import queue
 
 class KeyboardState:
 
@@ -36,9 +37,32 @@ class SystemInputController(object):
         self.sim_root = sim_root
         self.keyboard_state = KeyboardState()
         self.subcontrollers = subcontrollers
+        self._event_queue = None
+
+    def use_event_queue(self):
+        '''
+        Read events handed over by post_events instead of polling pygame,
+        used when the window is owned by a different thread
+        '''
+        self._event_queue = queue.SimpleQueue()
+
+    def post_events(self, events):
+        for event in events:
+            self._event_queue.put(event)
+
+    def _poll_events(self):
+        if self._event_queue is None:
+            return pygame.event.get()
+
+        events = []
+        while True:
+            try:
+                events.append(self._event_queue.get_nowait())
+            except queue.Empty:
+                return events
 
     def update(self, clock):
-        for event in pygame.event.get():
+        for event in self._poll_events():
             self.keyboard_state.update(event)
 
             if event.type == pygame.QUIT:
@@ -56,6 +80,9 @@ class SystemInputController(object):
             if self.keyboard_state.was_key_pressed(pygame.K_v):
                 self.sim_root.camera_manager.next_sensor()
 
+            if self.keyboard_state.was_key_pressed(pygame.K_p):
+                self.sim_root.hud.toggle_profile()
+
 
         for c in self.subcontrollers:
             c.update(clock, self.keyboard_state)
@@ -0,0 +1,203 @@
+import carla
+from contextlib import contextmanager
+from typing import Callable, List
+
+class SpawnRequest:
+
+    def __init__(self, world, blueprint, transform, on_spawned: Callable, parent = None, attachment_type = carla.AttachmentType.Rigid):
+        self.world = world
+        self.blueprint = blueprint
+        self.transform = transform
+        self.on_spawned = on_spawned
+        self.parent = parent
+        self.attachment_type = attachment_type
+
+class ActorLifecycle:
+    """
+    Spawns, destroys and modifies actors.
+    Inside of a batch() block, requests are collected and sent to the server as
+    command batches when the block is left: one round trip for all destroys, one
+    for all other commands, then one per generation of spawns (parents first, then
+    the sensors attached to them), no matter how many actors are involved.
+    Outside of a batch block every request is executed immediately.
+
+    Per frame controls (apply_control, set_light_state) are sent right away, unless
+    defer_controls is set (pipelined stepping): then they are held back until
+    flush_deferred() sends them in one batch at a well defined point between two ticks.
+    """
+
+    def __init__(self):
+        self.client = None
+        self.defer_controls = False
+        self._deferred_controls = []
+        self._batch_depth = 0
+        self._pending_destroy = []
+        self._pending_commands = []
+        self._pending_spawn: List[SpawnRequest] = []
+        self._blueprint_libraries = {}
+
+    def bind(self, client):
+        """
+        Command batches need the client, without one every actor is handled with its own call
+        """
+        self.client = client
+        self._blueprint_libraries = {}
+
+    def blueprint_library(self, world):
+        """
+        The blueprint library is fetched from the server on every call of get_blueprint_library,
+        so it is only requested once per world
+        """
+        library = self._blueprint_libraries.get(world.id)
+        if library is None:
+            library = world.get_blueprint_library()
+            self._blueprint_libraries[world.id] = library
+        return library
+
+    @property
+    def is_batching(self) -> bool:
+        return self._batch_depth > 0
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        except:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                # do not leave actors behind, but skip the rest of a failed block
+                self._pending_spawn = []
+                self._pending_commands = []
+                self._flush_destroy()
+            raise
+        else:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def spawn(self, world, blueprint, transform, on_spawned: Callable, parent = None, attachment_type = carla.AttachmentType.Rigid):
+        """
+        on_spawned is called with the new actor, or None if it could not be spawned
+        """
+        request = SpawnRequest(world, blueprint, transform, on_spawned, parent, attachment_type)
+        if self.is_batching and self.client is not None and attachment_type == carla.AttachmentType.Rigid:
+            self._pending_spawn.append(request)
+        else:
+            # spawn commands do not support other attachment types
+            self._spawn_single(request)
+
+    def destroy(self, actors):
+        actors = [a for a in actors if a is not None]
+        self._pending_destroy.extend(actors)
+        if not self.is_batching:
+            self._flush_destroy()
+
+    def apply(self, commands):
+        """
+        Applies carla.command objects (e.g. ApplyTransform) to existing actors
+        """
+        self._pending_commands.extend(commands)
+        if not self.is_batching:
+            self._flush_commands()
+
+    def apply_control(self, actor, control):
+        """
+        Applies a carla.VehicleControl or carla.WalkerControl
+        """
+        if not self.defer_controls:
+            actor.apply_control(control)
+        elif isinstance(control, carla.WalkerControl):
+            self._deferred_controls.append(carla.command.ApplyWalkerControl(actor.id, control))
+        else:
+            self._deferred_controls.append(carla.command.ApplyVehicleControl(actor.id, control))
+
+    def set_light_state(self, actor, light_state):
+        if not self.defer_controls:
+            actor.set_light_state(light_state)
+        else:
+            self._deferred_controls.append(carla.command.SetVehicleLightState(actor.id, light_state))
+
+    def flush_deferred(self):
+        """
+        Sends the held back controls, waits for the server so they are applied before the next tick
+        """
+        commands = self._deferred_controls
+        self._deferred_controls = []
+        if len(commands) > 0:
+            self.client.apply_batch_sync(commands, False)
+
+    def discard_deferred(self):
+        self._deferred_controls = []
+
+    def flush(self):
+        # destroy first, new actors might be spawned at the location of the ones they replace
+        while len(self._pending_destroy) > 0 or len(self._pending_commands) > 0 or len(self._pending_spawn) > 0:
+            self._flush_destroy()
+            self._flush_commands()
+            requests = self._pending_spawn
+            self._pending_spawn = []
+            if len(requests) > 0:
+                # callbacks can issue new requests (e.g. sensors for a spawned vehicle)
+                # which are sent in the next iteration
+                self._batch_depth += 1
+                try:
+                    self._spawn_batch(requests)
+                finally:
+                    self._batch_depth -= 1
+
+    def _flush_destroy(self):
+        actors = self._pending_destroy
+        self._pending_destroy = []
+        if len(actors) == 0:
+            return
+
+        if self.client is None:
+            for actor in actors:
+                actor.destroy()
+        else:
+            self.client.apply_batch_sync([carla.command.DestroyActor(a.id) for a in actors], False)
+
+    def _flush_commands(self):
+        commands = self._pending_commands
+        self._pending_commands = []
+        if len(commands) == 0:
+            return
+
+        if self.client is None:
+            raise(Exception("Applying commands requires a bound client"))
+        self.client.apply_batch_sync(commands, False)
+
+    def _spawn_single(self, request: SpawnRequest):
+        if request.parent is None:
+            actor = request.world.try_spawn_actor(request.blueprint, request.transform)
+        else:
+            actor = request.world.try_spawn_actor(request.blueprint, request.transform, attach_to=request.parent, attachment_type=request.attachment_type)
+        request.on_spawned(actor)
+
+    def _spawn_batch(self, requests: List[SpawnRequest]):
+        commands = []
+        for r in requests:
+            if r.parent is None:
+                commands.append(carla.command.SpawnActor(r.blueprint, r.transform))
+            else:
+                commands.append(carla.command.SpawnActor(r.blueprint, r.transform, r.parent.id))
+
+        responses = self.client.apply_batch_sync(commands, False)
+        actor_ids = [r.actor_id for r in responses if not r.has_error()]
+        world = requests[0].world
+        actors = {a.id: a for a in world.get_actors(actor_ids)} if len(actor_ids) > 0 else {}
+
+        error = None
+        for request, response in zip(requests, responses):
+            actor = None if response.has_error() else actors.get(response.actor_id)
+            try:
+                request.on_spawned(actor)
+            except Exception as e:
+                # let the other requests finish so no spawned actor is left without owner
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+
+actor_lifecycle = ActorLifecycle()
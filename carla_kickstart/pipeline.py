@@ -0,0 +1,58 @@
+import queue
+from threading import Thread
+
+class TickPipeline(object):
+    """
+    Issues world.tick() from a dedicated thread, so the server simulates the next
+    frame while the client is still working on the current one.
+
+        pipeline.request()           # server starts simulating frame N+1
+        ...                          # client computes with frame N
+        snapshot = pipeline.wait()   # snapshot of frame N+1
+
+    The snapshot is taken right after the tick returned, before the next tick is
+    requested, so it always belongs to the frame of that tick.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.in_flight = False
+        self._requests = queue.SimpleQueue()
+        self._results = queue.SimpleQueue()
+        self._thread = Thread(target=self._run, name="tick", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        if self.in_flight:
+            raise Exception("Only one tick can be in flight")
+        self.in_flight = True
+        self._requests.put(True)
+
+    def wait(self):
+        """
+        Blocks until the requested tick has finished and returns its snapshot
+        """
+        if not self.in_flight:
+            raise Exception("No tick has been requested")
+        result = self._results.get()
+        self.in_flight = False
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stop(self):
+        if self.in_flight:
+            try:
+                self.wait()
+            except Exception:
+                pass
+        self._requests.put(False)
+        self._thread.join()
+
+    def _run(self):
+        while self._requests.get():
+            try:
+                self.world.tick()
+                self._results.put(self.world.get_snapshot())
+            except Exception as e:
+                self._results.put(e)
@@ -0,0 +1,147 @@
+import csv
+import json
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+class _Phase(object):
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.profiler.record(self.name, 1000.0 * (time.perf_counter() - self.start))
+
+class PhaseProfiler(object):
+    """
+    Records the wall time (in milliseconds) of the phases of every tick.
+
+        with profiler.phase("world.tick"):
+            world.tick()
+
+    Percentiles are computed over the last `window` ticks, the last `history`
+    ticks are kept for the csv export. Phases which run multiple times in one
+    tick are summed up. If disabled, phase() costs a single attribute lookup.
+    """
+
+    def __init__(self, title: str = "Phase", window: int = 1000, history: int = 100000):
+        self.title = title
+        self.enabled = False
+        self.ticks = 0
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples = {}
+        self._history = deque(maxlen=history)
+        self._current = {}
+        self._current_frame = None
+        self._tick_start = None
+
+    def reset(self):
+        with self._lock:
+            self.ticks = 0
+            self._samples = {}
+            self._history.clear()
+            self._current = {}
+            self._tick_start = None
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return nullcontext()
+        return _Phase(self, name)
+
+    def record(self, name: str, milliseconds: float):
+        with self._lock:
+            self._current[name] = self._current.get(name, 0.0) + milliseconds
+
+    def begin_tick(self, frame: int = None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._current = {}
+            self._current_frame = frame
+            self._tick_start = time.perf_counter()
+
+    def set_frame(self, frame: int):
+        """
+        The frame of a tick is usually known only after the world has been ticked
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._current_frame = frame
+
+    def end_tick(self):
+        if not self.enabled or self._tick_start is None:
+            return
+        with self._lock:
+            phases = self._current
+            phases["tick"] = 1000.0 * (time.perf_counter() - self._tick_start)
+            for name, milliseconds in phases.items():
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = deque(maxlen=self._window)
+                    self._samples[name] = samples
+                samples.append(milliseconds)
+            self._history.append((self.ticks, self._current_frame, phases))
+            self._current = {}
+            self._tick_start = None
+            self.ticks += 1
+
+    def statistics(self) -> dict:
+        """
+        Returns {phase: {"p50": ms, "p95": ms, "p99": ms, "mean": ms, "count": n}} over the rolling window
+        """
+        with self._lock:
+            samples = {name: np.array(s) for name, s in self._samples.items()}
+
+        stats = {}
+        for name, values in samples.items():
+            p = np.percentile(values, PERCENTILES)
+            stats[name] = {f"p{q}": float(v) for q, v in zip(PERCENTILES, p)}
+            stats[name]["mean"] = float(values.mean())
+            stats[name]["count"] = len(values)
+        return stats
+
+    def summary_lines(self):
+        stats = self.statistics()
+        lines = ['%-22s %5s %5s %5s' % (self.title + ' (ms)', 'p50', 'p95', 'p99')]
+        for name, s in sorted(stats.items(), key=lambda x: -x[1]["p50"]):
+            lines.append('%-22.22s %5.1f %5.1f %5.1f' % (name, s["p50"], s["p95"], s["p99"]))
+        return lines
+
+    def export_csv(self, filename: str):
+        """
+        One line per tick, one column per phase
+        """
+        with self._lock:
+            history = list(self._history)
+        names = sorted(set(name for _, _, phases in history for name in phases))
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["Tick", "Frame"] + names)
+            for tick, frame, phases in history:
+                writer.writerow([tick, frame if frame is not None else ""] + ["%.3f" % phases[n] if n in phases else "" for n in names])
+
+    def export_json(self, filename: str):
+        with open(filename, "w") as f:
+            json.dump({"ticks": self.ticks, "window": self._window, "phases": self.statistics()}, f, indent=2)
+
+    def export(self, basename: str):
+        self.export_csv(basename + ".csv")
+        self.export_json(basename + ".json")
+        print(f"Profile of {self.ticks} ticks written to {basename}.csv/.json")
+
+profiler = PhaseProfiler()
+# frames presented by a separate thread (decoupled rendering) are not part of a simulation tick
+presentation_profiler = PhaseProfiler("Presentation")
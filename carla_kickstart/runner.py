@@ -0,0 +1,237 @@
+import csv
+import multiprocessing
+import queue
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+from carla_kickstart.config import config
+from carla_kickstart.clock import SimulationClock
+from carla_kickstart.input import KeyboardState
+from carla_kickstart.behaviors.base import CompoundBehavior, NullBehavior
+from carla_kickstart.behaviors.automatic import FollowPredefinedRouteBehavior
+from carla_kickstart.config import available_car_models
+from carla_kickstart.scenarios.single import EgoVehicle, SingleEgoVehicleScenario
+from carla_kickstart.sensors.collision import CollisionSensor
+from carla_kickstart.simulation import DriveApp
+
+BASE_SIM_ID = config.sim_id.strip()
+
+class ServerEndpoint:
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    @staticmethod
+    def parse(text: str) -> 'ServerEndpoint':
+        """
+        Parses host:port, the port defaults to 2000
+        """
+        host, _, port = text.partition(":")
+        return ServerEndpoint(host, int(port) if port else 2000)
+
+    def __repr__(self):
+        return f"{self.host}:{self.port}"
+
+class ScenarioJob:
+    """
+    A single headless run of the ego vehicle following a recorded route.
+    It ends when the route is finished or after max_ticks, so at least one of them is required
+    """
+
+    def __init__(self, spawn_point: int, model_index: int = 0, driver_behavior: str = "normal", route_file: str = None, max_ticks: int = None):
+        if route_file is None and max_ticks is None:
+            raise ValueError("A job without route file needs max ticks, it would never end")
+        self.spawn_point = spawn_point
+        self.model_index = model_index
+        self.driver_behavior = driver_behavior
+        self.route_file = route_file
+        self.max_ticks = max_ticks
+
+    def __repr__(self):
+        return f"spawn point {self.spawn_point}, model {self.model_index}, {self.driver_behavior}, route {self.route_file}"
+
+class JobResult:
+
+    def __init__(self, job_index: int, job: ScenarioJob):
+        self.job_index = job_index
+        self.job = job
+        self.endpoint = None
+        self.sim_id = None
+        self.ticks = 0
+        self.wall_time = 0.0
+        self.route_finished = False
+        self.travelled_distance = 0.0
+        self.collisions = 0
+        self.error = None
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_row(self) -> dict:
+        return {
+            "Job": self.job_index,
+            "Endpoint": str(self.endpoint),
+            "SimId": self.sim_id,
+            "SpawnPoint": self.job.spawn_point,
+            "ModelIndex": self.job.model_index,
+            "DriverBehavior": self.job.driver_behavior,
+            "RouteFile": self.job.route_file or "",
+            "Ticks": self.ticks,
+            "WallTime": f"{self.wall_time:.3f}",
+            "TicksPerSecond": f"{self.ticks_per_second:.1f}",
+            "RouteFinished": self.route_finished,
+            "TravelledDistance": f"{self.travelled_distance:.2f}",
+            "Collisions": self.collisions,
+            "Error": self.error or ""
+        }
+
+class RouteJobVehicle(EgoVehicle):
+    """
+    The ego vehicle of a job, with a collision sensor for the summary
+    """
+
+    def __init__(self, sim_id: str, world, model_id: str, spawn_point, behavior):
+        super().__init__(sim_id, world, model_id, spawn_point, behavior)
+        # kept after the vehicle has been destroyed, so the collisions can be read after the run
+        self.collision_sensor = None
+
+    def setup_default_sensors(self):
+        super().setup_default_sensors()
+        self.collision_sensor = CollisionSensor(self.player)
+        self.attach_sensor("collision", self.collision_sensor)
+
+class RouteJobScenario(SingleEgoVehicleScenario):
+    """
+    Drives the job's route and requests exit as soon as the route has been completed
+    """
+
+    def __init__(self, job: ScenarioJob):
+        if job.route_file is not None:
+            self.route_behavior = FollowPredefinedRouteBehavior(filename=job.route_file, driver_behavior=job.driver_behavior)
+            behavior = CompoundBehavior(self.route_behavior)
+        else:
+            self.route_behavior = None
+            behavior = NullBehavior()
+        super().__init__(behavior, job.spawn_point, job.model_index)
+
+    def get_ego_vehicle(self) -> RouteJobVehicle:
+        return RouteJobVehicle(self.sim_id, self.world, available_car_models[self.model_index], self.get_ego_spawn_point(), self.ego_behavior)
+
+    @property
+    def route_finished(self) -> bool:
+        return self.route_behavior is not None and self.route_behavior.ended
+
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
+        super().update(clock, keyboard_state)
+        if self.route_finished:
+            self.sim_root.exit_requested = True
+
+def run_scenario_job(endpoint: ServerEndpoint, job: ScenarioJob, result: JobResult):
+    """
+    Runs one job headless on the given server and fills in the result
+    """
+    app = DriveApp()
+    app.connect(endpoint.host, endpoint.port, synchronous=True, headless=True)
+    try:
+        scenario = RouteJobScenario(job)
+        stats = app.run(scenario, max_ticks=job.max_ticks)
+
+        ego = app.sim_root.ego
+        result.ticks = stats.ticks
+        result.route_finished = scenario.route_finished
+        result.travelled_distance = ego.travelled_distance
+        # the sensors have already been destroyed with the vehicle
+        if ego.collision_sensor is not None:
+            result.collisions = len(ego.collision_sensor.history)
+    finally:
+        app.disconnect()
+
+def _endpoint_worker(endpoint: ServerEndpoint, worker_id: int, jobs, job_runner) -> List[JobResult]:
+    """
+    Process entry point, takes jobs from the shared queue until it is empty
+    """
+    # every worker gets its own id so clean_up only removes its own actors
+    config.sim_id = f"{BASE_SIM_ID}-{worker_id}"
+
+    results = []
+    while True:
+        try:
+            job_index, job = jobs.get_nowait()
+        except queue.Empty:
+            return results
+
+        result = JobResult(job_index, job)
+        result.endpoint = endpoint
+        result.sim_id = config.sim_id
+        print(f"[{endpoint}] Running job {job_index}: {job}")
+        start = time.perf_counter()
+        try:
+            job_runner(endpoint, job, result)
+        except Exception:
+            result.error = traceback.format_exc().strip().splitlines()[-1]
+            traceback.print_exc()
+        result.wall_time = time.perf_counter() - start
+        results.append(result)
+
+def run_jobs(endpoints: List[ServerEndpoint], jobs: List[ScenarioJob], job_runner: Callable[[ServerEndpoint, ScenarioJob, JobResult], None] = run_scenario_job) -> List[JobResult]:
+    """
+    Runs the jobs on a process pool with one worker per server endpoint.
+    Workers pull the next job as soon as they are done, so throughput scales with the number of servers.
+    job_runner has to be a module level function so it can be sent to the workers
+    """
+    if len(endpoints) == 0:
+        raise Exception("At least one server endpoint is required")
+
+    with multiprocessing.Manager() as manager:
+        job_queue = manager.Queue()
+        for job_index, job in enumerate(jobs):
+            job_queue.put((job_index, job))
+
+        with ProcessPoolExecutor(max_workers=len(endpoints)) as pool:
+            futures = [pool.submit(_endpoint_worker, endpoint, worker_id, job_queue, job_runner) for worker_id, endpoint in enumerate(endpoints)]
+            results = [r for f in futures for r in f.result()]
+
+    results.sort(key=lambda r: r.job_index)
+    return results
+
+def load_jobs(filename: str) -> List[ScenarioJob]:
+    """
+    Reads jobs from a csv file with the columns SpawnPoint;ModelIndex;DriverBehavior;RouteFile;MaxTicks,
+    every job needs a RouteFile or MaxTicks
+    """
+    jobs = []
+    with open(filename, "r") as f:
+        reader = csv.DictReader(f, delimiter=";")
+        for row in reader:
+            max_ticks = row.get("MaxTicks")
+            try:
+                jobs.append(ScenarioJob(
+                    spawn_point=int(row["SpawnPoint"]),
+                    model_index=int(row.get("ModelIndex") or 0),
+                    driver_behavior=row.get("DriverBehavior") or "normal",
+                    route_file=row.get("RouteFile") or None,
+                    max_ticks=int(max_ticks) if max_ticks else None))
+            except ValueError as e:
+                raise ValueError(f"{filename} line {reader.line_num}: {e}")
+    return jobs
+
+def write_summary(filename: str, results: List[JobResult]):
+    with open(filename, "w", newline="") as f:
+        writer = None
+        for result in results:
+            row = result.as_row()
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row.keys()), delimiter=";")
+                writer.writeheader()
+            writer.writerow(row)
+
+def print_summary(results: List[JobResult], wall_time: float):
+    total_ticks = sum(r.ticks for r in results)
+    failed = [r for r in results if r.error is not None]
+    for r in results:
+        status = f"FAILED ({r.error})" if r.error is not None else ("finished" if r.route_finished else "stopped")
+        print(f"Job {r.job_index} on {r.endpoint}: {r.ticks} ticks, {r.ticks_per_second:.1f} ticks/s, {status}")
+    print(f"{len(results)} jobs ({len(failed)} failed), {total_ticks} ticks in {wall_time:.1f} s ({total_ticks / max(wall_time, 1e-9):.1f} ticks/s overall)")
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from carla_kickstart.entities.vehicle import Vehicle
 import pygame
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 
 class SimulationScenario(ABC):
 
@@ -19,9 +20,15 @@ class SimulationScenario(ABC):
     def restart(self):
         pass
 
+    def reset(self):
+        """
+        Warm restart of the scenario's actors, respawns them by default
+        """
+        self.restart()
+
     def destroy(self):
         pass
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         # implement in base class if needed
         pass
\ No newline at end of file
@@ -10,6 +10,7 @@ from carla_kickstart.entities.base import VehicleLight
 from carla_kickstart.entities.vehicle import Vehicle
 from carla_kickstart.entities.person import Person
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 from carla_kickstart.sensors.collision import CollisionSensor
 from carla_kickstart.sensors.inertials import IMUSensor
 from carla_kickstart.sensors.lanes import LaneInvasionSensor
@@ -106,6 +107,15 @@ class DemoScenario(SimulationScenario):
         for actor in self.actors:
             actor.restart()
 
+    def reset(self):
+        if len(self.actors) == 0:
+            self.restart()
+            return
+
+        self.signal.reset()
+        for actor in self.actors:
+            actor.reset()
+
     def get_ego_spawn_point(self):
         return self.map.get_spawn_points()[EGO_SPAWN_POINT]
 
@@ -127,7 +137,7 @@ class DemoScenario(SimulationScenario):
          behavior = CompoundBehavior(FollowPredefinedRouteBehavior(filename="scenario.csv", driver_behavior="cautious", waypoint_reached_callback=self.on_waypoint_reached), self.safety_behavior)
          return EgoVehicle(self.sim_id, self.world, EGO_MODEL, self.get_ego_spawn_point(), behavior)
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         super().update(clock, keyboard_state)
 
         for actor in self.actors:
@@ -154,7 +164,7 @@ class CrossingPersonBehavior(ActorBehavior):
         self._rotation.yaw = 180 # start walking in the other direction
         self._control.direction = self._rotation.get_forward_vector()
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
 
         self._control.speed = self.player_max_speed
         if self.person.travelled_distance > 22:
@@ -176,6 +186,7 @@ class PassingCarBehavior(ActorBehavior):
         self.signal = signal
         self.started = False
         self.delay_ms = delay_ms
+        self.initial_delay_ms = delay_ms
 
         dest = carla.Location(-5.83, 66.24, 0.00)
         self.__inner_behavior = FollowPredefinedRouteBehavior(waypoints=[RouteWaypoint(dest, 30)])
@@ -184,7 +195,13 @@ class PassingCarBehavior(ActorBehavior):
         super().attach(vehicle)
         self.__inner_behavior.attach(self.vehicle)
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def reset(self):
+        self.started = False
+        self.delay_ms = self.initial_delay_ms
+        super().reset()
+        self.__inner_behavior.reset()
+
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         if not self.started:
             self.started = self.signal.is_on
 
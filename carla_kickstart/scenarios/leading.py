@@ -6,6 +6,7 @@ from carla_kickstart.behaviors.manual import ManualDrivingBehavior
 from carla_kickstart.behaviors.autonomous import AutopilotDrivingBehavior
 from carla_kickstart.vehicle import Vehicle
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 from carla_kickstart.sensors.collision import CollisionSensor
 from carla_kickstart.sensors.inertials import IMUSensor
 from carla_kickstart.sensors.lanes import LaneInvasionSensor
@@ -56,13 +57,24 @@ class LeadingVehicleScenario(SingleEgoVehicleScenario):
          """
          return EgoVehicle(self.sim_id, self.world, available_car_models[self.model_index], self.get_ego_spawn_point(), self.ego_behavior)
 
-    def restart(self):
-        super().restart()
+    def get_leading_spawn_point(self):
         ego_point = self.sim_root.ego.spawn_point
         distance_vector = ego_point.get_forward_vector() # is already a normalized vector
         distance_vector = distance_vector * self.leading_spawn_distance
 
-        spawn_point = carla.Transform(ego_point.location + distance_vector, ego_point.rotation)
+        return carla.Transform(ego_point.location + distance_vector, ego_point.rotation)
+
+    def reset(self):
+        if self.leading_vehicle is None:
+            self.restart()
+            return
+
+        self.leading_vehicle.spawn_point = self.get_leading_spawn_point()
+        self.leading_vehicle.reset()
+
+    def restart(self):
+        super().restart()
+        spawn_point = self.get_leading_spawn_point()
 
         if self.leading_vehicle is None:
             self.leading_vehicle = Vehicle(self.sim_root.world, 'vehicle.mercedes.coupe_2020', spawn_point, AutopilotDrivingBehavior())
@@ -72,7 +84,7 @@ class LeadingVehicleScenario(SingleEgoVehicleScenario):
         self.leading_vehicle.spawn_point = spawn_point
         self.leading_vehicle.restart()
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         super().update(clock, keyboard_state)
         self.leading_vehicle.update(clock, keyboard_state)
 
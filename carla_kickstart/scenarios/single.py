@@ -5,6 +5,7 @@ from carla_kickstart.behaviors.manual import ManualDrivingBehavior, ManualWalkBe
 from carla_kickstart.entities.vehicle import Vehicle
 from carla_kickstart.entities.person import Person
 from carla_kickstart.input import KeyboardState
+from carla_kickstart.clock import SimulationClock
 from carla_kickstart.sensors.collision import CollisionSensor
 from carla_kickstart.sensors.inertials import IMUSensor
 from carla_kickstart.sensors.lanes import LaneInvasionSensor
@@ -68,7 +69,7 @@ class SingleEgoVehicleScenario(SimulationScenario):
         self.sim_root.restart_requested = True
         self.hud.notification(f"Spawn Point: {self.spawn_point_index}, Model Index: {self.model_index}")
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
 
         # Spawn points of the EGO vehicle can be changed using Left And Right Arrows
 
@@ -130,5 +131,5 @@ class PersonScenario(SimulationScenario):
         self.sim_root.restart_requested = True
         self.hud.notification(f"Spawn Point: {self.spawn_point_index}, Model Index: {self.model_index}")
 
-    def update(self, clock: pygame.time.Clock, keyboard_state: KeyboardState):
+    def update(self, clock: SimulationClock, keyboard_state: KeyboardState):
         pass
\ No newline at end of file
@@ -0,0 +1,118 @@
+import carla
+import threading
+from abc import ABC, abstractmethod
+from carla_kickstart.lifecycle import actor_lifecycle
+
+class SensorFrameGate(object):
+    """
+    With pipelined stepping the server already simulates frame N+1 while the client
+    works on frame N. Sensor data of frames the client has not reached yet is held
+    back and handed to the sensors when the client advances (on the client's thread),
+    so all sensors show the same frame as the world state.
+    If disabled, data is passed on as soon as it arrives.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.frame = None
+        self._lock = threading.Lock()
+        self._held = []
+
+    def dispatch(self, weak_sensor, callback, data):
+        """
+        Calls callback(weak_sensor, data) now, or as soon as the client reaches data.frame
+        """
+        if self.enabled:
+            with self._lock:
+                if self.frame is not None and data.frame > self.frame:
+                    self._held.append((data.frame, weak_sensor, callback, data))
+                    return
+        self._deliver(weak_sensor, callback, data)
+
+    def advance(self, frame: int):
+        with self._lock:
+            self.frame = frame
+            ready = [h for h in self._held if h[0] <= frame]
+            self._held = [h for h in self._held if h[0] > frame]
+        ready.sort(key=lambda h: h[0])
+        for _, weak_sensor, callback, data in ready:
+            self._deliver(weak_sensor, callback, data)
+
+    def clear(self):
+        """
+        Drops all held data, e.g. on a restart
+        """
+        with self._lock:
+            self.frame = None
+            self._held = []
+
+    @staticmethod
+    def _deliver(weak_sensor, callback, data):
+        sensor = weak_sensor()
+        if sensor is None:
+            return
+        sensor.frame = data.frame
+        callback(weak_sensor, data)
+        if sensor.bus is not None:
+            sensor.bus.publish(sensor.bus_name, data)
+
+frame_gate = SensorFrameGate()
+
+class SensorBase(ABC):
+    """
+    A sensor which is attached to a parent actor.
+    The sensor actor is spawned through the actor lifecycle, so inside of a batch
+    self.sensor is only available (and listening) after the batch has been flushed.
+    self.frame is the frame of the data the sensor currently shows.
+    Data is also published to the SensorBus the sensor is registered with (if any),
+    event sensors (streaming = False) are not awaited by the bus
+    """
+
+    streaming = True
+
+    def __init__(self, parent_actor):
+        self.sensor = None
+        self.frame = -1
+        self.bus = None
+        self.bus_name = None
+        self._parent = parent_actor
+
+    def _spawn(self, blueprint, transform, attachment_type = carla.AttachmentType.Rigid):
+        world = self._parent.get_world()
+        actor_lifecycle.spawn(world, blueprint, transform, self._on_spawned, parent=self._parent, attachment_type=attachment_type)
+
+    def _on_spawned(self, actor):
+        if actor is None:
+            raise(Exception(f"Could not spawn {type(self).__name__}"))
+        self.sensor = actor
+        self._listen(actor)
+
+    @abstractmethod
+    def _listen(self, sensor):
+        """
+        Register the data callback through frame_gate.dispatch, pass a weak reference
+        of self to avoid circular references
+        """
+        pass
+
+    def reset(self):
+        """
+        Called on a warm restart, clear all data which belongs to the previous episode
+        """
+        pass
+
+    def stop(self):
+        if self.sensor is not None:
+            self.sensor.stop()
+
+    def release(self):
+        """
+        Called when the sensor is destroyed, free everything which is not an actor (threads, ...)
+        """
+        pass
+
+    def destroy(self):
+        self.stop()
+        self.release()
+        actor_lifecycle.destroy([self.sensor])
+        self.sensor = None
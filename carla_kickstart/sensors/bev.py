@@ -0,0 +1,89 @@
+import numpy as np
+import pygame
+from carla_kickstart.sensors.frames import SurfacePool
+
+class BevGrids(object):
+    """
+    The grids of one rasterized point cloud, (height, width) cells:
+        occupancy    number of points per cell, int32
+        max_height   highest z per cell, -inf for empty cells
+        intensity    mean intensity per cell, 0 for empty cells
+        point_cells  flat cell index of every point
+        point_mask   which points were rasterized, e.g. for clustering
+    """
+
+    __slots__ = ("occupancy", "max_height", "intensity", "point_cells", "point_mask")
+
+    def __init__(self, width: int, height: int):
+        self.occupancy = np.zeros((height, width), dtype=np.int32)
+        self.max_height = np.full((height, width), -np.inf, dtype=np.float32)
+        self.intensity = np.zeros((height, width), dtype=np.float32)
+        self.point_cells = np.zeros(0, dtype=np.int64)
+        self.point_mask = np.zeros(0, dtype=bool)
+
+class BevRasterizer(object):
+    """
+    Bird's-eye view grids of a point cloud in sensor coordinates (x forward, y right, z up),
+    size is (width, height) in cells and covers +-range meters around the sensor.
+    Forward points up and right points right, so the grids can be shown as they are.
+    rasterize() writes into the other of two preallocated BevGrids and only then
+    publishes it as `grids`, so a reader on another thread which takes the reference
+    once sees one complete sweep while the next one is rasterized (like SurfacePool)
+    """
+
+    def __init__(self, size = (320, 320), range: float = 15.0):
+        self.size = size
+        self.range = range
+        self.resolution = 2.0 * range / min(size)
+        width, height = size
+        self._grids = (BevGrids(width, height), BevGrids(width, height))
+        # the grids of the last rasterize()
+        self.grids = self._grids[0]
+        self._image = np.zeros((height, width, 4), dtype=np.uint8)
+        self._image[:, :, 3] = 255
+        self._occupied = np.zeros((height, width), dtype=bool)
+        self._surface_pool = SurfacePool()
+
+    def cells(self, points: np.ndarray, mask: np.ndarray = None):
+        """
+        Returns (flat cell index, in range mask) of the points, mask preselects points
+        """
+        width, height = self.size
+        columns = np.floor(points[:, 1] / self.resolution + 0.5 * width).astype(np.int64)
+        rows = np.floor(0.5 * height - points[:, 0] / self.resolution).astype(np.int64)
+        in_range = (columns >= 0) & (columns < width) & (rows >= 0) & (rows < height)
+        if mask is not None:
+            in_range &= mask
+        return rows * width + columns, in_range
+
+    def rasterize(self, points: np.ndarray, mask: np.ndarray = None):
+        """
+        points is a (n, 4) x, y, z, intensity array, only points where mask is True are used.
+        Returns the new grids, which are also published as self.grids
+        """
+        grids = self._grids[1] if self.grids is self._grids[0] else self._grids[0]
+        cells, in_range = self.cells(points, mask)
+        grids.point_cells = cells
+        grids.point_mask = in_range
+        cells = cells[in_range]
+        cell_count = grids.occupancy.size
+
+        counts = np.bincount(cells, minlength=cell_count)
+        grids.occupancy.reshape(-1)[:] = counts
+        intensity = grids.intensity.reshape(-1)
+        intensity[:] = np.bincount(cells, weights=points[in_range, 3], minlength=cell_count)
+        np.divide(intensity, counts, out=intensity, where=counts > 0)
+        max_height = grids.max_height.reshape(-1)
+        max_height.fill(-np.inf)
+        np.maximum.at(max_height, cells, points[in_range, 2])
+        self.grids = grids
+        return grids
+
+    def render(self) -> pygame.Surface:
+        """
+        Occupied cells of the last grids white on black, the surface is reused by the next calls
+        """
+        np.greater(self.grids.occupancy, 0, out=self._occupied)
+        for channel in range(3):
+            np.multiply(self._occupied, 255, out=self._image[:, :, channel], casting="unsafe")
+        return self._surface_pool.blit(self._image)
@@ -0,0 +1,345 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+class SensorBundle(object):
+    """
+    The data of all sensors of a vehicle for one frame, keyed by sensor name.
+    Sensors which did not deliver in time (or are not due in this frame because
+    of their sensor_tick) are missing, check complete or missing before use
+    """
+
+    def __init__(self, frame: int):
+        self.frame = frame
+        self.timestamp = None
+        self.data = {}
+        self.expected = set()
+        self.complete = False
+        # wall time the frame was first seen, arrival lag is measured from here
+        self.opened = time.perf_counter()
+
+    @property
+    def missing(self) -> set:
+        return self.expected - set(self.data.keys())
+
+    def get(self, name: str, default = None):
+        return self.data.get(name, default)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.data
+
+    def __getitem__(self, name: str):
+        return self.data[name]
+
+    def __repr__(self):
+        state = "complete" if self.complete else f"partial, missing {sorted(self.missing)}"
+        return f"SensorBundle(frame={self.frame}, {sorted(self.data.keys())}, {state})"
+
+class BundleQueue(object):
+    """
+    Bounded queue of bundles for one consumer.
+    drop_oldest: a full queue drops its oldest bundle, the bus never waits.
+    block: the bus waits up to timeout seconds (on the thread that released the bundle)
+    until the consumer made room, then drops the oldest bundle. Only use it if the
+    consumer runs on another thread, otherwise every full put costs the timeout
+    """
+
+    def __init__(self, maxsize: int = 4, policy: str = DROP_OLDEST, timeout: float = 1.0):
+        if policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown queue policy '{policy}'")
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, bundle: SensorBundle):
+        if self.policy == BLOCK:
+            try:
+                self._queue.put(bundle, timeout=self.timeout)
+                return
+            except queue.Full:
+                pass
+        while True:
+            try:
+                self._queue.put_nowait(bundle)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float = None) -> SensorBundle:
+        """
+        Waits for the next bundle, raises queue.Empty after timeout seconds
+        """
+        return self._queue.get(timeout=timeout)
+
+    def get_nowait(self) -> Optional[SensorBundle]:
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def latest(self) -> Optional[SensorBundle]:
+        """
+        Empties the queue and returns the newest bundle (None if empty)
+        """
+        bundle = None
+        while True:
+            newer = self.get_nowait()
+            if newer is None:
+                return bundle
+            bundle = newer
+
+    def __len__(self):
+        return self._queue.qsize()
+
+class _Registration(object):
+
+    __slots__ = ("name", "sensor", "last_timestamp", "lags", "arrivals", "late")
+
+    def __init__(self, name: str, sensor, window: int):
+        self.name = name
+        self.sensor = sensor
+        self.last_timestamp = None
+        self.lags = deque(maxlen=window)
+        self.arrivals = 0
+        self.late = 0
+
+    @property
+    def streaming(self) -> bool:
+        return getattr(self.sensor, "streaming", True)
+
+    def period(self) -> float:
+        actor = self.sensor.sensor
+        if actor is None:
+            return None
+        return float(actor.attributes.get("sensor_tick", 0.0))
+
+class SensorBus(object):
+    """
+    Collects the data of the sensors attached to a vehicle by frame and hands complete
+    per frame bundles to the subscribers, so behaviors see camera, radar, IMU, ... of
+    the same frame instead of whatever each sensor attribute currently holds.
+
+        bundles = vehicle.sensor_bus.subscribe(maxsize=2)
+        ...
+        bundle = bundles.latest()
+
+    A frame is opened by the first data that arrives for it or by advance() (called by
+    the vehicle every tick). Streaming sensors are expected in a frame if their
+    sensor_tick has elapsed since their last data, event sensors (collision, lane
+    invasion, streaming = False) are included when they arrive in time but never awaited.
+    A bundle is released as soon as all expected sensors delivered, or partial once it
+    is older than timeout seconds. Bundles are released in frame order, completing
+    frame N releases all older open frames as partial bundles.
+    Results computed from the data of an earlier frame (e.g. object detections) usually
+    arrive after that bundle was released, annotate() adds the newest one to every
+    following bundle, its frame tells which frame it was computed from.
+    """
+
+    def __init__(self, timeout: float = 0.1, window: int = 1000):
+        self.timeout = timeout
+        self.released = 0
+        self.partial = 0
+        self._window = window
+        self._lock = threading.Lock()
+        # released bundles in frame order, handed to the subscribers by one thread at a time
+        # outside of the lock, so a waiting subscriber never blocks the sensor threads
+        self._outbox = deque()
+        self._releasing = False
+        self._sensors: Dict[str, _Registration] = {}
+        self._open: Dict[int, SensorBundle] = {}
+        self._subscribers: List[BundleQueue] = []
+        self._annotations = {}
+        self._last_released = -1
+
+    def register(self, name: str, sensor):
+        """
+        Sensors deliver to the bus from SensorFrameGate after their own callback ran
+        """
+        with self._lock:
+            self._sensors[name] = _Registration(name, sensor, self._window)
+        sensor.bus = self
+        sensor.bus_name = name
+
+    def unregister(self, name: str):
+        with self._lock:
+            registration = self._sensors.pop(name, None)
+        if registration is not None:
+            registration.sensor.bus = None
+
+    def subscribe(self, maxsize: int = 4, policy: str = DROP_OLDEST, timeout: float = 1.0) -> BundleQueue:
+        bundles = BundleQueue(maxsize, policy, timeout)
+        with self._lock:
+            self._subscribers.append(bundles)
+        return bundles
+
+    def unsubscribe(self, bundles: BundleQueue):
+        with self._lock:
+            if bundles in self._subscribers:
+                self._subscribers.remove(bundles)
+
+    def publish(self, name: str, data):
+        now = time.perf_counter()
+        with self._lock:
+            registration = self._sensors.get(name)
+            if registration is None:
+                return
+            if data.frame <= self._last_released:
+                # too late, the bundle of this frame has already been handed out
+                registration.late += 1
+                return
+            bundle = self._open_bundle(data.frame, now)
+            bundle.timestamp = data.timestamp
+            registration.arrivals += 1
+            registration.lags.append(now - bundle.opened)
+            if registration.streaming:
+                registration.last_timestamp = data.timestamp
+            if name in bundle.data and isinstance(bundle.data[name], list):
+                bundle.data[name].append(data)
+            else:
+                # event sensors can deliver several events per frame
+                bundle.data[name] = data if registration.streaming else [data]
+            self._collect_ready(now)
+        self._release()
+
+    def annotate(self, name: str, data):
+        """
+        data (with a frame attribute) is added under name to the bundles of data.frame and
+        later until a newer one is annotated
+        """
+        with self._lock:
+            current = self._annotations.get(name)
+            if current is None or data.frame >= current.frame:
+                self._annotations[name] = data
+
+    def advance(self, frame: int, elapsed_seconds: float = None):
+        """
+        Called once per tick, opens the bundle of the client's frame and releases timed out ones
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if frame > self._last_released:
+                bundle = self._open_bundle(frame, now)
+                if bundle.timestamp is None:
+                    bundle.timestamp = elapsed_seconds
+            self._collect_ready(now)
+        self._release()
+
+    def clear(self):
+        """
+        Drops all open bundles, e.g. on a warm restart
+        """
+        with self._lock:
+            self._open = {}
+            self._outbox.clear()
+            self._annotations = {}
+            self._last_released = -1
+            for registration in self._sensors.values():
+                registration.last_timestamp = None
+
+    def close(self):
+        with self._lock:
+            for registration in self._sensors.values():
+                registration.sensor.bus = None
+            self._sensors = {}
+            self._open = {}
+            self._outbox.clear()
+            self._annotations = {}
+            self._subscribers = []
+
+    def _open_bundle(self, frame: int, now: float) -> SensorBundle:
+        bundle = self._open.get(frame)
+        if bundle is None:
+            bundle = SensorBundle(frame)
+            bundle.opened = now
+            self._open[frame] = bundle
+        return bundle
+
+    def _expected(self, bundle: SensorBundle) -> set:
+        expected = set()
+        for name, registration in self._sensors.items():
+            if not registration.streaming:
+                continue
+            period = registration.period()
+            if period is None:
+                # not spawned yet
+                continue
+            if name in bundle.data or registration.last_timestamp is None or bundle.timestamp is None \
+                or bundle.timestamp - registration.last_timestamp >= period - 1e-6:
+                expected.add(name)
+        return expected
+
+    def _collect_ready(self, now: float):
+        # called with the lock held, moves the bundles which are ready to the outbox
+        ready_frame = None
+        for frame in sorted(self._open.keys()):
+            bundle = self._open[frame]
+            bundle.expected = self._expected(bundle)
+            if len(bundle.missing) == 0 or now - bundle.opened >= self.timeout:
+                ready_frame = frame
+        if ready_frame is None:
+            return
+        for frame in sorted(f for f in self._open.keys() if f <= ready_frame):
+            bundle = self._open.pop(frame)
+            bundle.complete = len(bundle.missing) == 0
+            for name, data in self._annotations.items():
+                if data.frame <= frame:
+                    bundle.data[name] = data
+            if not bundle.complete:
+                self.partial += 1
+            self.released += 1
+            self._outbox.append(bundle)
+        self._last_released = ready_frame
+
+    def _release(self):
+        # the thread which finds the outbox idle delivers, including the bundles other
+        # threads add meanwhile, the others return at once
+        with self._lock:
+            if self._releasing:
+                return
+            self._releasing = True
+        while True:
+            with self._lock:
+                if len(self._outbox) == 0:
+                    self._releasing = False
+                    return
+                bundle = self._outbox.popleft()
+                subscribers = list(self._subscribers)
+            for bundles_queue in subscribers:
+                bundles_queue.put(bundle)
+
+    def lag_statistics(self) -> dict:
+        """
+        Returns {sensor: {"mean": ms, "max": ms, "count": n, "late": n}}, the arrival lag of each
+        sensor measured from the time its frame was first seen, over the last `window` arrivals.
+        late counts the data which arrived after the bundle of its frame had been released
+        """
+        with self._lock:
+            lags = {name: (list(r.lags), r.late) for name, r in self._sensors.items()}
+        stats = {}
+        for name, (values, late) in lags.items():
+            if len(values) == 0:
+                continue
+            stats[name] = {
+                "mean": 1000.0 * sum(values) / len(values),
+                "max": 1000.0 * max(values),
+                "count": len(values),
+                "late": late
+            }
+        return stats
+
+    def summary_lines(self):
+        lines = ['%-16s %6s %6s %5s' % ('Sensor lag (ms)', 'mean', 'max', 'late')]
+        for name, s in sorted(self.lag_statistics().items()):
+            lines.append('%-16.16s %6.1f %6.1f %5d' % (name, s["mean"], s["max"], s["late"]))
+        lines.append(f"{self.released} bundles, {self.partial} partial")
+        return lines
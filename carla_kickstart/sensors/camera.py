@@ -1,25 +1,30 @@
 from typing import List
 import carla
 import weakref
-import numpy as np
 from matplotlib import cm
 from carla_kickstart.config import config
-from carla_kickstart.sensors.object_detection import DetectedObject, ObjectDetectionSensor
+from carla_kickstart.sensors.object_detection import DetectedObject, DetectionResult, detection_service
+from carla_kickstart.sensors.detection_process import process_detection_service
+from carla_kickstart.sensors.tracking import IoUTracker
+from carla_kickstart.sensors.motion_gate import MotionGate
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.base import SensorBase, frame_gate
+from carla_kickstart.sensors.frames import SurfacePool, bgra_view, rgb_view
 import pygame
-from threading import Thread
 
 RENDER_SIZE = (320, 320)
+# the detection results of a camera are added to the sensor bundles as "<camera name>.detections"
+DETECTIONS_SUFFIX = ".detections"
 
-class CameraSensor(object):
+class CameraSensor(SensorBase):
 
     def __init__(self, parent_actor, with_object_detection = False):
-        self.sensor = None
-        self._parent = parent_actor
+        super().__init__(parent_actor)
         self.world = parent_actor.get_world()
 
-        self.font = pygame.font.Font(pygame.font.get_default_font(), 12)
+        self.font = None if config.headless else pygame.font.Font(pygame.font.get_default_font(), 12)
 
-        camera_bp = self.world.get_blueprint_library().find('sensor.camera.rgb')
+        camera_bp = actor_lifecycle.blueprint_library(self.world).find('sensor.camera.rgb')
         transform = carla.Transform(carla.Location(x=1.6, z=1.7)) # x=1.6, z=1.7
 
         camera_bp.set_attribute('image_size_x', str(RENDER_SIZE[0]))
@@ -28,48 +33,104 @@ class CameraSensor(object):
         #    camera_bp.set_attribute('gamma', str(gamma_correction))
 
         self.surface = pygame.Surface((0, 0))
+        self.surface_pool = SurfacePool()
 
-        self.sensor = self.world.spawn_actor(camera_bp, transform, attach_to=parent_actor, attachment_type = carla.AttachmentType.Rigid)
-
+        self.last_frame = None
         self.detections: List[DetectedObject] = []
+        # result the detections belong to, its frame is usually a few frames behind self.frame
+        self.detection_result: DetectionResult = None
+        # camera frames seen with object detection enabled, gated or not
+        self.detection_frames = 0
 
         weak_self = weakref.ref(self)
 
         if with_object_detection:
-            self.last_frame = None
-            self.object_detection = ObjectDetectionSensor()
-            thread = Thread(target=run_detection, args=(weak_self,))
-            thread.start()
+            # all cameras share one detector and are detected in one batch
+            service = process_detection_service if config.detection_process else detection_service
+            self.detection_client = service.register(lambda result: CameraSensor._detection_callback(weak_self, result))
+            # detect-then-track, the detector only runs every few frames
+            self.tracker = IoUTracker() if config.tracking else None
+            # skips the detection (and keeps the previous detections) while the scene is static
+            self.motion_gate = MotionGate() if config.motion_gate else None
         else:
-            self.object_detection = None
+            self.detection_client = None
+            self.tracker = None
+            self.motion_gate = None
+
+        self._spawn(camera_bp, transform, attachment_type = carla.AttachmentType.Rigid)
 
-        self.sensor.listen(lambda image: CameraSensor._camera_callback(weak_self, image))
+    def _listen(self, sensor):
+        weak_self = weakref.ref(self)
+        sensor.listen(lambda image: frame_gate.dispatch(weak_self, CameraSensor._camera_callback, image))
+
+    def reset(self):
+        self.detections = []
+        self.detection_result = None
+        if self.detection_client is not None:
+            self.detection_client.clear()
+        if self.tracker is not None:
+            self.tracker.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def release(self):
+        if self.detection_client is not None:
+            self.detection_client.close()
+            self.detection_client = None
+
+    @staticmethod
+    def _detection_callback(weak_self, result: DetectionResult):
+        self = weak_self()
+        if self is None:
+            return
+        if self.detection_result is not None and result.frame <= self.detection_result.frame:
+            return
+        if self.tracker is not None:
+            result = DetectionResult(result.frame, self.tracker.update(result.frame, result.detections), result.latency, result.inference)
+        self.detection_result = result
+        self.detections = result.detections
+        if self.bus is not None:
+            # behaviors find it in the bundles of result.frame and later
+            self.bus.annotate(self.bus_name + DETECTIONS_SUFFIX, result)
+
+    def detection_summary_lines(self):
+        if self.detection_client is None:
+            return []
+        lines = self.detection_client.summary_lines()
+        if self.tracker is not None:
+            # the tracker only sees the frames which passed the motion gate
+            lines += self.tracker.summary_lines(self.detection_frames)
+        if self.motion_gate is not None:
+            lines += self.motion_gate.summary_lines()
+        return lines
 
     @staticmethod
     def _camera_callback(weak_self, image):
         self = weak_self()
 
         image.convert(carla.ColorConverter.Raw)
-        array = np.frombuffer(image.raw_data, dtype=np.dtype("uint8"))
-        array = np.reshape(array, (image.height, image.width, 4))
-        array = array[:, :, :3]
-        array = array[:, :, ::-1]
-
-        self.last_frame = array
-        self.surface = pygame.surfarray.make_surface(array.swapaxes(0, 1))
-
-        if self.object_detection is not None:
+        bgra = bgra_view(image)
+
+        # read-only RGB view on the image buffer, consumers must copy before modifying it
+        self.last_frame = rgb_view(bgra)
+        if self.detection_client is not None:
+            self.detection_frames += 1
+            static = self.motion_gate is not None and not self.motion_gate.changed(self.last_frame)
+            if not static:
+                if self.tracker is None or self.tracker.needs_detection(image.frame):
+                    self.detection_client.submit(image.frame, self.last_frame)
+                    if self.motion_gate is not None:
+                        self.motion_gate.accept()
+                if self.tracker is not None:
+                    self.detections = self.tracker.predict(image.frame)
+        if config.headless:
+            return
+
+        self.surface = self.surface_pool.blit(bgra)
+
+        if self.detection_client is not None:
             for d in self.detections:
                 pygame.draw.rect(self.surface, (0, 0, 255), d.rect, 1)
 
                 text = self.font.render(d.class_name, True, (0, 0, 255))
                 self.surface.blit(text, (d.rect[0], d.rect[1]))
-
-def run_detection(weak_self):
-    self = weak_self()
-
-    while True:
-        if self.last_frame is not None:
-            image = self.last_frame
-            detections = self.object_detection.detect(image, RENDER_SIZE)
-            self.detections = detections
\ No newline at end of file
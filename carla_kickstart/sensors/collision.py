@@ -3,20 +3,29 @@ import weakref
 import collections
 import math
 from carla_kickstart.carla_utils import get_actor_display_name
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.base import SensorBase, frame_gate
+
+class CollisionSensor(SensorBase):
+
+    streaming = False
 
-class CollisionSensor(object):
     def __init__(self, parent_actor):
-        self.sensor = None
+        super().__init__(parent_actor)
         self.history = []
-        self._parent = parent_actor
         # self.hud = hud
         world = self._parent.get_world()
-        bp = world.get_blueprint_library().find('sensor.other.collision')
-        self.sensor = world.spawn_actor(bp, carla.Transform(), attach_to=self._parent)
+        bp = actor_lifecycle.blueprint_library(world).find('sensor.other.collision')
+        self._spawn(bp, carla.Transform())
+
+    def _listen(self, sensor):
         # We need to pass the lambda a weak reference to self to avoid circular
         # reference.
         weak_self = weakref.ref(self)
-        self.sensor.listen(lambda event: CollisionSensor._on_collision(weak_self, event))
+        sensor.listen(lambda event: frame_gate.dispatch(weak_self, CollisionSensor._on_collision, event))
+
+    def reset(self):
+        self.history = []
 
     def get_collision_history(self):
         history = collections.defaultdict(int)
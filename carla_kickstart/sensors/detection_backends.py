@@ -0,0 +1,158 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+from carla_kickstart.config import config
+
+# model variants by backend, paths are relative to config.detection_model_dir
+MODEL_VARIANTS = {
+    "opencv": {
+        "yolov3": ("yolov3.cfg", "yolov3.weights"),
+        "yolov3-tiny": ("yolov3-tiny.cfg", "yolov3-tiny.weights"),
+        "yolov4": ("yolov4.cfg", "yolov4.weights"),
+        "yolov4-tiny": ("yolov4-tiny.cfg", "yolov4-tiny.weights"),
+    },
+    "onnxruntime": {
+        "yolov5n": ("yolov5n.onnx",),
+        "yolov5s": ("yolov5s.onnx",),
+        "yolov8n": ("yolov8n.onnx",),
+    },
+}
+
+class DetectorBackend(ABC):
+    """
+    Runs a YOLO network on a batch of images. The model is loaded on the first forward
+    pass (or an explicit load()), not when the backend is created.
+    forward() returns the outputs of all heads with one row per candidate box:
+    (center x, center y, w, h, objectness, class scores...) with coordinates relative to
+    the input size and class scores already multiplied by the objectness
+    """
+
+    def __init__(self, model: str, input_size: Tuple[int, int], threads: int):
+        self.model = model
+        self.input_size = input_size
+        # 0 uses the library default
+        self.threads = threads
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def forward(self, images) -> List[np.ndarray]:
+        """
+        images are RGB uint8 arrays of any size, they are resized to input_size.
+        The outputs have a leading batch dimension
+        """
+        self.load()
+        blob = cv2.dnn.blobFromImages(images, 1/255, self.input_size, (0, 0, 0), False, crop = False)
+        return self._forward(blob, len(images))
+
+    def _model_files(self) -> List[str]:
+        variants = MODEL_VARIANTS[self.name]
+        if self.model not in variants:
+            raise ValueError(f"Unknown model '{self.model}' for backend '{self.name}', available: {sorted(variants.keys())}")
+        return [os.path.join(config.detection_model_dir, f) for f in variants[self.model]]
+
+    @abstractmethod
+    def _load(self):
+        pass
+
+    @abstractmethod
+    def _forward(self, blob: np.ndarray, batch_size: int) -> List[np.ndarray]:
+        pass
+
+class OpenCVDnnBackend(DetectorBackend):
+    """
+    Darknet models through cv2.dnn
+    """
+
+    name = "opencv"
+
+    def _load(self):
+        model_cfg, model_weights = self._model_files()
+        if self.threads > 0:
+            cv2.setNumThreads(self.threads)
+        self.net = cv2.dnn.readNet(model_weights, model_cfg)
+        #self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+        #self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+        self.output_layers = self.net.getUnconnectedOutLayersNames()
+
+    def _forward(self, blob, batch_size):
+        self.net.setInput(blob)
+        outs = self.net.forward(self.output_layers)
+        # the heads either have a batch dimension or stack the rows of all images
+        return [out.reshape(batch_size, -1, out.shape[-1]) for out in outs]
+
+class OnnxRuntimeBackend(DetectorBackend):
+    """
+    ONNX exports of YOLOv5/YOLOv8 on the CPU execution provider of ONNX Runtime.
+    Their outputs are in pixels of the input size, YOLOv8 has no objectness column and
+    (batch, 4 + classes, rows) layout, both are converted to the common row format
+    """
+
+    name = "onnxruntime"
+
+    def _load(self):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("The onnxruntime detection backend needs the onnxruntime package (pip install onnxruntime)")
+        model_file, = self._model_files()
+        options = onnxruntime.SessionOptions()
+        if self.threads > 0:
+            options.intra_op_num_threads = self.threads
+        self.session = onnxruntime.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _forward(self, blob, batch_size):
+        outs = self.session.run(None, {self.input_name: blob})
+        return [self._to_rows(out) for out in outs[:1]]
+
+    def _to_rows(self, out: np.ndarray) -> np.ndarray:
+        out = out.reshape(out.shape[0], out.shape[1], -1)
+        if self.model.startswith("yolov8"):
+            # (batch, 4 + classes, rows) without objectness
+            out = out.transpose(0, 2, 1)
+            out = np.concatenate([out[:, :, :4], np.ones_like(out[:, :, :1]), out[:, :, 4:]], axis=2)
+        else:
+            out = out.copy()
+            out[:, :, 5:] *= out[:, :, 4:5]
+        out[:, :, (0, 2)] /= self.input_size[0]
+        out[:, :, (1, 3)] /= self.input_size[1]
+        return out
+
+BACKENDS = {
+    OpenCVDnnBackend.name: OpenCVDnnBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+}
+
+_shared_backends = {}
+_shared_lock = threading.Lock()
+
+def shared_backend(backend: str = None, model: str = None, input_size: Tuple[int, int] = None, threads: int = None) -> DetectorBackend:
+    """
+    Returns the backend for these settings (defaults from config), every combination is
+    created (and its model loaded) only once per process
+    """
+    backend = config.detection_backend if backend is None else backend
+    model = config.detection_model if model is None else model
+    input_size = tuple(config.detection_input_size if input_size is None else input_size)
+    threads = config.detection_threads if threads is None else threads
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detection backend '{backend}', available: {sorted(BACKENDS.keys())}")
+    key = (backend, model, input_size, threads)
+    with _shared_lock:
+        if key not in _shared_backends:
+            _shared_backends[key] = BACKENDS[backend](model, input_size, threads)
+        return _shared_backends[key]
@@ -0,0 +1,262 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List
+
+import numpy as np
+from carla_kickstart.config import config
+from carla_kickstart.sensors.object_detection import DetectedObject, DetectionClient, DetectionResult, ObjectDetectionSensor
+
+# config attributes the worker process needs, it starts with a fresh config module
+DETECTION_SETTINGS = [
+    "detection_classes", "detection_score_threshold", "detection_nms_threshold", "detection_backend",
+    "detection_model", "detection_model_dir", "detection_input_size", "detection_threads",
+    "detection_regions", "detection_tiles", "detection_tile_overlap"
+]
+
+logger = logging.getLogger(__name__)
+
+class SharedFrameRing(object):
+    """
+    Fixed number of frame slots in shared memory plus one busy flag per slot.
+    The client sets a flag when it wrote a frame into the slot, the worker process clears
+    it when it is done with the frame, so each flag has a single writer per transition
+    """
+
+    def __init__(self, slots: int, slot_size, name: str = None):
+        self.slots = slots
+        self.slot_bytes = slot_size[0] * slot_size[1] * 3
+        create = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=create, size=slots * (self.slot_bytes + 1))
+        self.busy = np.ndarray((slots,), dtype=np.uint8, buffer=self.memory.buf, offset=0)
+        self._frames = np.ndarray((slots, self.slot_bytes), dtype=np.uint8, buffer=self.memory.buf, offset=slots)
+        if create:
+            self.busy[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def write(self, image: np.ndarray) -> int:
+        """
+        Copies the frame into a free slot and marks it busy, returns the slot or -1 if all are busy
+        """
+        if image.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {image.shape} does not fit into the slots of the detection ring")
+        free = np.flatnonzero(self.busy == 0)
+        if len(free) == 0:
+            return -1
+        slot = int(free[0])
+        np.copyto(self.view(slot, image.shape), image)
+        self.busy[slot] = 1
+        return slot
+
+    def view(self, slot: int, shape) -> np.ndarray:
+        return self._frames[slot, :int(np.prod(shape))].reshape(shape)
+
+    def release(self, slot: int):
+        self.busy[slot] = 0
+
+    def close(self, unlink: bool = False):
+        # the numpy views must be gone before the memory can be closed
+        self.busy = None
+        self._frames = None
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+def _detection_process(requests, results, ring_name: str, slots: int, slot_size, settings: dict):
+    """
+    Worker process: waits for frames, keeps the newest frame of every client and runs
+    them as one batch, sends back (inference ms, [(client, frame, detections)]).
+    Replaced frames and the frames of a failed batch are answered with detections None.
+    Errors are sent as (message, traceback) to be logged by the receiver, a detector
+    which cannot be loaded ends the worker
+    """
+    for name, value in settings.items():
+        setattr(config, name, value)
+    ring = SharedFrameRing(slots, slot_size, ring_name)
+    try:
+        try:
+            detector = ObjectDetectionSensor()
+            # the worker only exists to detect, load the model before the first frame
+            detector.backend.load()
+        except Exception:
+            results.put(("Could not load the object detector", traceback.format_exc()))
+            return
+
+        stopped = False
+        while not stopped:
+            pending = {}
+            request = requests.get()
+            while True:
+                if request is None:
+                    stopped = True
+                    break
+                client_id, frame, slot, shape = request
+                if client_id in pending:
+                    _, old_frame, old_slot, _ = pending[client_id]
+                    ring.release(old_slot)
+                    results.put((0.0, [(client_id, old_frame, None)]))
+                pending[client_id] = request
+                try:
+                    request = requests.get_nowait()
+                except queue.Empty:
+                    break
+            if stopped or len(pending) == 0:
+                continue
+
+            batch = list(pending.values())
+            start = time.perf_counter()
+            try:
+                # the detector reads the frames straight from the shared memory
+                detections = detector.detect_batch([ring.view(slot, shape) for _, _, slot, shape in batch])
+            except Exception:
+                results.put((f"Object detection failed on a batch of {len(batch)} frames", traceback.format_exc()))
+                results.put((0.0, [(client_id, frame, None) for client_id, frame, _, _ in batch]))
+                continue
+            finally:
+                for _, _, slot, _ in batch:
+                    ring.release(slot)
+            inference = 1000.0 * (time.perf_counter() - start)
+            results.put((inference, [(client_id, frame, [(d.rect, d.class_name, d.score) for d in frame_detections])
+                for (client_id, frame, _, _), frame_detections in zip(batch, detections)]))
+    finally:
+        ring.close()
+        results.put(None)
+
+class ProcessDetectionService(object):
+    """
+    Runs the detector in a separate worker process, so inference and its post-processing
+    do not compete with the main loop for the GIL. Same interface as DetectionService.
+    submit() copies the frame into a slot of a shared memory ring and only sends the
+    slot index, the worker sends back compact results which a receiver thread passes on
+    to the cameras. Nothing on the submitting side waits for the worker, if all slots are
+    in use the frame is skipped.
+    The worker process is started on the first registration and stopped when the last
+    camera unregistered, it loads the model itself (once per worker process)
+    """
+
+    def __init__(self, window: int = 100):
+        self.batches = 0
+        self._window = window
+        self._batch_sizes = deque(maxlen=window)
+        self._condition = threading.Condition()
+        self._clients: Dict[int, DetectionClient] = {}
+        self._next_id = 0
+        self._in_flight = {}
+        self._ring = None
+        self._process = None
+        self._receiver = None
+        self._requests = None
+        self._results = None
+
+    def register(self, on_result: Callable[[DetectionResult], None]) -> DetectionClient:
+        with self._condition:
+            client = DetectionClient(self, on_result, self._window)
+            client.client_id = self._next_id
+            self._next_id += 1
+            self._clients[client.client_id] = client
+            if self._process is None:
+                self._start()
+            return client
+
+    def unregister(self, client: DetectionClient, timeout: float = 1.0):
+        with self._condition:
+            if self._clients.pop(getattr(client, "client_id", None), None) is None:
+                return
+            if len(self._clients) > 0:
+                return
+            process, receiver, ring, results = self._process, self._receiver, self._ring, self._results
+            self._process = None
+            self._receiver = None
+            self._ring = None
+            self._requests.put(None)
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout)
+        if process.exitcode != 0:
+            # the worker was terminated or died without sending the end marker the receiver waits for
+            results.put(None)
+        if receiver is not threading.current_thread():
+            receiver.join(timeout)
+        ring.close(unlink=True)
+        with self._condition:
+            if self._process is None:
+                # drop the queues so their semaphores are released
+                self._requests = None
+                self._results = None
+
+    def mean_batch_size(self) -> float:
+        with self._condition:
+            if len(self._batch_sizes) == 0:
+                return 0.0
+            return sum(self._batch_sizes) / len(self._batch_sizes)
+
+    def __len__(self):
+        return len(self._clients)
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        self._ring = SharedFrameRing(config.detection_ring_slots, config.detection_ring_slot_size)
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._in_flight = {}
+        settings = {name: getattr(config, name) for name in DETECTION_SETTINGS}
+        self._process = context.Process(target=_detection_process, name="object-detection",
+            args=(self._requests, self._results, self._ring.name, self._ring.slots, config.detection_ring_slot_size, settings),
+            daemon=True)
+        self._process.start()
+        self._receiver = threading.Thread(target=self._receive, args=(self._results,), name="object-detection-results", daemon=True)
+        self._receiver.start()
+
+    def _submit(self, client: DetectionClient, frame: int, image):
+        with self._condition:
+            if self._clients.get(client.client_id) is not client or frame <= client._last_frame:
+                return
+            slot = self._ring.write(image)
+            if slot < 0:
+                client.skipped += 1
+                return
+            client._last_frame = frame
+            self._in_flight[(client.client_id, frame)] = time.perf_counter()
+            self._requests.put((client.client_id, frame, slot, image.shape))
+
+    def _receive(self, results):
+        while True:
+            message = results.get()
+            if message is None:
+                return
+            if isinstance(message[0], str):
+                logger.error("%s (detection worker)\n%s", *message)
+                continue
+            inference, batch = message
+            now = time.perf_counter()
+            delivered = []
+            with self._condition:
+                for client_id, frame, detections in batch:
+                    submitted = self._in_flight.pop((client_id, frame), now)
+                    client = self._clients.get(client_id)
+                    if client is None:
+                        continue
+                    if detections is None:
+                        # replaced by a newer frame in the worker
+                        client.skipped += 1
+                        continue
+                    result = DetectionResult(frame, [DetectedObject(rect, class_name, score) for rect, class_name, score in detections],
+                        1000.0 * (now - submitted), inference)
+                    client._record(result, now)
+                    delivered.append((client, result))
+                if inference > 0.0:
+                    self.batches += 1
+                    self._batch_sizes.append(len(batch))
+            for client, result in delivered:
+                client._on_result(result)
+
+process_detection_service = ProcessDetectionService()
@@ -0,0 +1,51 @@
+import numpy as np
+import pygame
+
+def bgra_view(image) -> np.ndarray:
+    """
+    Read-only (height, width, 4) BGRA view on the raw data of a carla.Image, no copy.
+    The view keeps the image buffer alive for as long as it is referenced
+    """
+    array = np.frombuffer(image.raw_data, dtype=np.uint8).reshape((image.height, image.width, 4))
+    array.flags.writeable = False
+    return array
+
+def rgb_view(bgra: np.ndarray) -> np.ndarray:
+    """
+    (height, width, 3) RGB view on a BGRA array, no copy
+    """
+    return bgra[:, :, 2::-1]
+
+class SurfacePool(object):
+    """
+    Preallocated pygame surfaces backed by numpy BGRA buffers. blit() copies a frame
+    into the next surface of the pool with a single memcpy and returns it, the surface
+    returned by the previous call stays untouched while it is being rendered.
+    Buffers are only reallocated when the frame size changes
+    """
+
+    def __init__(self, count: int = 2):
+        self.count = count
+        # number of times the buffers were (re)allocated
+        self.allocations = 0
+        self._size = None
+        self._buffers = []
+        self._surfaces = []
+        self._next = 0
+
+    def blit(self, bgra: np.ndarray) -> pygame.Surface:
+        height, width = bgra.shape[:2]
+        if self._size != (width, height):
+            self._allocate(width, height)
+        index = self._next
+        self._next = (index + 1) % self.count
+        np.copyto(self._buffers[index], bgra)
+        return self._surfaces[index]
+
+    def _allocate(self, width: int, height: int):
+        self._size = (width, height)
+        self.allocations += 1
+        self._buffers = [np.zeros((height, width, 4), dtype=np.uint8) for _ in range(self.count)]
+        # the surfaces share the memory of the numpy buffers
+        self._surfaces = [pygame.image.frombuffer(buffer, (width, height), 'BGRA') for buffer in self._buffers]
+        self._next = 0
@@ -0,0 +1,35 @@
+import numpy as np
+
+def segment_ground(points: np.ndarray, cell_size: float = 0.5, height_threshold: float = 0.25,
+                   max_ground_z: float = -0.5, extent: float = 50.0) -> np.ndarray:
+    """
+    Labels the points of a sweep (sensor coordinates, z up) as ground, in O(n).
+    The points are binned into a cartesian grid of cell_size cells (points beyond +-extent
+    go to the border cells), the lowest z of every cell is taken as its ground height and
+    smoothed with the 3x3 neighborhood (a cell may be covered by an obstacle only).
+    A point is ground if it is less than height_threshold above the ground height of its
+    cell, cells whose ground height is above max_ground_z (relative to the sensor) have no
+    ground. Follows slopes as long as they rise less than height_threshold per cell.
+    Returns a boolean mask
+    """
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    xy = np.clip(points[:, :2], -extent, extent - 1e-3)
+    low = xy.min(axis=0)
+    cells = np.floor((xy - low) / cell_size).astype(np.int64)
+    nx, ny = cells.max(axis=0) + 1
+    index = cells[:, 0] * ny + cells[:, 1]
+
+    z = points[:, 2]
+    lowest = np.full(nx * ny, np.inf, dtype=np.float32)
+    np.minimum.at(lowest, index, z)
+
+    padded = np.full((nx + 2, ny + 2), np.inf, dtype=np.float32)
+    padded[1:-1, 1:-1] = lowest.reshape(nx, ny)
+    ground = padded[1:-1, 1:-1].copy()
+    for dx in (0, 1, 2):
+        for dy in (0, 1, 2):
+            np.minimum(ground, padded[dx:dx + nx, dy:dy + ny], out=ground)
+    ground = ground.reshape(-1)[index]
+
+    return (z - ground < height_threshold) & (ground <= max_ground_z)
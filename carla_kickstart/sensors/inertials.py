@@ -1,23 +1,25 @@
 import carla
 import weakref
 import math
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.base import SensorBase, frame_gate
 
-class IMUSensor(object):
+class IMUSensor(SensorBase):
     def __init__(self, parent_actor):
-        self.sensor = None
-        self._parent = parent_actor
+        super().__init__(parent_actor)
         self.accelerometer = (0.0, 0.0, 0.0)
         self.gyroscope = (0.0, 0.0, 0.0)
         self.compass = 0.0
         world = self._parent.get_world()
-        bp = world.get_blueprint_library().find('sensor.other.imu')
-        self.sensor = world.spawn_actor(
-            bp, carla.Transform(), attach_to=self._parent)
+        bp = actor_lifecycle.blueprint_library(world).find('sensor.other.imu')
+        self._spawn(bp, carla.Transform())
+
+    def _listen(self, sensor):
         # We need to pass the lambda a weak reference to self to avoid circular
         # reference.
         weak_self = weakref.ref(self)
-        self.sensor.listen(
-            lambda sensor_data: IMUSensor._IMU_callback(weak_self, sensor_data))
+        sensor.listen(
+            lambda sensor_data: frame_gate.dispatch(weak_self, IMUSensor._IMU_callback, sensor_data))
 
     @staticmethod
     def _IMU_callback(weak_self, sensor_data):
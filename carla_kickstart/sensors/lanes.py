@@ -1,20 +1,26 @@
 import carla
 import weakref
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.base import SensorBase, frame_gate
+
+class LaneInvasionSensor(SensorBase):
+
+    streaming = False
 
-class LaneInvasionSensor(object):
     def __init__(self, parent_actor):
-        self.sensor = None
+        super().__init__(parent_actor)
 
         # If the spawn object is not a vehicle, we cannot use the Lane Invasion Sensor
         if parent_actor.type_id.startswith("vehicle."):
-            self._parent = parent_actor
             world = self._parent.get_world()
-            bp = world.get_blueprint_library().find('sensor.other.lane_invasion')
-            self.sensor = world.spawn_actor(bp, carla.Transform(), attach_to=self._parent)
-            # We need to pass the lambda a weak reference to self to avoid circular
-            # reference.
-            weak_self = weakref.ref(self)
-            self.sensor.listen(lambda event: LaneInvasionSensor._on_invasion(weak_self, event))
+            bp = actor_lifecycle.blueprint_library(world).find('sensor.other.lane_invasion')
+            self._spawn(bp, carla.Transform())
+
+    def _listen(self, sensor):
+        # We need to pass the lambda a weak reference to self to avoid circular
+        # reference.
+        weak_self = weakref.ref(self)
+        sensor.listen(lambda event: frame_gate.dispatch(weak_self, LaneInvasionSensor._on_invasion, event))
 
     @staticmethod
     def _on_invasion(weak_self, event):
@@ -1,20 +1,27 @@
 import carla
 import weakref
 import numpy as np
+from typing import List
 from carla_kickstart.config import config
 import pygame
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.base import SensorBase, frame_gate
+from carla_kickstart.sensors.bev import BevRasterizer
+from carla_kickstart.sensors.ground import segment_ground
+from carla_kickstart.sensors.obstacles import Obstacle, ObstacleClusterer
+from carla_kickstart.sensors.point_cloud import SweepAccumulator
+from carla_kickstart.sensors.range_image import RangeImage
 
 
 RENDER_SIZE = (320, 320)
 
-class LidarSensor(object):
+class LidarSensor(SensorBase):
 
     def __init__(self, parent_actor):
-        self.sensor = None
-        self._parent = parent_actor
+        super().__init__(parent_actor)
         self.world = parent_actor.get_world()
 
-        lidar_bp = self.world.get_blueprint_library().find('sensor.lidar.ray_cast')
+        lidar_bp = actor_lifecycle.blueprint_library(self.world).find('sensor.lidar.ray_cast')
         self.range = 15
         lidar_bp.set_attribute('range', str(self.range))
         lidar_bp.set_attribute('dropoff_general_rate', '0')
@@ -30,51 +37,75 @@ class LidarSensor(object):
         transform = carla.Transform(carla.Location(x=0, z=1.8))
 
         self.surface = pygame.Surface((0, 0))
-        self.frame = 0
+        self.sweeps = 0
+        # (n, 4) x, y, z, intensity view on the data of the last sweep
+        self.points = np.zeros((0, 4), dtype=np.float32)
+        self.ground = np.zeros(0, dtype=bool)
+        # occupancy, max height and intensity grids of the last sweep, read them via one bev.grids reference
+        self.bev = BevRasterizer(RENDER_SIZE, self.range)
+        # non-ground point clusters of the last sweep, nearest first, empty unless config.lidar_obstacles
+        self.obstacles: List[Obstacle] = []
+        self.clusterer = ObstacleClusterer(self.bev, config.lidar_cluster_cell_size, config.lidar_cluster_min_points)
+        # the last few sweeps in the frame of the newest one, accumulated_points() / downsampled_points()
+        self.accumulator = SweepAccumulator(config.lidar_sweeps, config.lidar_voxel_size)
+        # channel x azimuth ranges of the last sweep, None unless config.lidar_range_image
+        self.range_image = None
+        if config.lidar_range_image:
+            channels = lidar_bp.get_attribute('channels').as_int()
+            # one column per point of a channel during a full rotation
+            columns = lidar_bp.get_attribute('points_per_second').as_int() / (channels * lidar_bp.get_attribute('rotation_frequency').as_float())
+            self.range_image = RangeImage(channels, lidar_bp.get_attribute('upper_fov').as_float(),
+                lidar_bp.get_attribute('lower_fov').as_float(), max(1, int(columns)), self.range)
+
+        self._spawn(lidar_bp, transform)
+
+    def _listen(self, sensor):
+        weak_self = weakref.ref(self)
+        sensor.listen(lambda point_cloud: frame_gate.dispatch(weak_self, LidarSensor._lidar_callback, point_cloud))
 
-        self.sensor = self.world.spawn_actor(lidar_bp, transform, attach_to=parent_actor)
+    def reset(self):
+        self.accumulator.clear()
+        self.obstacles = []
 
-        weak_self = weakref.ref(self)
-        self.sensor.listen(lambda point_cloud: LidarSensor._lidar_callback(weak_self, point_cloud))
+    def obstacles_ahead(self, distance: float, half_width: float = 1.5) -> List[Obstacle]:
+        """
+        Obstacles of the last sweep in the corridor of half_width meters in front of the sensor, up to distance meters
+        """
+        # the callback replaces the list, it is never modified
+        obstacles = self.obstacles
+        return [o for o in obstacles if 0.0 < o.centroid[0] + o.extent[0] and o.range <= distance
+            and abs(o.centroid[1]) - o.extent[1] <= half_width]
+
+    def accumulated_points(self) -> np.ndarray:
+        return self.accumulator.points()
+
+    def downsampled_points(self) -> np.ndarray:
+        return self.accumulator.downsampled()
 
     @staticmethod
     def _lidar_callback(weak_self, point_cloud):
         """
-        Prepares a point cloud with intensity
-        colors ready to be consumed by Open3D
+        Keeps a view on the points of the sweep, rasterizes the non-ground
+        points into the bird's-eye view grids and clusters them into obstacles.
+        Runs on the sensor thread, results are only published by assigning new objects
         """
         self = weak_self()
+        self.sweeps += 1
 
-        disp_size = RENDER_SIZE
-        lidar_range = 2.0*self.range
-
-        # 2D top view
         points = np.frombuffer(point_cloud.raw_data, dtype=np.dtype('f4'))
-        points = points.reshape((int(points.shape[0] / 4), 4)) # (x, y, z, intensity)
-
-        # simple ground segmentation
-        ground_threshold = -1.5
-        ground_indices = np.where(points[:,2] < ground_threshold)[0]
-        points = np.delete(points, ground_indices, axis = 0)
-
-        # map point cloud to 2d space (by dropping z)
-        lidar_data = np.array(points[:, :2])
-        lidar_data *= min(disp_size) / lidar_range
-        lidar_data += (0.5 * disp_size[0], 0.5 * disp_size[1])
-        lidar_data = np.fabs(lidar_data)  # pylint: disable=E1111
-        lidar_data = lidar_data.astype(np.int32)
-        #lidar_data = np.reshape(lidar_data, (-1, 2))
-        lidar_img_size = (disp_size[0], disp_size[1], 3)
-
-        lidar_img = np.zeros((lidar_img_size), dtype=np.uint8)
-
-        #z = points[:,2]
-        #col = (z - np.min(z)) / (np.max(z) - np.min(z)) * 255
-
-        #lidar_img[lidar_data[:,0], lidar_data[:,1], 1] = col
-
-        lidar_img[tuple(lidar_data.T)] = (255, 255, 255)
-
-        self.surface = pygame.surfarray.make_surface(lidar_img)
-
-        self.frame += 1
\ No newline at end of file
+        self.points = points.reshape((int(points.shape[0] / 4), 4)) # (x, y, z, intensity)
+        self.accumulator.add(self.points, point_cloud.transform)
+        if self.range_image is not None:
+            self.range_image.project(self.points)
+
+        # True for the points of self.points which belong to the ground
+        self.ground = segment_ground(self.points, config.lidar_ground_cell_size, config.lidar_ground_height_threshold, config.lidar_ground_max_z)
+        grids = self.bev.rasterize(self.points, ~self.ground)
+        if config.lidar_obstacles:
+            self.obstacles = self.clusterer.cluster(self.points, grids)
+
+        if config.headless:
+            # the 2D top view is only used by the HUD
+            return
+
+        self.surface = self.bev.render()
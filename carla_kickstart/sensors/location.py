@@ -1,19 +1,22 @@
 import carla
 import weakref
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.base import SensorBase, frame_gate
 
-class GnssSensor(object):
+class GnssSensor(SensorBase):
     def __init__(self, parent_actor):
-        self.sensor = None
-        self._parent = parent_actor
+        super().__init__(parent_actor)
         self.lat = 0.0
         self.lon = 0.0
         world = self._parent.get_world()
-        bp = world.get_blueprint_library().find('sensor.other.gnss')
-        self.sensor = world.spawn_actor(bp, carla.Transform(carla.Location(x=1.0, z=2.8)), attach_to=self._parent)
+        bp = actor_lifecycle.blueprint_library(world).find('sensor.other.gnss')
+        self._spawn(bp, carla.Transform(carla.Location(x=1.0, z=2.8)))
+
+    def _listen(self, sensor):
         # We need to pass the lambda a weak reference to self to avoid circular
         # reference.
         weak_self = weakref.ref(self)
-        self.sensor.listen(lambda event: GnssSensor._on_gnss_event(weak_self, event))
+        sensor.listen(lambda event: frame_gate.dispatch(weak_self, GnssSensor._on_gnss_event, event))
 
     @staticmethod
     def _on_gnss_event(weak_self, event):
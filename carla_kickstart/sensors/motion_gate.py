@@ -0,0 +1,63 @@
+import numpy as np
+from carla_kickstart.config import config
+
+LUMINANCE = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+class MotionGate(object):
+    """
+    Cheap change detector in front of the object detection. Frames are compared on a
+    downsampled grayscale version (every n-th pixel, about `size` pixels wide) with the
+    last frame which went to the detector. The scene counts as changed if more than
+    `threshold` of the pixels differ by more than `pixel_delta` gray levels, or if the
+    detector has not run for `max_static` frames.
+
+        if gate.changed(frame):
+            submit(frame)
+            gate.accept()
+    """
+
+    def __init__(self, threshold: float = None, pixel_delta: int = None, size: int = None, max_static: int = None):
+        self.threshold = config.motion_gate_threshold if threshold is None else threshold
+        self.pixel_delta = config.motion_gate_pixel_delta if pixel_delta is None else pixel_delta
+        self.size = config.motion_gate_size if size is None else size
+        self.max_static = config.motion_gate_max_static if max_static is None else max_static
+        self.frames = 0
+        self.static_frames = 0
+        self.detector_runs = 0
+        self._reference = None
+        self._current = None
+        self._static = 0
+
+    def reset(self):
+        self._reference = None
+        self._current = None
+        self._static = 0
+
+    def changed(self, image: np.ndarray) -> bool:
+        """
+        image is a RGB frame, False if it is close enough to the last accepted frame
+        to reuse its detections
+        """
+        self.frames += 1
+        step = max(1, image.shape[1] // self.size)
+        self._current = image[::step, ::step] @ LUMINANCE
+        reference = self._reference
+        if reference is None or reference.shape != self._current.shape or self._static >= self.max_static:
+            return True
+        if np.count_nonzero(np.abs(self._current - reference) > self.pixel_delta) > self.threshold * reference.size:
+            return True
+        self._static += 1
+        self.static_frames += 1
+        return False
+
+    def accept(self):
+        """
+        The frame passed to the last changed() call went to the detector
+        """
+        self._reference = self._current
+        self._static = 0
+        self.detector_runs += 1
+
+    def summary_lines(self):
+        ratio = self.static_frames / self.frames if self.frames > 0 else 0.0
+        return [f"Motion gate: {100.0 * ratio:.0f}% skipped, {self.detector_runs} detector runs"]
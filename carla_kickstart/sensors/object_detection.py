@@ -1,79 +1,373 @@
+import logging
 import os
-from typing import List
+import threading
+import time
+from collections import deque
+from typing import Callable, List
 
 import cv2
 import numpy as np
+from carla_kickstart.config import config
+from carla_kickstart.sensors.detection_backends import DetectorBackend, shared_backend
+
+logger = logging.getLogger(__name__)
 
 class DetectedObject:
+    """
+    rect is (x, y, w, h) in pixels, track_id is set if the object is tracked over frames
+    """
 
-    def __init__(self, rect, class_name):
+    def __init__(self, rect, class_name, score: float = None, track_id: int = None):
         self.rect = rect
         self.class_name = class_name
+        self.score = score
+        self.track_id = track_id
+
+    def __repr__(self):
+        track = "" if self.track_id is None else f" (track {self.track_id})"
+        return f"'{self.class_name}'{track} at ({self.rect[0]}, {self.rect[1]}) with size ({self.rect[2]}, {self.rect[3]})"
+
+class DetectionResult:
+    """
+    The detections of one camera frame.
+    latency is the time from handing the frame to the worker until the result was
+    ready (in ms), inference the part of it spent in the detector
+    """
+
+    def __init__(self, frame: int, detections: List[DetectedObject], latency: float, inference: float):
+        self.frame = frame
+        self.detections = detections
+        self.latency = latency
+        self.inference = inference
 
     def __repr__(self):
-        return f"'{self.class_name}' at ({self.rect[0]}, {self.rect[1]}) with size ({self.rect[2]}, {self.rect[3]})"
+        return f"DetectionResult(frame={self.frame}, {len(self.detections)} detections, {self.latency:.1f} ms)"
+
+def postprocess_yolo(outs, width: int, height: int, score_threshold: float, nms_threshold: float, allowed_class_ids = None):
+    """
+    Decodes the outputs of all YOLO heads at once: rows are (center x, center y, w, h,
+    objectness, class scores...) relative to the image size.
+    Rows whose best class scores above score_threshold (and whose class is in
+    allowed_class_ids, if given) go through one class-aware NMS.
+    Returns (boxes (n, 4) int32 x/y/w/h in pixels, scores (n,), class ids (n,)) sorted by score.
+    Unlike cv2.groupRectangles(groupThreshold=1), which was used before, a box found by a
+    single row is kept, and of overlapping boxes the best scoring one is returned instead
+    of their average
+    """
+    rows = np.concatenate([np.asarray(out).reshape(-1, out.shape[-1]) for out in outs])
+    class_scores = rows[:, 5:]
+    class_ids = np.argmax(class_scores, axis=1)
+    confidences = class_scores[np.arange(len(rows)), class_ids]
+
+    mask = confidences > score_threshold
+    if allowed_class_ids is not None:
+        mask &= np.isin(class_ids, allowed_class_ids)
+    rows = rows[mask]
+    class_ids = class_ids[mask].astype(np.int32)
+    confidences = confidences[mask].astype(np.float32)
+
+    # truncation like int() in the per-row decoding
+    center_x = (rows[:, 0] * width).astype(np.int32)
+    center_y = (rows[:, 1] * height).astype(np.int32)
+    w = (rows[:, 2] * width).astype(np.int32)
+    h = (rows[:, 3] * height).astype(np.int32)
+    boxes = np.stack([(center_x - w / 2).astype(np.int32), (center_y - h / 2).astype(np.int32), w, h], axis=1)
+
+    if len(boxes) == 0:
+        return boxes, confidences, class_ids
+    keep = np.asarray(cv2.dnn.NMSBoxesBatched(boxes, confidences, class_ids, score_threshold, nms_threshold), dtype=np.int64).reshape(-1)
+    return boxes[keep], confidences[keep], class_ids[keep]
+
+def crop_rects(width: int, height: int, regions = None, tiles = None, overlap: float = 0.0):
+    """
+    The (x, y, w, h) pixel rects the detector runs on: the regions (x, y, w, h relative to
+    the frame size, the whole frame if None), each split into tiles (columns, rows) which
+    overlap by `overlap` of the tile size
+    """
+    rects = []
+    for rx, ry, rw, rh in regions or [(0.0, 0.0, 1.0, 1.0)]:
+        x0, y0 = int(rx * width), int(ry * height)
+        x1, y1 = min(width, int((rx + rw) * width)), min(height, int((ry + rh) * height))
+        columns, rows = tiles or (1, 1)
+        tile_w = (x1 - x0) / (columns - (columns - 1) * overlap)
+        tile_h = (y1 - y0) / (rows - (rows - 1) * overlap)
+        for row in range(rows):
+            for column in range(columns):
+                x = x0 + int(column * tile_w * (1.0 - overlap))
+                y = y0 + int(row * tile_h * (1.0 - overlap))
+                right = x1 if column == columns - 1 else min(x1, int(x + tile_w))
+                bottom = y1 if row == rows - 1 else min(y1, int(y + tile_h))
+                rects.append((x, y, right - x, bottom - y))
+    return rects
 
 class ObjectDetectionSensor():
     """
-    Sensor which runs object detection using YOLO
+    Sensor which runs object detection using YOLO on a DetectorBackend, by default the
+    backend shared by the process for the settings in config (loaded on the first detection).
+    classes limits the detections to these class names (e.g. ["person", "stop sign", "car"]),
+    thresholds default to the values in config
     """
 
-    def __init__(self):
-        model_weights = 'yolo/yolov3.cfg'
-        model_cfg = 'yolo/yolov3.weights'
-        self.net = cv2.dnn.readNet(model_weights, model_cfg)
-        #self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-        #self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+    def __init__(self, backend: DetectorBackend = None, classes: List[str] = None, score_threshold: float = None, nms_threshold: float = None):
+        self.backend = shared_backend() if backend is None else backend
 
         self.classes = []
-        with open("yolo/coco.names", "r") as f:
+        with open(os.path.join(config.detection_model_dir, "coco.names"), "r") as f:
             self.classes = [line.strip() for line in f.readlines()]
 
-        self.output_layers = self.net.getUnconnectedOutLayersNames()
-        self.colors = np.random.uniform(0, 255, size = (len(self.classes), 3))
+        self.score_threshold = config.detection_score_threshold if score_threshold is None else score_threshold
+        self.nms_threshold = config.detection_nms_threshold if nms_threshold is None else nms_threshold
+        self.set_classes(config.detection_classes if classes is None else classes)
 
-    def detect(self, image, image_size) -> List[DetectedObject]:
-        width = image_size[0]
-        height = image_size[1]
+    def set_classes(self, classes: List[str]):
+        """
+        Only detect these class names, None detects all classes
+        """
+        if classes is None:
+            self.allowed_class_ids = None
+            return
+        unknown = [c for c in classes if c not in self.classes]
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown classes {unknown}")
+        self.allowed_class_ids = np.array([self.classes.index(c) for c in classes], dtype=np.int64)
 
-        # Detect image
-        blob = cv2.dnn.blobFromImage(image, 1/255, (width, height), (0, 0, 0), True, crop = False)
+    def detect(self, image) -> List[DetectedObject]:
+        return self.detect_batch([image])[0]
 
-        self.net.setInput(blob)
-        outs = self.net.forward(self.output_layers)
+    def detect_batch(self, images) -> List[List[DetectedObject]]:
+        """
+        Runs one forward pass over all images (or the crops of all images if regions or
+        tiles are configured), returns the detections of each image in its own pixel coordinates
+        """
+        crops = []
+        for image in images:
+            rects = crop_rects(image.shape[1], image.shape[0], config.detection_regions, config.detection_tiles, config.detection_tile_overlap)
+            crops.append([(rect, image[rect[1]:rect[1] + rect[3], rect[0]:rect[0] + rect[2]]) for rect in rects])
 
-        orig_detections = {}
+        outs = self.backend.forward([crop for image_crops in crops for _, crop in image_crops])
         detections = []
+        i = 0
+        for image_crops in crops:
+            decoded = []
+            for (x, y, w, h), _ in image_crops:
+                boxes, scores, class_ids = postprocess_yolo([out[i] for out in outs], w, h, self.score_threshold, self.nms_threshold, self.allowed_class_ids)
+                boxes[:, 0] += x
+                boxes[:, 1] += y
+                decoded.append((boxes, scores, class_ids))
+                i += 1
+            detections.append(self._objects(*self._merge(decoded)))
+        return detections
+
+    def postprocess(self, outs, width: int, height: int) -> List[DetectedObject]:
+        return self._objects(*postprocess_yolo(outs, width, height, self.score_threshold, self.nms_threshold, self.allowed_class_ids))
 
-        for out in outs:
-            for detection in out:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
-                if confidence > 0.5:
-                    #Object detected
-                    center_x = int(detection[0] * width)
-                    center_y = int(detection[1] * height)
-                    w = int(detection[2] * width)
-                    h = int(detection[3] * height)
+    def _merge(self, decoded):
+        """
+        Combines the detections of the crops of one image, objects on the overlap of two
+        tiles are found twice and go through another NMS
+        """
+        if len(decoded) == 1:
+            return decoded[0]
+        boxes, scores, class_ids = (np.concatenate(arrays) for arrays in zip(*decoded))
+        if len(boxes) == 0:
+            return boxes, scores, class_ids
+        keep = np.asarray(cv2.dnn.NMSBoxesBatched(boxes, scores, class_ids, self.score_threshold, self.nms_threshold), dtype=np.int64).reshape(-1)
+        return boxes[keep], scores[keep], class_ids[keep]
 
-                    # Rectangle coordinates
-                    x = int(center_x - w / 2)
-                    y = int(center_y -h / 2)
+    def _objects(self, boxes, scores, class_ids) -> List[DetectedObject]:
+        return [DetectedObject(tuple(int(v) for v in box), self.classes[class_id], float(score))
+            for box, score, class_id in zip(boxes, scores, class_ids)]
 
-                    #if 0 <= x < width and 0 <= y < height:
-                    if not class_id in orig_detections:
-                        orig_detections[class_id] = []
+class DetectionClient(object):
+    """
+    A camera registered with the DetectionService. submit() hands over the newest frame,
+    a frame which was not picked up by the service yet is replaced (and counted as skipped).
+    Results are passed to on_result on the service thread, it must not hold a strong
+    reference to the sensor
+    """
 
-                    orig_detections[class_id].append( (x, y, w, h) )
+    def __init__(self, service, on_result: Callable[[DetectionResult], None], window: int):
+        self.service = service
+        self.processed = 0
+        self.skipped = 0
+        self._on_result = on_result
+        self._pending = None
+        self._last_frame = -1
+        self._latencies = deque(maxlen=window)
+        self._inferences = deque(maxlen=window)
+        self._completed = deque(maxlen=window)
 
+    def submit(self, frame: int, image):
+        self.service._submit(self, frame, image)
 
-        for class_id in orig_detections:
-            class_name = self.classes[class_id]
-            orig_rects = orig_detections[class_id]
-            grouped_rects, weights = cv2.groupRectangles(orig_rects, groupThreshold=1)
-            for r in grouped_rects:
-                detections.append(DetectedObject( (r[0], r[1], r[2], r[3]) , class_name))
+    def clear(self):
+        """
+        Drops the pending frame, e.g. on a warm restart
+        """
+        with self.service._condition:
+            self._pending = None
+            self._last_frame = -1
 
-        return detections
+    def close(self):
+        self.service.unregister(self)
+
+    def _record(self, result: DetectionResult, completed: float):
+        # called by the service while it holds its lock
+        self.processed += 1
+        self._latencies.append(result.latency)
+        self._inferences.append(result.inference)
+        self._completed.append(completed)
+
+    def statistics(self) -> dict:
+        """
+        Returns mean/max latency and mean inference time (ms) and the throughput
+        (results per second) over the last `window` results
+        """
+        with self.service._condition:
+            latencies = list(self._latencies)
+            inferences = list(self._inferences)
+            completed = list(self._completed)
+            stats = {"processed": self.processed, "skipped": self.skipped}
+        if len(latencies) == 0:
+            return stats
+        stats["latency_mean"] = sum(latencies) / len(latencies)
+        stats["latency_max"] = max(latencies)
+        stats["inference_mean"] = sum(inferences) / len(inferences)
+        if len(completed) > 1 and completed[-1] > completed[0]:
+            stats["throughput"] = (len(completed) - 1) / (completed[-1] - completed[0])
+        return stats
+
+    def summary_lines(self):
+        s = self.statistics()
+        lines = [f"Detection: {s['processed']} frames, {s['skipped']} skipped"]
+        if "latency_mean" in s:
+            lines.append('latency %.1f ms (max %.1f), inference %.1f ms' % (s["latency_mean"], s["latency_max"], s["inference_mean"]))
+        if "throughput" in s:
+            lines.append('throughput %.1f frames/s' % s["throughput"])
+        lines.append('batch size %.1f (%d cameras)' % (self.service.mean_batch_size(), len(self.service)))
+        return lines
+
+class DetectionService(object):
+    """
+    One detector per process shared by all cameras. The service thread sleeps until a
+    camera submits a frame, then takes the newest pending frame of every registered
+    camera and runs them through the detector as one batch (a single forward pass).
+    The detector is created on the first registration and kept for the lifetime of the
+    process (its model is loaded by the first batch, on the service thread), the thread
+    stops when the last camera unregistered.
+
+        client = detection_service.register(lambda result: ...)
+        client.submit(image.frame, rgb_frame)
+    """
+
+    def __init__(self, window: int = 100):
+        self.detector = None
+        self.batches = 0
+        self._window = window
+        self._batch_sizes = deque(maxlen=window)
+        self._condition = threading.Condition()
+        self._clients: List[DetectionClient] = []
+        self._thread = None
+        # set to stop the current thread, every thread gets its own, a thread still in a
+        # detection when a new one is started must not run on
+        self._stop = None
+        # held around detect_batch, so a new thread waits for the detection of a stopped one
+        self._detector_lock = threading.Lock()
+
+    def register(self, on_result: Callable[[DetectionResult], None]) -> DetectionClient:
+        with self._condition:
+            if self.detector is None:
+                self.detector = ObjectDetectionSensor()
+            client = DetectionClient(self, on_result, self._window)
+            self._clients.append(client)
+            if self._thread is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), name="object-detection", daemon=True)
+                self._thread.start()
+            return client
+
+    def unregister(self, client: DetectionClient, timeout: float = 1.0):
+        """
+        Removes the client, stops the thread (waiting up to timeout seconds for a running
+        detection, a thread still detecting after it exits once the detection is done)
+        if it was the last one
+        """
+        with self._condition:
+            if client not in self._clients:
+                return
+            self._clients.remove(client)
+            client._pending = None
+            if len(self._clients) > 0:
+                return
+            self._stop.set()
+            thread = self._thread
+            self._thread = None
+            self._condition.notify_all()
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def mean_batch_size(self) -> float:
+        with self._condition:
+            if len(self._batch_sizes) == 0:
+                return 0.0
+            return sum(self._batch_sizes) / len(self._batch_sizes)
+
+    def __len__(self):
+        return len(self._clients)
+
+    def _submit(self, client: DetectionClient, frame: int, image):
+        with self._condition:
+            if client not in self._clients or frame <= client._last_frame:
+                return
+            if client._pending is not None:
+                client.skipped += 1
+            client._pending = (frame, image, time.perf_counter())
+            client._last_frame = frame
+            self._condition.notify()
+
+    def _take_pending(self):
+        batch = []
+        for client in self._clients:
+            if client._pending is not None:
+                batch.append((client,) + client._pending)
+                client._pending = None
+        return batch
+
+    def _run(self, stop: threading.Event):
+        while True:
+            with self._condition:
+                while True:
+                    # checked before taking frames, they may belong to the clients of the next thread
+                    if stop.is_set():
+                        return
+                    batch = self._take_pending()
+                    if len(batch) > 0:
+                        break
+                    self._condition.wait()
+
+            try:
+                with self._detector_lock:
+                    start = time.perf_counter()
+                    detections = self.detector.detect_batch([image for _, _, image, _ in batch])
+            except Exception:
+                # the frames of this batch are dropped, the next batch is tried again
+                logger.exception("Object detection failed on a batch of %d frames", len(batch))
+                continue
+            end = time.perf_counter()
+
+            results = []
+            with self._condition:
+                if stop.is_set():
+                    return
+                self.batches += 1
+                self._batch_sizes.append(len(batch))
+                for (client, frame, _, submitted), client_detections in zip(batch, detections):
+                    if client not in self._clients:
+                        continue
+                    result = DetectionResult(frame, client_detections, 1000.0 * (end - submitted), 1000.0 * (end - start))
+                    client._record(result, end)
+                    results.append((client, result))
+            for client, result in results:
+                client._on_result(result)
 
+detection_service = DetectionService()
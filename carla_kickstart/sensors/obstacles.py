@@ -0,0 +1,78 @@
+from typing import List
+
+import cv2
+import numpy as np
+from carla_kickstart.sensors.bev import BevGrids, BevRasterizer
+
+class Obstacle(object):
+    """
+    A cluster of non-ground lidar points in sensor coordinates (x forward, y right, z up).
+    centroid is the mean of the points, extent the half size of their axis aligned box
+    (like carla.BoundingBox.extent), range the horizontal distance of the nearest point
+    """
+
+    __slots__ = ("centroid", "extent", "points", "range")
+
+    def __init__(self, centroid, extent, points: int, range: float):
+        self.centroid = centroid
+        self.extent = extent
+        self.points = points
+        self.range = range
+
+    def __repr__(self):
+        return "Obstacle(%.1f m, at (%.1f, %.1f, %.1f), extent (%.1f, %.1f, %.1f), %d points)" % (
+            self.range, *self.centroid, *self.extent, self.points)
+
+class ObstacleClusterer(object):
+    """
+    Groups the points rasterized into BevGrids into obstacles: the rasterized
+    cells are merged into cell_size cells (so the gaps between lidar rings do not split
+    objects), connected occupied cells (8-neighborhood) form one obstacle.
+    Clusters with less than min_points points are dropped as noise
+    """
+
+    def __init__(self, bev: BevRasterizer, cell_size: float = 0.5, min_points: int = 5):
+        self.bev = bev
+        self.factor = max(1, int(round(cell_size / bev.resolution)))
+        self.min_points = min_points
+        width, height = bev.size
+        self._grid_size = (-(-height // self.factor), -(-width // self.factor))
+
+    def cluster(self, points: np.ndarray, grids: BevGrids = None) -> List[Obstacle]:
+        """
+        points must be the array grids were rasterized from (default the last rasterize()),
+        returns the obstacles sorted by range
+        """
+        if grids is None:
+            grids = self.bev.grids
+        mask = grids.point_mask
+        if len(mask) != len(points) or not mask.any():
+            return []
+        width = self.bev.size[0]
+        cells = grids.point_cells[mask]
+        rows, columns = cells // width // self.factor, cells % width // self.factor
+        coarse = rows * self._grid_size[1] + columns
+
+        grid_cells = self._grid_size[0] * self._grid_size[1]
+        occupied = (np.bincount(coarse, minlength=grid_cells) > 0).astype(np.uint8).reshape(self._grid_size)
+        count, labels = cv2.connectedComponents(occupied, connectivity=8)
+        point_labels = labels.reshape(-1)[coarse]
+
+        # sorted by label the points of every cluster are one run, reduced with ufunc.reduceat
+        order = np.argsort(point_labels, kind="stable")
+        point_labels = point_labels[order]
+        xyz = points[mask, :3][order].astype(np.float64)
+        labels = np.flatnonzero(np.bincount(point_labels, minlength=count))
+        starts = np.searchsorted(point_labels, labels)
+        counts = np.diff(np.append(starts, len(point_labels)))
+        sums = np.add.reduceat(xyz, starts, axis=0)
+        lows = np.minimum.reduceat(xyz, starts, axis=0)
+        highs = np.maximum.reduceat(xyz, starts, axis=0)
+        nearest = np.minimum.reduceat(np.hypot(xyz[:, 0], xyz[:, 1]), starts)
+
+        obstacles = []
+        for i in np.flatnonzero(counts >= self.min_points):
+            obstacles.append(Obstacle(tuple(sums[i] / counts[i]), tuple(0.5 * (highs[i] - lows[i])),
+                int(counts[i]), float(nearest[i])))
+        obstacles.sort(key=lambda o: o.range)
+        return obstacles
@@ -0,0 +1,94 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+def voxel_downsample(points: np.ndarray, voxel_size: float) -> np.ndarray:
+    """
+    Replaces the points of every voxel_size cube by their mean (all columns, e.g. x, y, z,
+    intensity). The integer voxel keys are packed into one int64 per point, sorted, and the
+    runs of equal keys are reduced with np.add.reduceat
+    """
+    if len(points) == 0:
+        return points
+    keys = np.floor(points[:, :3] / voxel_size).astype(np.int64)
+    keys -= keys.min(axis=0)
+    dims = keys.max(axis=0) + 1
+    packed = (keys[:, 0] * dims[1] + keys[:, 1]) * dims[2] + keys[:, 2]
+    order = np.argsort(packed)
+    packed = packed[order]
+    starts = np.flatnonzero(np.concatenate(([True], packed[1:] != packed[:-1])))
+    sums = np.add.reduceat(points[order].astype(np.float64), starts, axis=0)
+    counts = np.diff(np.append(starts, len(points)))
+    return (sums / counts[:, None]).astype(points.dtype)
+
+class SweepAccumulator(object):
+    """
+    Keeps the last `sweeps` lidar sweeps in world coordinates (using the sensor transform
+    of each sweep) and returns them combined in the sensor frame of the newest sweep,
+    optionally voxel downsampled. Results are cached until the next sweep is added
+    """
+
+    def __init__(self, sweeps: int = 5, voxel_size: float = 0.2):
+        self.sweeps = sweeps
+        self.voxel_size = voxel_size
+        self._lock = threading.Lock()
+        self._ring = deque(maxlen=sweeps)
+        self._inverse = None
+        self._points = None
+        self._downsampled = None
+
+    def clear(self):
+        with self._lock:
+            self._ring.clear()
+            self._inverse = None
+            self._points = None
+            self._downsampled = None
+
+    def add(self, points: np.ndarray, transform):
+        """
+        points is a (n, 4) x, y, z, intensity array in sensor coordinates, transform the
+        carla.Transform of the sensor at the time of the sweep
+        """
+        matrix = np.array(transform.get_matrix(), dtype=np.float64)
+        world = np.empty(points.shape, dtype=np.float32)
+        world[:, :3] = points[:, :3] @ matrix[:3, :3].T + matrix[:3, 3]
+        world[:, 3] = points[:, 3]
+        with self._lock:
+            self._ring.append(world)
+            self._inverse = np.array(transform.get_inverse_matrix(), dtype=np.float64)
+            self._points = None
+            self._downsampled = None
+
+    def __len__(self):
+        return len(self._ring)
+
+    def points(self) -> np.ndarray:
+        """
+        All points of the kept sweeps, (n, 4) in the sensor frame of the newest sweep
+        """
+        with self._lock:
+            return self._combined()
+
+    def downsampled(self) -> np.ndarray:
+        """
+        points() reduced to one point per voxel_size voxel
+        """
+        with self._lock:
+            if self._downsampled is None:
+                self._downsampled = voxel_downsample(self._combined(), self.voxel_size)
+            return self._downsampled
+
+    def _combined(self) -> np.ndarray:
+        if self._points is None:
+            self._points = self._to_sensor(list(self._ring))
+        return self._points
+
+    def _to_sensor(self, sweeps) -> np.ndarray:
+        if len(sweeps) == 0:
+            return np.zeros((0, 4), dtype=np.float32)
+        world = np.concatenate(sweeps)
+        points = np.empty(world.shape, dtype=np.float32)
+        points[:, :3] = world[:, :3] @ self._inverse[:3, :3].T + self._inverse[:3, 3]
+        points[:, 3] = world[:, 3]
+        return points
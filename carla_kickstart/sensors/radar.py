@@ -1,6 +1,9 @@
 import weakref
 import carla
 import math
+from carla_kickstart.config import config
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.sensors.base import SensorBase, frame_gate
 
 class RadarPoint:
 
@@ -10,36 +13,36 @@ class RadarPoint:
 
 GOOD_DISTANCE = 20
 
-class RadarSensor(object):
+class RadarSensor(SensorBase):
 
     def __init__(self, parent_actor, draw_points = False):
-        self.sensor = None
-        self._parent = parent_actor
+        super().__init__(parent_actor)
         bound_x = 0.5 + self._parent.bounding_box.extent.x
         bound_y = 0.5 + self._parent.bounding_box.extent.y
         bound_z = 0.5 + self._parent.bounding_box.extent.z
 
-        self.draw_points = draw_points
+        # debug drawing costs a server call per point, skip it if nobody is watching
+        self.draw_points = draw_points and not config.headless
 
         self.velocity_range = 7.5 # m/s
         world = self._parent.get_world()
         self.debug = world.debug
-        bp = world.get_blueprint_library().find('sensor.other.radar')
+        bp = actor_lifecycle.blueprint_library(world).find('sensor.other.radar')
         bp.set_attribute('horizontal_fov', str(20)) # 35
         bp.set_attribute('vertical_fov', str(0)) # 20
         bp.set_attribute('range', str(100))
-        self.sensor = world.spawn_actor(
+        self.points = []
+        self._spawn(
             bp,
             carla.Transform(
                 carla.Location(x=bound_x + 0.05, z=bound_z), # z+0.05
-                carla.Rotation(pitch=-2)), # 5
-            attach_to=self._parent)
+                carla.Rotation(pitch=-2))) # 5
+
+    def _listen(self, sensor):
         # We need a weak reference to self to avoid circular reference.
         weak_self = weakref.ref(self)
-        self.sensor.listen(
-            lambda radar_data: RadarSensor._Radar_callback(weak_self, radar_data))
-
-        self.points = []
+        sensor.listen(
+            lambda radar_data: frame_gate.dispatch(weak_self, RadarSensor._Radar_callback, radar_data))
 
     @staticmethod
     def _Radar_callback(weak_self, radar_data):
@@ -52,6 +55,9 @@ class RadarSensor(object):
 
         self.points = list([RadarPoint(x.depth, math.degrees(x.azimuth)) for x in radar_data])
 
+        if not self.draw_points:
+            return
+
         current_rot = radar_data.transform.rotation
         for detect in radar_data:
             azi = math.degrees(detect.azimuth)
@@ -0,0 +1,59 @@
+import numpy as np
+
+class RangeImage(object):
+    """
+    Channel x azimuth image of a ray-cast lidar sweep (sensor coordinates, x forward, z up):
+    row i is the laser at elevations[i] (upper_fov first, like carla spaces the channels),
+    column j the azimuth interval starting at -pi + j * 2 pi / columns.
+    Neighboring cells are neighboring beams, so filters and normals need no spatial search.
+    The grids are allocated once and overwritten by every project() call:
+        ranges  distance of the nearest return per cell in units of scale, 0 for no return (channels, columns) uint16
+        index   row of that point in the projected array, -1 for no return (channels, columns) int32
+    """
+
+    def __init__(self, channels: int, upper_fov: float, lower_fov: float, columns: int, max_range: float):
+        self.channels = channels
+        self.columns = columns
+        # degrees, one per row
+        self.elevations = np.linspace(upper_fov, lower_fov, channels)
+        # a point belongs to the channel whose elevation is nearest, the boundaries are the midpoints (increasing)
+        self._boundaries = np.radians(0.5 * (self.elevations[1:] + self.elevations[:-1]))[::-1]
+        # meters per unit, 0 is reserved for no return
+        self.scale = max_range / 65534.0
+        self.ranges = np.zeros((channels, columns), dtype=np.uint16)
+        self.index = np.full((channels, columns), -1, dtype=np.int32)
+
+    def cells(self, points: np.ndarray):
+        """
+        Returns (flat cell index, range in meters) of the points
+        """
+        x, y, z = points[:, 0], points[:, 1], points[:, 2]
+        horizontal = np.hypot(x, y)
+        distance = np.hypot(horizontal, z)
+        rows = self.channels - 1 - np.searchsorted(self._boundaries, np.arctan2(z, horizontal))
+        columns = ((np.arctan2(y, x) + np.pi) * (self.columns / (2.0 * np.pi))).astype(np.int64)
+        np.minimum(columns, self.columns - 1, out=columns)
+        return rows * self.columns + columns, distance
+
+    def project(self, points: np.ndarray):
+        """
+        points is a (n, 4) x, y, z, intensity array, cells hit several times keep the nearest return
+        """
+        cells, distance = self.cells(points)
+        quantized = np.clip(np.rint(distance / self.scale), 1, 65535).astype(np.uint16)
+        ranges = self.ranges.reshape(-1)
+        ranges.fill(65535)
+        np.minimum.at(ranges, cells, quantized)
+        index = self.index.reshape(-1)
+        index.fill(-1)
+        nearest = np.flatnonzero(quantized == ranges[cells])
+        index[cells[nearest]] = nearest
+        ranges[index < 0] = 0
+
+    def meters(self) -> np.ndarray:
+        """
+        The ranges in meters as float32, nan for no return
+        """
+        meters = self.ranges.astype(np.float32) * np.float32(self.scale)
+        meters[self.ranges == 0] = np.nan
+        return meters
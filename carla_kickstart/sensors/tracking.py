@@ -0,0 +1,183 @@
+import threading
+from typing import List
+
+import numpy as np
+from carla_kickstart.config import config
+from carla_kickstart.sensors.object_detection import DetectedObject
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Intersection over union of all pairs of (x, y, w, h) boxes, shape (len(a), len(b))
+    """
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    left = np.maximum(a[:, None, 0], b[None, :, 0])
+    top = np.maximum(a[:, None, 1], b[None, :, 1])
+    right = np.minimum(a[:, None, 0] + a[:, None, 2], b[None, :, 0] + b[None, :, 2])
+    bottom = np.minimum(a[:, None, 1] + a[:, None, 3], b[None, :, 1] + b[None, :, 3])
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+class Track(object):
+    """
+    An object followed over frames: box (x, y, w, h) at `frame` and its velocity per frame
+    """
+
+    __slots__ = ("track_id", "class_name", "box", "velocity", "frame", "score", "confidence", "hits", "misses")
+
+    def __init__(self, track_id: int, detection: DetectedObject, frame: int):
+        self.track_id = track_id
+        self.class_name = detection.class_name
+        self.box = np.array(detection.rect, dtype=np.float64)
+        self.velocity = np.zeros(4)
+        self.frame = frame
+        self.score = 1.0 if detection.score is None else detection.score
+        self.confidence = self.score
+        self.hits = 1
+        self.misses = 0
+
+    def predict(self, frame: int) -> np.ndarray:
+        return self.box + self.velocity * (frame - self.frame)
+
+class IoUTracker(object):
+    """
+    Detect-then-track: the detector only runs every `interval` frames (or earlier when the
+    confidence of a track dropped below min_confidence), in between the boxes of the
+    tracks are moved with their constant velocity.
+    Detections are associated with the tracks of the same class by IoU (greedy, highest
+    IoU first), matched tracks keep their id, unmatched detections start new tracks and
+    tracks which were missed more than max_misses times in a row are dropped.
+    The confidence of a track is the score of its last detection, it decays with every
+    predicted frame and with every miss
+    """
+
+    def __init__(self, interval: int = None, iou_threshold: float = None, min_confidence: float = None,
+                 decay: float = 0.95, max_misses: int = 2):
+        self.interval = config.tracking_interval if interval is None else interval
+        self.iou_threshold = config.tracking_iou_threshold if iou_threshold is None else iou_threshold
+        self.min_confidence = config.tracking_min_confidence if min_confidence is None else min_confidence
+        self.decay = decay
+        self.max_misses = max_misses
+        self.frames = 0
+        self.detector_runs = 0
+        self._lock = threading.Lock()
+        self._tracks: List[Track] = []
+        self._next_id = 0
+        self._last_update = None
+        self._requested = None
+
+    def reset(self):
+        with self._lock:
+            self._tracks = []
+            self._last_update = None
+            self._requested = None
+
+    def needs_detection(self, frame: int) -> bool:
+        """
+        Called for every camera frame, True if the frame should go to the detector.
+        A requested detection counts as running until its result arrived (or `interval`
+        frames passed without one)
+        """
+        with self._lock:
+            self.frames += 1
+            if self._requested is not None and frame - self._requested < self.interval:
+                return False
+            due = self._last_update is None or frame - self._last_update >= self.interval \
+                or any(self._confidence(t, frame) < self.min_confidence for t in self._tracks)
+            if due:
+                self._requested = frame
+                self.detector_runs += 1
+            return due
+
+    def update(self, frame: int, detections: List[DetectedObject]) -> List[DetectedObject]:
+        """
+        Associates the detections of `frame` with the tracks, returns them with their track ids
+        """
+        with self._lock:
+            if self._last_update is not None and frame <= self._last_update:
+                # older than the state of the tracks
+                return self._predicted(frame)
+            self._last_update = frame
+            if self._requested is not None and frame >= self._requested:
+                self._requested = None
+
+            matched_tracks = set()
+            matched_detections = {}
+            for class_name in set(d.class_name for d in detections) | set(t.class_name for t in self._tracks):
+                tracks = [i for i, t in enumerate(self._tracks) if t.class_name == class_name]
+                boxes = [i for i, d in enumerate(detections) if d.class_name == class_name]
+                if len(tracks) == 0 or len(boxes) == 0:
+                    continue
+                ious = iou_matrix([self._tracks[i].predict(frame) for i in tracks], [detections[i].rect for i in boxes])
+                for flat in np.argsort(-ious, axis=None):
+                    t, d = np.unravel_index(flat, ious.shape)
+                    if ious[t, d] < self.iou_threshold:
+                        break
+                    if tracks[t] in matched_tracks or boxes[d] in matched_detections:
+                        continue
+                    matched_tracks.add(tracks[t])
+                    matched_detections[boxes[d]] = tracks[t]
+
+            tracks = []
+            for i, track in enumerate(self._tracks):
+                if i in matched_tracks:
+                    tracks.append(track)
+                    continue
+                track.misses += 1
+                track.confidence *= 0.5
+                if track.misses <= self.max_misses:
+                    tracks.append(track)
+
+            tracked = []
+            for i, detection in enumerate(detections):
+                if i in matched_detections:
+                    track = self._tracks[matched_detections[i]]
+                    box = np.array(detection.rect, dtype=np.float64)
+                    if frame > track.frame:
+                        measured = (box - track.box) / (frame - track.frame)
+                        track.velocity = measured if track.hits == 1 else 0.5 * (track.velocity + measured)
+                    track.box = box
+                    track.frame = frame
+                    track.score = 1.0 if detection.score is None else detection.score
+                    track.confidence = track.score
+                    track.hits += 1
+                    track.misses = 0
+                else:
+                    track = Track(self._next_id, detection, frame)
+                    self._next_id += 1
+                    tracks.append(track)
+                tracked.append(DetectedObject(detection.rect, detection.class_name, detection.score, track.track_id))
+            self._tracks = tracks
+            return tracked
+
+    def predict(self, frame: int) -> List[DetectedObject]:
+        """
+        The boxes of all tracks which were seen in the last detection, moved to `frame`
+        """
+        with self._lock:
+            return self._predicted(frame)
+
+    def _predicted(self, frame: int) -> List[DetectedObject]:
+        objects = []
+        for track in self._tracks:
+            if track.misses > 0:
+                continue
+            box = track.predict(frame)
+            objects.append(DetectedObject(tuple(int(round(v)) for v in box), track.class_name, self._confidence(track, frame), track.track_id))
+        return objects
+
+    def _confidence(self, track: Track, frame: int) -> float:
+        return track.confidence * self.decay ** max(0, frame - track.frame)
+
+    def summary_lines(self, frames: int = None):
+        """
+        frames is the number of camera frames, if the tracker does not see all of them
+        (e.g. behind a motion gate), by default the frames passed to needs_detection()
+        """
+        frames = self.frames if frames is None else frames
+        ratio = self.detector_runs / frames if frames > 0 else 0.0
+        line = f"Tracking: {len(self._tracks)} tracks, detector on {100.0 * ratio:.0f}% of frames"
+        if self.detector_runs > 0:
+            line += f" (cut by {frames / self.detector_runs:.1f}x)"
+        return [line]
@@ -2,28 +2,69 @@ import sys
 import carla
 import os
 import math
+import time
 import pygame
+from threading import Thread
 from carla_kickstart.hud import HUD
 from carla_kickstart.input import SystemInputController
 from carla_kickstart.behaviors.manual import ManualDrivingBehavior
 from carla_kickstart.carla_utils import find_weather_presets, get_actor_display_name
 from carla_kickstart.camera import CameraManager
 from carla_kickstart.config import config
+from carla_kickstart.lifecycle import actor_lifecycle
+from carla_kickstart.profiling import PhaseProfiler, profiler, presentation_profiler
+from carla_kickstart.world_state import world_state
+from carla_kickstart.pipeline import TickPipeline
+from carla_kickstart.sensors.base import frame_gate
+from carla_kickstart.clock import SimulationClock, WallClock, SnapshotClock
 from carla_kickstart.scenarios.base import SimulationScenario
 from carla_kickstart.scenarios.base import SimulationScenario
 from carla_kickstart.config import config
 
+class RunStatistics(object):
+    '''
+    Tick counters of a finished DriveApp.run
+    '''
+
+    def __init__(self, ticks: int, wall_time: float):
+        self.ticks = ticks
+        self.wall_time = wall_time
+
+    @property
+    def ticks_per_second(self) -> float:
+        if self.wall_time <= 0:
+            return 0.0
+        return self.ticks / self.wall_time
+
+    def __repr__(self):
+        return f"{self.ticks} ticks in {self.wall_time:.1f} s ({self.ticks_per_second:.1f} ticks/s)"
+
 class DriveApp(object):
 
-    def connect(self, host, port, synchronous: bool):
+    def connect(self, host, port, synchronous: bool, headless: bool = False, decoupled_rendering: bool = False, pipelined: bool = False):
         '''
         Connects to running Carla Server and retrieves Carla's world object
+        In headless mode no window, HUD or spectator camera is created and the
+        simulation is always stepped synchronously
+        With decoupled_rendering the simulation is stepped on its own thread and
+        the window is presented at config.display_fps
+        With pipelined (synchronous mode only) the server simulates frame N+1 while
+        the client works on frame N. Controls computed from frame N are applied at the
+        tick which produces frame N+2, i.e. always exactly one frame later than without pipelining
         '''
-        pygame.init()
-        pygame.font.init()
+        self.headless = headless
+        self.decoupled_rendering = decoupled_rendering and not headless
+        config.headless = headless
+        if headless:
+            synchronous = True
+        else:
+            pygame.init()
+            pygame.font.init()
+        self.pipelined = pipelined and synchronous
 
         self.client = carla.Client(host, port)
         self.client.set_timeout(5.0)
+        actor_lifecycle.bind(self.client)
 
         self.sim_world = self.client.get_world()
         self._init(synchronous)
@@ -32,6 +73,7 @@ class DriveApp(object):
 
 
     def _init(self, synchronous: bool):
+        self._original_settings = self.sim_world.get_settings()
         settings = self.sim_world.get_settings()
         settings.no_rendering_mode = True
         self.synchronous = synchronous
@@ -40,11 +82,122 @@ class DriveApp(object):
             settings.fixed_delta_seconds = 1.0/config.target_fps
         self.sim_world.apply_settings(settings)
 
-        self.hud = HUD(config.window_size[0], config.window_size[1])
+        self.hud = None if self.headless else HUD(config.window_size[0], config.window_size[1])
 
-    def run(self, scenario: SimulationScenario):
+    def run(self, scenario: SimulationScenario, max_ticks: int = None) -> RunStatistics:
+        '''
+        Runs the scenario until exit is requested or max_ticks have been simulated
+        '''
         self.sim_root = SimulationRoot(self.sim_world, self.hud, self.synchronous, scenario)
+        self.ticks = 0
+        profiler.enabled = config.profile
+        profiler.reset()
+        presentation_profiler.enabled = config.profile and self.decoupled_rendering
+        presentation_profiler.reset()
+
+        self._pipeline = None
+        if self.pipelined:
+            actor_lifecycle.defer_controls = True
+            frame_gate.enabled = True
+            self._pipeline = TickPipeline(self.sim_world)
+            self._pipeline.request()
+
+        start = time.perf_counter()
+        try:
+            if self.headless:
+                self._run_headless(max_ticks)
+            elif self.decoupled_rendering:
+                self._run_decoupled(max_ticks)
+            else:
+                self._run_interactive(max_ticks)
+        finally:
+            if self._pipeline is not None:
+                self._pipeline.stop()
+                self._pipeline = None
+                actor_lifecycle.defer_controls = False
+                actor_lifecycle.discard_deferred()
+                frame_gate.enabled = False
+                frame_gate.clear()
+            self.sim_root.destroy()
+            if profiler.enabled:
+                profiler.export(config.profile_output)
+            if presentation_profiler.enabled:
+                presentation_profiler.export(config.profile_output + "_presentation")
+
+        stats = RunStatistics(self.ticks, time.perf_counter() - start)
+        print(f"{'Headless' if self.headless else 'Interactive'}{' pipelined' if self.pipelined else ''} run: {stats}")
+        return stats
+
+    def _should_continue(self, max_ticks: int) -> bool:
+        if self.sim_root.exit_requested:
+            return False
+        return max_ticks is None or self.ticks < max_ticks
 
+    def _tick_world(self):
+        '''
+        Returns the snapshot of the new frame if it is already known (pipelined mode)
+        '''
+        if self._pipeline is not None:
+            return self._tick_pipelined()
+        with profiler.phase("world.tick"):
+            self.sim_world.tick()
+        return None
+
+    def _tick_pipelined(self):
+        '''
+        Completes the tick in flight, sends the controls held back from the previous
+        frame and starts the next tick before the client works on the new frame
+        '''
+        with profiler.phase("world.tick"):
+            snapshot = self._pipeline.wait()
+        with profiler.phase("controls.flush"):
+            actor_lifecycle.flush_deferred()
+        self._pipeline.request()
+        return snapshot
+
+    def _wait_for_tick(self):
+        with profiler.phase("world.wait_for_tick"):
+            self.sim_world.wait_for_tick()
+
+    def _update_world_state(self, clock: SimulationClock, snapshot = None):
+        '''
+        Fetches the snapshot once per tick, it is shared by the clock and all consumers of world_state
+        '''
+        with profiler.phase("WorldState.update"):
+            world_state.update(self.sim_world, snapshot)
+        profiler.set_frame(world_state.frame)
+        clock.tick(world_state.snapshot)
+        if frame_gate.enabled:
+            # hand over the sensor data which arrived ahead of time
+            with profiler.phase("sensors.advance"):
+                frame_gate.advance(world_state.frame)
+
+    def _restart(self):
+        if self._pipeline is None:
+            self.sim_root.restart()
+            return
+
+        # restart ticks on its own, so no tick may be in flight
+        self._pipeline.wait()
+        actor_lifecycle.discard_deferred()
+        frame_gate.clear()
+        self.sim_root.restart()
+        self._pipeline.request()
+
+    def _present(self, display, phases: PhaseProfiler = profiler):
+        self.sim_root.render(display, phases)
+        with phases.phase("display.flip"):
+            pygame.display.flip()
+
+    def _create_clock(self) -> SimulationClock:
+        '''
+        Synchronous runs use the simulation time so they do not depend on the client's speed
+        '''
+        if self.synchronous:
+            return SnapshotClock(self.sim_world)
+        return WallClock()
+
+    def _run_interactive(self, max_ticks: int):
         display = pygame.display.set_mode(config.window_size, pygame.HWSURFACE | pygame.DOUBLEBUF)
         display.fill((0,0,0))
         pygame.display.flip()
@@ -52,21 +205,101 @@ class DriveApp(object):
         if not self.synchronous:
             self.sim_world.wait_for_tick()
 
-        clock = pygame.time.Clock()
+        clock = self._create_clock()
+        frame_limiter = pygame.time.Clock()
+        while self._should_continue(max_ticks):
+            profiler.begin_tick()
+            snapshot = None
+            if self.synchronous:
+                snapshot = self._tick_world()
+
+            frame_limiter.tick_busy_loop(60)
+            self._update_world_state(clock, snapshot)
+            self.sim_root.update(clock)
+            self._present(display)
+            self.ticks += 1
+            profiler.end_tick()
+
+            if self.sim_root.restart_requested:
+                self._restart()
+
+    def _run_decoupled(self, max_ticks: int):
+        '''
+        Steps the simulation on a separate thread while this (the main) thread
+        presents the latest completed frame at a capped rate.
+        Pygame requires events to be pumped by the thread owning the window,
+        so they are handed over to the simulation thread
+        '''
+        display = pygame.display.set_mode(config.window_size, pygame.HWSURFACE | pygame.DOUBLEBUF)
+        display.fill((0,0,0))
+        pygame.display.flip()
+
+        self.sim_root.controller.use_event_queue()
+        self._simulation_error = None
+        sim_thread = Thread(target=self._simulation_loop, args=(max_ticks,), name="simulation", daemon=True)
+        sim_thread.start()
+
+        display_clock = pygame.time.Clock()
+        try:
+            while sim_thread.is_alive():
+                self.sim_root.controller.post_events(pygame.event.get())
+                # presented frames are profiled on their own, the simulation ticks run concurrently
+                presentation_profiler.begin_tick()
+                self._present(display, presentation_profiler)
+                presentation_profiler.end_tick()
+                # sleeps instead of busy waiting
+                display_clock.tick(config.display_fps)
+        finally:
+            self.sim_root.exit_requested = True
+            sim_thread.join()
+
+        if self._simulation_error is not None:
+            raise self._simulation_error
+
+    def _simulation_loop(self, max_ticks: int):
         try:
-            while not self.sim_root.exit_requested:
+            clock = self._create_clock()
+            while self._should_continue(max_ticks):
+                profiler.begin_tick()
+                snapshot = None
                 if self.synchronous:
-                    self.sim_world.tick()
+                    snapshot = self._tick_world()
+                else:
+                    self._wait_for_tick()
 
-                clock.tick_busy_loop(60)
+                self._update_world_state(clock, snapshot)
                 self.sim_root.update(clock)
-                self.sim_root.render(display)
-                pygame.display.flip()
+                self.ticks += 1
+                profiler.end_tick()
 
                 if self.sim_root.restart_requested:
-                    self.sim_root.restart()
-        finally:
-            self.sim_root.destroy()
+                    self._restart()
+        except Exception as e:
+            self._simulation_error = e
+
+    def _run_headless(self, max_ticks: int):
+        '''
+        Steps the simulation as fast as the server ticks, without frame limiter or rendering
+        '''
+        clock = self._create_clock()
+        while self._should_continue(max_ticks):
+            profiler.begin_tick()
+            snapshot = self._tick_world()
+
+            self._update_world_state(clock, snapshot)
+            self.sim_root.update(clock)
+            self.ticks += 1
+            profiler.end_tick()
+
+            if self.sim_root.restart_requested:
+                self._restart()
+
+    def disconnect(self):
+        '''
+        Restores the world settings found on connect, so the server keeps running
+        for other clients (e.g. the next job of a batch run)
+        '''
+        self.sim_world.apply_settings(self._original_settings)
 
     def quit(self):
         pygame.quit()
@@ -82,6 +315,8 @@ class SimulationRoot(object):
         self.exit_requested = False
         self.restart_requested = False
         self.synchronous = synchronous
+        # without a HUD there is no window, input or spectator camera
+        self.headless = hud is None
         try:
             self.map = self.world.get_map()
         except RuntimeError as error:
@@ -100,11 +335,14 @@ class SimulationRoot(object):
         self.ego = scenario.get_ego_vehicle()
 
         self.camera_manager = None
+        # what the presentation draws, replaced at the end of every tick (see FrameRecord)
+        self.frame_record = None
         self._weather_presets = find_weather_presets()
         self._weather_index = 0
         self._gamma = 2.2
         self.restart()
-        self.world.on_tick(hud.on_world_tick)
+        if not self.headless:
+            self.world.on_tick(hud.on_world_tick)
         self.recording_enabled = False
         self.recording_start = 0
         self.constant_velocity_enabled = False
@@ -135,30 +373,45 @@ class SimulationRoot(object):
                 to_del.append(actor)
 
         print("Found %d orphaned actors" % len(to_del))
-        for d in to_del:
-            d.destroy()
+        actor_lifecycle.destroy(to_del)
 
     def restart(self):
+        '''
+        Resets the existing actors in place (warm restart), actors are only
+        respawned on the first start or if the ego's model has changed
+        '''
         self.restart_requested = False
 
-        # Keep same camera config if the camera manager exists.
-        cam_index = self.camera_manager.index if self.camera_manager is not None else 0
-        cam_pos_index = self.camera_manager.transform_index if self.camera_manager is not None else 0
-
-        if self.camera_manager is not None:
-            self.camera_manager.destroy()
-        self.ego.restart()
-        self.scenario.restart()
-        self.camera_manager = CameraManager(self.ego.player, self.hud, self._gamma)
-        self.camera_manager.transform_index = cam_pos_index
-        self.camera_manager.set_sensor(cam_index, notify=False, force_respawn=True)
-        #actor_type = get_actor_display_name(self.ego.player)
+        if self.ego.needs_respawn:
+            self._respawn()
+        else:
+            with actor_lifecycle.batch():
+                self.ego.reset()
+                self.scenario.reset()
 
         if self.synchronous:
             self.world.tick()
         else:
             self.world.wait_for_tick()
 
+    def _respawn(self):
+        # Keep same camera config if the camera manager exists.
+        cam_index = self.camera_manager.index if self.camera_manager is not None else 0
+        cam_pos_index = self.camera_manager.transform_index if self.camera_manager is not None else 0
+
+        # destroy and respawn all actors and their sensors with a fixed number of command batches
+        with actor_lifecycle.batch():
+            if self.camera_manager is not None:
+                self.camera_manager.destroy()
+            self.ego.restart()
+            self.scenario.restart()
+
+        if not self.headless:
+            self.camera_manager = CameraManager(self.ego.player, self.hud, self._gamma)
+            self.camera_manager.transform_index = cam_pos_index
+            self.camera_manager.set_sensor(cam_index, notify=False, force_respawn=True)
+        #actor_type = get_actor_display_name(self.ego.player)
+
     def next_weather(self, reverse=False):
         self._weather_index += -1 if reverse else 1
         self._weather_index %= len(self._weather_presets)
@@ -181,23 +434,37 @@ class SimulationRoot(object):
             self.hud.notification('Loading map layer: %s' % selected)
             self.world.load_map_layer(selected)
 
-    def update(self, clock):
+    def update(self, clock: SimulationClock):
 
-        self.controller.update(clock)
-        self.scenario.update(clock, self.controller.keyboard_state)
+        if not self.headless:
+            with profiler.phase("SystemInputController.update"):
+                self.controller.update(clock)
+        with profiler.phase("scenario.update"):
+            self.scenario.update(clock, self.controller.keyboard_state)
         self.ego.update(clock, self.controller.keyboard_state)
 
-        self.hud.tick(self, clock)
+        if not self.headless:
+            with profiler.phase("HUD.tick"):
+                self.hud.tick(self, clock)
+                self.frame_record = self.hud.frame_record(self)
 
         self.controller.reset()
 
-    def render(self, display):
-        self.camera_manager.render(display)
-        self.hud.render(self, display)
+    def render(self, display, phases: PhaseProfiler = profiler):
+        # may run on the presentation thread, only draws the record of the last completed tick
+        record = self.frame_record
+        if record is None:
+            return
+        with phases.phase("CameraManager.render"):
+            CameraManager.render(display, record.spectator)
+        with phases.phase("HUD.render"):
+            self.hud.render(record, display)
 
     def destroy(self):
-        self.camera_manager.destroy()
-
         print ("Destroying world")
-        self.scenario.destroy()
-        self.ego.destroy()
\ No newline at end of file
+        with actor_lifecycle.batch():
+            if self.camera_manager is not None:
+                self.camera_manager.destroy()
+
+            self.scenario.destroy()
+            self.ego.destroy()
\ No newline at end of file
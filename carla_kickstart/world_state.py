@@ -0,0 +1,109 @@
+import math
+import fnmatch
+import carla
+
+VEHICLE_PREFIX = "vehicle."
+WALKER_PREFIX = "walker.pedestrian."
+TRAFFIC_LIGHT_PREFIX = "traffic.traffic_light"
+
+class WorldState(object):
+    """
+    State of the server for the current tick, built once per tick from world.get_snapshot().
+    All consumers (HUD, entities, behaviors, agents) read transforms and velocities from
+    here instead of asking every actor on its own.
+
+    The actor index is updated incrementally: only actors which appear in a snapshot
+    for the first time are requested from the server (one call for all of them),
+    so get_actors() is not called on every tick.
+    Actors which are not part of the current snapshot (e.g. spawned after the tick)
+    fall back to the actor's own getters.
+    """
+
+    def __init__(self):
+        self.world = None
+        self.snapshot = None
+        self.frame = -1
+        self._actors = {}
+        self.vehicles = []
+        self.walkers = []
+        self.traffic_lights = []
+
+    def reset(self):
+        self.__init__()
+
+    def update(self, world, snapshot = None):
+        if snapshot is None:
+            snapshot = world.get_snapshot()
+        if world is not self.world:
+            self.reset()
+            self.world = world
+        self.snapshot = snapshot
+        self.frame = snapshot.frame
+
+        ids = set(s.id for s in snapshot)
+        known = self._actors.keys()
+        added = ids - known
+        removed = known - ids
+        if len(added) == 0 and len(removed) == 0:
+            return
+
+        for actor_id in removed:
+            del self._actors[actor_id]
+        if len(added) > 0:
+            for actor in world.get_actors(list(added)):
+                self._actors[actor.id] = actor
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        vehicles = []
+        walkers = []
+        traffic_lights = []
+        for actor in self._actors.values():
+            type_id = actor.type_id
+            if type_id.startswith(VEHICLE_PREFIX):
+                vehicles.append(actor)
+            elif type_id.startswith(WALKER_PREFIX):
+                walkers.append(actor)
+            elif type_id.startswith(TRAFFIC_LIGHT_PREFIX):
+                traffic_lights.append(actor)
+        # replace the lists instead of modifying them, consumers may still iterate the old ones
+        self.vehicles = vehicles
+        self.walkers = walkers
+        self.traffic_lights = traffic_lights
+
+    def find(self, actor_id: int):
+        return self._actors.get(actor_id)
+
+    def filter(self, pattern: str):
+        """
+        Same wildcard matching as carla.ActorList.filter, without a server call
+        """
+        return [a for a in self._actors.values() if fnmatch.fnmatch(a.type_id, pattern)]
+
+    def _actor_snapshot(self, actor):
+        if self.snapshot is None:
+            return None
+        return self.snapshot.find(actor.id)
+
+    def transform(self, actor) -> carla.Transform:
+        s = self._actor_snapshot(actor)
+        return s.get_transform() if s is not None else actor.get_transform()
+
+    def location(self, actor) -> carla.Location:
+        return self.transform(actor).location
+
+    def velocity(self, actor) -> carla.Vector3D:
+        s = self._actor_snapshot(actor)
+        return s.get_velocity() if s is not None else actor.get_velocity()
+
+    def speed(self, actor) -> float:
+        """
+        Speed in km/h
+        """
+        v = self.velocity(actor)
+        return 3.6 * math.sqrt(v.x**2 + v.y**2 + v.z**2)
+
+    def distance(self, actor, other) -> float:
+        return self.location(actor).distance(self.location(other))
+
+world_state = WorldState()
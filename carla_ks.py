@@ -9,11 +9,14 @@ import traceback
 
 HOST = '127.0.0.1' #'ce-gpu.informatik.tu-chemnitz.de' # '127.0.0.1'
 PORT = 2000 # 2110
+HEADLESS = False # run without window as fast as the server ticks
+DECOUPLED_RENDERING = False # present the window on its own thread
+PIPELINED = False # overlap server ticks with client work (synchronous only, one frame control latency)
 
 if __name__ == "__main__":
     try:
         app = DriveApp()
-        app.connect(HOST, PORT, synchronous=False)
+        app.connect(HOST, PORT, synchronous=False, headless=HEADLESS, decoupled_rendering=DECOUPLED_RENDERING, pipelined=PIPELINED)
 
         #behaviors = CompoundBehavior(ManualDrivingBehavior(), RouteRecorderBehavior("recorded_route.csv")) # FollowPredefinedRouteBehavior("scenario.csv")
         #scenario = SingleEgoVehicleScenario(behaviors, initial_spawn_point=55)
@@ -0,0 +1,28 @@
+"""
+In-process stand-in for the CARLA Python API, for running and profiling the client
+without a simulator. Put its parent directory first on the path:
+
+    PYTHONPATH=fake_carla python carla_ks.py
+
+Only the subset of the API used by this repository is implemented, on a synthetic grid
+town with kinematic vehicles and synthetic sensor data (see settings.py for parameters).
+"""
+from carla.geometry import Vector2D, Vector3D, Location, Rotation, Transform, BoundingBox, GeoLocation
+from carla.enums import (LaneType, LaneChange, LaneMarkingType, LaneMarkingColor, AttachmentType, VehicleLightState,
+                         VehicleDoor, TrafficLightState, MapLayer, ColorConverter)
+from carla.controls import (VehicleControl, VehicleAckermannControl, WalkerControl, VehiclePhysicsControl, Color,
+                            WeatherParameters, WorldSettings)
+from carla.road import LaneMarking, Waypoint, Map
+from carla.blueprints import ActorAttribute, ActorAttributeType, ActorBlueprint, BlueprintLibrary
+from carla.actors import Actor, Vehicle, Walker, TrafficLight, Sensor, ActorList
+from carla.sensors import (SensorData, Image, DVSEvent, DVSEventArray, LidarDetection, LidarMeasurement, RadarDetection,
+                           RadarMeasurement, IMUMeasurement, GnssMeasurement, CollisionEvent, LaneInvasionEvent)
+from carla.world import Timestamp, ActorSnapshot, WorldSnapshot, DebugHelper, World
+from carla.client import Client, TrafficManager
+from carla import command
+from carla.settings import fake_settings
+
+# aliases of the real API
+ServerSideSensor = Sensor
+ClientSideSensor = Sensor
+SemanticLidarMeasurement = LidarMeasurement
@@ -0,0 +1,407 @@
+import fnmatch
+import math
+from carla.geometry import Vector3D, Location, Rotation, Transform, BoundingBox
+from carla.controls import VehicleControl, WalkerControl, VehiclePhysicsControl
+from carla.enums import VehicleLightState, TrafficLightState, AttachmentType
+from carla.settings import fake_settings
+
+GRAVITY = 9.81
+ROLLING_RESISTANCE = 0.15
+DRAG = 0.0004
+
+class Actor(object):
+
+    def __init__(self, world, actor_id: int, blueprint, transform, parent=None, attachment_type=AttachmentType.Rigid):
+        self._world = world
+        self.id = actor_id
+        self.type_id = blueprint.id
+        self.attributes = blueprint.attribute_values()
+        self.semantic_tags = []
+        self.parent = parent
+        self.attachment_type = attachment_type
+        self.is_alive = True
+        self.bounding_box = BoundingBox(Location(0, 0, blueprint.extent.z), blueprint.extent)
+        # relative to the parent for attached actors
+        self._transform = Transform(transform.location, transform.rotation)
+        self._velocity = Vector3D()
+        self._angular_velocity = Vector3D()
+        self._acceleration = Vector3D()
+
+    @property
+    def is_active(self):
+        return self.is_alive
+
+    def get_world(self):
+        return self._world
+
+    def get_transform(self):
+        if self.parent is None:
+            return Transform(self._transform.location, self._transform.rotation)
+        parent = self.parent.get_transform()
+        location = parent.transform(Location(self._transform.location))
+        rotation = Rotation(
+            parent.rotation.pitch + self._transform.rotation.pitch,
+            parent.rotation.yaw + self._transform.rotation.yaw,
+            parent.rotation.roll + self._transform.rotation.roll)
+        return Transform(location, rotation)
+
+    def get_location(self):
+        return self.get_transform().location
+
+    def get_velocity(self):
+        if self.parent is not None:
+            return self.parent.get_velocity()
+        return Vector3D(self._velocity)
+
+    def get_angular_velocity(self):
+        if self.parent is not None:
+            return self.parent.get_angular_velocity()
+        return Vector3D(self._angular_velocity)
+
+    def get_acceleration(self):
+        if self.parent is not None:
+            return self.parent.get_acceleration()
+        return Vector3D(self._acceleration)
+
+    def set_transform(self, transform):
+        with self._world._lock:
+            self._transform = Transform(transform.location, transform.rotation)
+
+    def set_location(self, location):
+        with self._world._lock:
+            self._transform.location = Location(location)
+
+    def set_target_velocity(self, velocity):
+        with self._world._lock:
+            self._velocity = Vector3D(velocity)
+
+    def set_target_angular_velocity(self, angular_velocity):
+        with self._world._lock:
+            self._angular_velocity = Vector3D(angular_velocity)
+
+    def add_impulse(self, impulse):
+        pass
+
+    def set_simulate_physics(self, enabled=True):
+        pass
+
+    def set_enable_gravity(self, enabled=True):
+        pass
+
+    def destroy(self):
+        return self._world._destroy_actor(self.id)
+
+    def step(self, dt: float):
+        pass
+
+    def __eq__(self, other):
+        return isinstance(other, Actor) and self.id == other.id
+
+    def __hash__(self):
+        return self.id
+
+    def __repr__(self):
+        return f"Actor(id={self.id}, type={self.type_id})"
+
+class Vehicle(Actor):
+    """
+    Kinematic bicycle model driven by VehicleControl, no tire or suspension dynamics
+    """
+
+    def __init__(self, world, actor_id: int, blueprint, transform, parent=None, attachment_type=AttachmentType.Rigid):
+        super().__init__(world, actor_id, blueprint, transform, parent, attachment_type)
+        self._control = VehicleControl()
+        self._light_state = VehicleLightState.NONE
+        self._physics = VehiclePhysicsControl(wheelbase=1.2 * blueprint.extent.x)
+        self._constant_velocity = None
+        self._speed = 0.0
+
+    def apply_control(self, control):
+        with self._world._lock:
+            self._control = control.copy()
+
+    def apply_ackermann_control(self, control):
+        with self._world._lock:
+            self._control = VehicleControl(
+                throttle=1.0 if control.speed > self._speed else 0.0,
+                brake=1.0 if control.speed < self._speed - 0.5 else 0.0,
+                steer=max(-1.0, min(1.0, math.degrees(control.steer) / self._physics.max_steer_angle)))
+
+    def get_control(self):
+        return self._control.copy()
+
+    def set_light_state(self, light_state):
+        self._light_state = VehicleLightState(int(light_state))
+
+    def get_light_state(self):
+        return self._light_state
+
+    def get_physics_control(self):
+        return self._physics
+
+    def apply_physics_control(self, physics_control):
+        self._physics = physics_control
+
+    def get_speed_limit(self):
+        return fake_settings.speed_limit
+
+    def set_autopilot(self, enabled=True, port=8000):
+        pass
+
+    def open_door(self, door):
+        pass
+
+    def close_door(self, door):
+        pass
+
+    def is_at_traffic_light(self):
+        return self.get_traffic_light() is not None
+
+    def get_traffic_light(self):
+        return None
+
+    def get_traffic_light_state(self):
+        return TrafficLightState.Green
+
+    def enable_constant_velocity(self, velocity):
+        with self._world._lock:
+            self._constant_velocity = Vector3D(velocity)
+
+    def disable_constant_velocity(self):
+        with self._world._lock:
+            self._constant_velocity = None
+
+    def set_target_velocity(self, velocity):
+        with self._world._lock:
+            self._velocity = Vector3D(velocity)
+            forward = self._transform.rotation.get_forward_vector()
+            self._speed = self._velocity.dot_2d(forward)
+
+    def step(self, dt: float):
+        if self.parent is not None or dt <= 0:
+            return
+        physics = self._physics
+        control = self._control
+        rotation = self._transform.rotation
+        yaw = math.radians(rotation.yaw)
+        old_velocity = self._velocity
+
+        if self._constant_velocity is not None:
+            speed = self._constant_velocity.x
+        else:
+            speed = self._speed
+            direction = -1.0 if control.reverse else 1.0
+            speed += direction * max(0.0, min(1.0, control.throttle)) * physics.max_acceleration * dt
+            braking = max(0.0, min(1.0, control.brake)) * physics.max_deceleration
+            if control.hand_brake:
+                braking = physics.max_deceleration
+            braking += ROLLING_RESISTANCE + DRAG * speed * speed
+            # braking slows down, it never changes the direction of travel
+            reduction = braking * dt
+            speed = max(0.0, speed - reduction) if speed > 0 else min(0.0, speed + reduction)
+
+        steer_angle = math.radians(max(-1.0, min(1.0, control.steer)) * physics.max_steer_angle)
+        yaw_rate = speed * math.tan(steer_angle) / physics.wheelbase
+        mid_yaw = yaw + 0.5 * yaw_rate * dt
+        location = self._transform.location
+        location.x += math.cos(mid_yaw) * speed * dt
+        location.y += math.sin(mid_yaw) * speed * dt
+        # flat world, the vehicle settles on the ground
+        location.z = 0.0
+        rotation.yaw = math.degrees(yaw + yaw_rate * dt)
+        rotation.pitch = 0.0
+        rotation.roll = 0.0
+
+        self._speed = speed
+        new_yaw = math.radians(rotation.yaw)
+        self._velocity = Vector3D(math.cos(new_yaw) * speed, math.sin(new_yaw) * speed, 0.0)
+        self._angular_velocity = Vector3D(0.0, 0.0, math.degrees(yaw_rate))
+        self._acceleration = (self._velocity - old_velocity) / dt
+
+    def __repr__(self):
+        return f"Vehicle(id={self.id}, type={self.type_id})"
+
+class Walker(Actor):
+
+    def __init__(self, world, actor_id: int, blueprint, transform, parent=None, attachment_type=AttachmentType.Rigid):
+        super().__init__(world, actor_id, blueprint, transform, parent, attachment_type)
+        self.bounding_box = BoundingBox(Location(), blueprint.extent)
+        self._control = WalkerControl(speed=0.0)
+
+    def apply_control(self, control):
+        with self._world._lock:
+            self._control = control.copy()
+
+    def get_control(self):
+        return self._control.copy()
+
+    def set_bones(self, bones):
+        pass
+
+    def blend_pose(self, blend):
+        pass
+
+    def step(self, dt: float):
+        if self.parent is not None or dt <= 0:
+            return
+        old_velocity = self._velocity
+        direction = Vector3D(self._control.direction.x, self._control.direction.y, 0.0).make_unit_vector()
+        self._velocity = direction * self._control.speed
+        location = self._transform.location
+        location.x += self._velocity.x * dt
+        location.y += self._velocity.y * dt
+        location.z = self.bounding_box.extent.z
+        if self._control.speed > 0 and direction.length() > 0:
+            self._transform.rotation.yaw = math.degrees(math.atan2(direction.y, direction.x))
+        self._acceleration = (self._velocity - old_velocity) / dt
+
+    def __repr__(self):
+        return f"Walker(id={self.id}, type={self.type_id})"
+
+class TrafficLight(Actor):
+    """
+    Part of a fixed cycle: green, yellow, then red while the crossing approaches have green
+    """
+
+    def __init__(self, world, actor_id: int, blueprint, transform, trigger_extent, junction_id: int, group: int, lane_ids, road_id: int):
+        super().__init__(world, actor_id, blueprint, transform)
+        self.trigger_volume = BoundingBox(Location(), trigger_extent)
+        self.junction_id = junction_id
+        self.group = group
+        self.road_id = road_id
+        self.lane_ids = list(lane_ids)
+        self.state = TrafficLightState.Red
+        self._frozen = False
+        self._elapsed = 0.0
+        self.green_time = 10.0
+        self.yellow_time = 2.0
+        self.red_time = 12.0
+
+    def get_state(self):
+        return self.state
+
+    def set_state(self, state):
+        with self._world._lock:
+            self.state = TrafficLightState(int(state))
+            self._elapsed = 0.0
+
+    def freeze(self, frozen):
+        self._frozen = frozen
+
+    def is_frozen(self):
+        return self._frozen
+
+    def get_elapsed_time(self):
+        return self._elapsed
+
+    def get_green_time(self):
+        return self.green_time
+
+    def get_yellow_time(self):
+        return self.yellow_time
+
+    def get_red_time(self):
+        return self.red_time
+
+    def set_green_time(self, seconds):
+        self.green_time = seconds
+
+    def set_yellow_time(self, seconds):
+        self.yellow_time = seconds
+
+    def set_red_time(self, seconds):
+        self.red_time = seconds
+
+    def get_pole_index(self):
+        return self.group
+
+    def get_group_traffic_lights(self):
+        return [a for a in self._world._traffic_lights if a.junction_id == self.junction_id]
+
+    def get_affected_lane_waypoints(self):
+        carla_map = self._world.get_map()
+        road = carla_map.roads[self.road_id]
+        return [carla_map.get_waypoint_xodr(self.road_id, lane_id, road.lanes[lane_id].length) for lane_id in self.lane_ids]
+
+    def get_stop_waypoints(self):
+        return self.get_affected_lane_waypoints()
+
+    def update(self, elapsed_seconds: float, dt: float):
+        if self._frozen:
+            return
+        cycle = self.green_time + self.yellow_time + self.red_time
+        # the two groups of a junction are offset by half a cycle
+        t = (elapsed_seconds + self.group * 0.5 * cycle) % cycle
+        if t < self.green_time:
+            state = TrafficLightState.Green
+        elif t < self.green_time + self.yellow_time:
+            state = TrafficLightState.Yellow
+        else:
+            state = TrafficLightState.Red
+        if state != self.state:
+            self.state = state
+            self._elapsed = 0.0
+        else:
+            self._elapsed += dt
+
+    def __repr__(self):
+        return f"TrafficLight(id={self.id}, state={self.state.name})"
+
+class Sensor(Actor):
+
+    def __init__(self, world, actor_id: int, blueprint, transform, parent=None, attachment_type=AttachmentType.Rigid):
+        super().__init__(world, actor_id, blueprint, transform, parent, attachment_type)
+        self._callback = None
+        self.sensor_tick = float(self.attributes.get("sensor_tick", "0"))
+        self._last_capture = None
+        # created by the world, produces the data of each tick
+        self._generator = None
+
+    @property
+    def parent_id(self):
+        return self.parent.id if self.parent is not None else -1
+
+    @property
+    def is_listening(self):
+        return self._callback is not None
+
+    def listen(self, callback):
+        self._callback = callback
+
+    def stop(self):
+        self._callback = None
+
+    def is_due(self, elapsed_seconds: float) -> bool:
+        if self._last_capture is not None and elapsed_seconds - self._last_capture < self.sensor_tick - 1e-6:
+            return False
+        self._last_capture = elapsed_seconds
+        return True
+
+    def __repr__(self):
+        return f"Sensor(id={self.id}, type={self.type_id})"
+
+class ActorList(object):
+
+    def __init__(self, actors):
+        self._actors = list(actors)
+
+    def filter(self, pattern: str):
+        return ActorList(a for a in self._actors if fnmatch.fnmatch(a.type_id, pattern))
+
+    def find(self, actor_id: int):
+        for actor in self._actors:
+            if actor.id == actor_id:
+                return actor
+        return None
+
+    def __getitem__(self, index):
+        return self._actors[index]
+
+    def __iter__(self):
+        return iter(self._actors)
+
+    def __len__(self):
+        return len(self._actors)
+
+    def __repr__(self):
+        return f"ActorList({self._actors})"
@@ -0,0 +1,216 @@
+import fnmatch
+from carla.geometry import Vector3D
+
+class ActorAttributeType(object):
+    Bool = "bool"
+    Int = "int"
+    Float = "float"
+    String = "string"
+    RGBColor = "color"
+
+class ActorAttribute(object):
+
+    def __init__(self, attribute_id: str, value: str, attribute_type: str = ActorAttributeType.String, recommended_values=None, is_modifiable: bool = True):
+        self.id = attribute_id
+        self.type = attribute_type
+        self.recommended_values = list(recommended_values) if recommended_values is not None else [value]
+        self.is_modifiable = is_modifiable
+        self._value = str(value)
+
+    def as_bool(self) -> bool:
+        return self._value.lower() in ("true", "1")
+
+    def as_int(self) -> int:
+        return int(float(self._value))
+
+    def as_float(self) -> float:
+        return float(self._value)
+
+    def as_str(self) -> str:
+        return self._value
+
+    def __str__(self):
+        return self._value
+
+    def __repr__(self):
+        return f"ActorAttribute(id={self.id}, type={self.type}, value={self._value})"
+
+class ActorBlueprint(object):
+
+    def __init__(self, blueprint_id: str, attributes=None, extent=None):
+        self.id = blueprint_id
+        self.tags = blueprint_id.split(".")
+        self._attributes = {a.id: a for a in (attributes or [])}
+        # half size of the bounding box of the spawned actor
+        self.extent = Vector3D(*extent) if isinstance(extent, tuple) else Vector3D(extent) if extent is not None else Vector3D(0.1, 0.1, 0.1)
+
+    def has_tag(self, tag: str) -> bool:
+        return tag in self.tags
+
+    def match_tags(self, pattern: str) -> bool:
+        return fnmatch.fnmatch(self.id, pattern) or any(fnmatch.fnmatch(t, pattern) for t in self.tags)
+
+    def has_attribute(self, attribute_id: str) -> bool:
+        return attribute_id in self._attributes
+
+    def get_attribute(self, attribute_id: str) -> ActorAttribute:
+        if attribute_id not in self._attributes:
+            raise IndexError(f"attribute '{attribute_id}' not found in blueprint '{self.id}'")
+        return self._attributes[attribute_id]
+
+    def set_attribute(self, attribute_id: str, value: str):
+        attribute = self.get_attribute(attribute_id)
+        if not attribute.is_modifiable:
+            raise RuntimeError(f"attribute '{attribute_id}' of blueprint '{self.id}' is not modifiable")
+        attribute._value = str(value)
+
+    def copy(self):
+        blueprint = ActorBlueprint(self.id, extent=self.extent)
+        for a in self._attributes.values():
+            blueprint._attributes[a.id] = ActorAttribute(a.id, a._value, a.type, a.recommended_values, a.is_modifiable)
+        return blueprint
+
+    def attribute_values(self):
+        return {a.id: a._value for a in self._attributes.values()}
+
+    def __iter__(self):
+        return iter(self._attributes.values())
+
+    def __len__(self):
+        return len(self._attributes)
+
+    def __repr__(self):
+        return f"ActorBlueprint(id={self.id}, tags={self.tags})"
+
+class BlueprintLibrary(object):
+
+    def __init__(self, blueprints):
+        self._blueprints = list(blueprints)
+
+    def find(self, blueprint_id: str) -> ActorBlueprint:
+        for blueprint in self._blueprints:
+            if blueprint.id == blueprint_id:
+                return blueprint
+        raise IndexError(f"blueprint '{blueprint_id}' not found")
+
+    def filter(self, pattern: str):
+        return BlueprintLibrary(b for b in self._blueprints if b.match_tags(pattern))
+
+    def __getitem__(self, index):
+        return self._blueprints[index]
+
+    def __iter__(self):
+        return iter(self._blueprints)
+
+    def __len__(self):
+        return len(self._blueprints)
+
+    def __repr__(self):
+        return f"BlueprintLibrary({len(self._blueprints)} blueprints)"
+
+VEHICLE_MODELS = {
+    "vehicle.audi.a2": (1.85, 0.9, 0.77),
+    "vehicle.audi.tt": (2.09, 1.0, 0.69),
+    "vehicle.bmw.grandtourer": (2.31, 1.12, 0.83),
+    "vehicle.citroen.c3": (1.99, 0.93, 0.81),
+    "vehicle.dodge.charger_2020": (2.5, 1.05, 0.77),
+    "vehicle.ford.crown": (2.68, 0.9, 0.78),
+    "vehicle.ford.mustang": (2.36, 0.94, 0.65),
+    "vehicle.lincoln.mkz_2020": (2.45, 1.05, 0.75),
+    "vehicle.mercedes.coupe_2020": (2.34, 1.0, 0.72),
+    "vehicle.mercedes.sprinter": (2.96, 1.0, 1.28),
+    "vehicle.mini.cooper_s_2021": (2.26, 1.03, 0.89),
+    "vehicle.nissan.micra": (1.82, 0.9, 0.77),
+    "vehicle.nissan.patrol_2021": (2.78, 1.07, 1.07),
+    "vehicle.tesla.model3": (2.4, 1.08, 0.76),
+    "vehicle.toyota.prius": (2.26, 1.0, 0.76),
+    "vehicle.volkswagen.t2_2021": (2.2, 0.89, 1.04),
+}
+
+CAMERA_TYPES = ["rgb", "depth", "semantic_segmentation", "instance_segmentation", "dvs", "optical_flow", "normals"]
+
+def _attributes(*specs):
+    return [ActorAttribute(*spec) for spec in specs]
+
+def _sensor_tick():
+    return ("sensor_tick", "0.0", ActorAttributeType.Float)
+
+def create_blueprint_library() -> BlueprintLibrary:
+    blueprints = []
+    for model, extent in VEHICLE_MODELS.items():
+        blueprints.append(ActorBlueprint(model, _attributes(
+            ("role_name", "autopilot"),
+            ("color", "255,255,255", ActorAttributeType.RGBColor, ["255,255,255", "0,0,0", "200,20,20"]),
+            ("number_of_wheels", "4", ActorAttributeType.Int, None, False),
+            ("generation", "2", ActorAttributeType.Int, None, False),
+            ("has_lights", "true", ActorAttributeType.Bool, None, False),
+            ("sticky_control", "true", ActorAttributeType.Bool),
+            ("terramechanics", "false", ActorAttributeType.Bool),
+        ), extent=extent))
+
+    for i in range(1, 50):
+        blueprints.append(ActorBlueprint(f"walker.pedestrian.{i:04d}", _attributes(
+            ("role_name", "pedestrian"),
+            ("is_invincible", "true", ActorAttributeType.Bool),
+            ("speed", "1.4", ActorAttributeType.Float, ["1.4", "2.8"]),
+            ("generation", "2", ActorAttributeType.Int, None, False),
+        ), extent=(0.19, 0.19, 0.93)))
+
+    for camera in CAMERA_TYPES:
+        blueprints.append(ActorBlueprint(f"sensor.camera.{camera}", _attributes(
+            ("role_name", "front"),
+            ("image_size_x", "800", ActorAttributeType.Int),
+            ("image_size_y", "600", ActorAttributeType.Int),
+            ("fov", "90", ActorAttributeType.Float),
+            ("gamma", "2.2", ActorAttributeType.Float),
+            ("lens_circle_multiplier", "0.0", ActorAttributeType.Float),
+            ("lens_circle_falloff", "5.0", ActorAttributeType.Float),
+            ("chromatic_aberration_intensity", "0.0", ActorAttributeType.Float),
+            ("chromatic_aberration_offset", "0.0", ActorAttributeType.Float),
+            _sensor_tick(),
+        )))
+
+    blueprints.append(ActorBlueprint("sensor.lidar.ray_cast", _attributes(
+        ("role_name", "front"),
+        ("channels", "32", ActorAttributeType.Int),
+        ("range", "10.0", ActorAttributeType.Float),
+        ("points_per_second", "56000", ActorAttributeType.Int),
+        ("rotation_frequency", "10.0", ActorAttributeType.Float),
+        ("upper_fov", "10.0", ActorAttributeType.Float),
+        ("lower_fov", "-30.0", ActorAttributeType.Float),
+        ("horizontal_fov", "360.0", ActorAttributeType.Float),
+        ("atmosphere_attenuation_rate", "0.004", ActorAttributeType.Float),
+        ("dropoff_general_rate", "0.45", ActorAttributeType.Float),
+        ("dropoff_intensity_limit", "0.8", ActorAttributeType.Float),
+        ("dropoff_zero_intensity", "0.4", ActorAttributeType.Float),
+        ("noise_stddev", "0.0", ActorAttributeType.Float),
+        _sensor_tick(),
+    )))
+    blueprints.append(ActorBlueprint("sensor.other.radar", _attributes(
+        ("role_name", "front"),
+        ("horizontal_fov", "30.0", ActorAttributeType.Float),
+        ("vertical_fov", "30.0", ActorAttributeType.Float),
+        ("range", "100.0", ActorAttributeType.Float),
+        ("points_per_second", "1500", ActorAttributeType.Int),
+        _sensor_tick(),
+    )))
+    blueprints.append(ActorBlueprint("sensor.other.imu", _attributes(
+        ("role_name", "front"),
+        ("noise_accel_stddev_x", "0.0", ActorAttributeType.Float),
+        ("noise_accel_stddev_y", "0.0", ActorAttributeType.Float),
+        ("noise_accel_stddev_z", "0.0", ActorAttributeType.Float),
+        ("noise_gyro_stddev_x", "0.0", ActorAttributeType.Float),
+        ("noise_gyro_stddev_y", "0.0", ActorAttributeType.Float),
+        ("noise_gyro_stddev_z", "0.0", ActorAttributeType.Float),
+        _sensor_tick(),
+    )))
+    blueprints.append(ActorBlueprint("sensor.other.gnss", _attributes(
+        ("role_name", "front"),
+        ("noise_alt_stddev", "0.0", ActorAttributeType.Float),
+        ("noise_lat_stddev", "0.0", ActorAttributeType.Float),
+        ("noise_lon_stddev", "0.0", ActorAttributeType.Float),
+        _sensor_tick(),
+    )))
+    blueprints.append(ActorBlueprint("sensor.other.collision", _attributes(("role_name", "front"))))
+    blueprints.append(ActorBlueprint("sensor.other.lane_invasion", _attributes(("role_name", "front"))))
+    return BlueprintLibrary(blueprints)
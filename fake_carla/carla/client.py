@@ -0,0 +1,130 @@
+import threading
+from carla import command
+from carla.settings import fake_settings
+from carla.world import World
+
+class _Server(object):
+    """
+    The world shared by all clients connecting to the same host and port
+    """
+
+    _servers = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, host: str, port: int):
+        with cls._lock:
+            server = cls._servers.get((host, port))
+            if server is None:
+                server = _Server()
+                cls._servers[(host, port)] = server
+            return server
+
+    def __init__(self):
+        self.world = World()
+
+    def load_world(self, map_name: str):
+        self.world.shutdown()
+        self.world = World(map_name.split("/")[-1])
+        return self.world
+
+class Client(object):
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 2000, worker_threads: int = 0):
+        self._server = _Server.get(host, port)
+        self._timeout = 5.0
+
+    def set_timeout(self, seconds: float):
+        self._timeout = seconds
+
+    def get_client_version(self) -> str:
+        return fake_settings.server_version
+
+    def get_server_version(self) -> str:
+        return fake_settings.server_version
+
+    def get_world(self):
+        return self._server.world
+
+    def get_available_maps(self):
+        return ["/Game/Carla/Maps/FakeGrid"]
+
+    def load_world(self, map_name: str, reset_settings: bool = True, map_layers=None):
+        return self._server.load_world(map_name)
+
+    def reload_world(self, reset_settings: bool = True):
+        return self._server.load_world(self._server.world.get_map().name)
+
+    def get_trafficmanager(self, port: int = 8000):
+        return TrafficManager(port)
+
+    def apply_batch(self, commands, do_tick: bool = False):
+        self.apply_batch_sync(commands, do_tick)
+
+    def apply_batch_sync(self, commands, do_tick: bool = False):
+        world = self._server.world
+        responses = [self._apply(world, c) for c in commands]
+        if do_tick:
+            world.tick()
+        return responses
+
+    def _apply(self, world, c, future_id=None):
+        actor_id = getattr(c, "actor_id", None)
+        if actor_id is command.FUTURE_ACTOR:
+            actor_id = future_id
+        try:
+            if isinstance(c, command.SpawnActor):
+                parent_id = future_id if c.parent_id is command.FUTURE_ACTOR else c.parent_id
+                parent = world.get_actor(parent_id) if parent_id is not None else None
+                if parent_id is not None and parent is None:
+                    raise RuntimeError(f"parent actor {parent_id} not found")
+                actor_id = world.spawn_actor(c.blueprint, c.transform, attach_to=parent).id
+                for then in c._then:
+                    response = self._apply(world, then, actor_id)
+                    if response.has_error():
+                        return command.Response(actor_id, response.error)
+                return command.Response(actor_id)
+
+            actor = world.get_actor(actor_id)
+            if actor is None:
+                raise RuntimeError(f"actor {actor_id} not found")
+            if isinstance(c, command.DestroyActor):
+                actor.destroy()
+            elif isinstance(c, command.ApplyTransform):
+                actor.set_transform(c.transform)
+            elif isinstance(c, command.ApplyLocation):
+                actor.set_location(c.location)
+            elif isinstance(c, command.ApplyTargetVelocity):
+                actor.set_target_velocity(c.velocity)
+            elif isinstance(c, command.ApplyTargetAngularVelocity):
+                actor.set_target_angular_velocity(c.angular_velocity)
+            elif isinstance(c, (command.ApplyVehicleControl, command.ApplyWalkerControl)):
+                actor.apply_control(c.control)
+            elif isinstance(c, command.SetVehicleLightState):
+                actor.set_light_state(c.light_state)
+            return command.Response(actor_id)
+        except (RuntimeError, AttributeError) as e:
+            return command.Response(actor_id or 0, str(e))
+
+class TrafficManager(object):
+    """
+    Accepts the calls, vehicles on autopilot are not driven
+    """
+
+    def __init__(self, port: int):
+        self.port = port
+
+    def get_port(self) -> int:
+        return self.port
+
+    def set_synchronous_mode(self, enabled: bool):
+        pass
+
+    def set_random_device_seed(self, seed: int):
+        pass
+
+    def set_global_distance_to_leading_vehicle(self, distance: float):
+        pass
+
+    def global_percentage_speed_difference(self, percentage: float):
+        pass
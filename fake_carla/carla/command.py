@@ -0,0 +1,110 @@
+class FutureActor(object):
+    """
+    Stands for the actor spawned by the previous command of a then() chain
+    """
+
+FUTURE_ACTOR = FutureActor()
+
+class Command(object):
+
+    def __init__(self):
+        self._then = []
+
+    def then(self, command):
+        self._then.append(command)
+        return self
+
+class SpawnActor(Command):
+
+    def __init__(self, blueprint, transform, parent_id=None):
+        super().__init__()
+        self.blueprint = blueprint
+        self.transform = transform
+        self.parent_id = parent_id
+
+class DestroyActor(Command):
+
+    def __init__(self, actor_id):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+
+class ApplyTransform(Command):
+
+    def __init__(self, actor_id, transform):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.transform = transform
+
+class ApplyLocation(Command):
+
+    def __init__(self, actor_id, location):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.location = location
+
+class ApplyTargetVelocity(Command):
+
+    def __init__(self, actor_id, velocity):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.velocity = velocity
+
+class ApplyTargetAngularVelocity(Command):
+
+    def __init__(self, actor_id, angular_velocity):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.angular_velocity = angular_velocity
+
+class ApplyVehicleControl(Command):
+
+    def __init__(self, actor_id, control):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.control = control
+
+class ApplyWalkerControl(Command):
+
+    def __init__(self, actor_id, control):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.control = control
+
+class SetVehicleLightState(Command):
+
+    def __init__(self, actor_id, light_state):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.light_state = light_state
+
+class SetAutopilot(Command):
+
+    def __init__(self, actor_id, enabled, port=8000):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.enabled = enabled
+
+class SetSimulatePhysics(Command):
+
+    def __init__(self, actor_id, enabled):
+        super().__init__()
+        self.actor_id = _actor_id(actor_id)
+        self.enabled = enabled
+
+class Response(object):
+
+    def __init__(self, actor_id=0, error=""):
+        self.actor_id = actor_id
+        self.error = error
+
+    def has_error(self) -> bool:
+        return len(self.error) > 0
+
+    def __repr__(self):
+        return f"Response(actor_id={self.actor_id}, error='{self.error}')"
+
+def _actor_id(actor):
+    # commands accept actors and actor ids
+    if actor is FUTURE_ACTOR or isinstance(actor, int):
+        return actor
+    return actor.id
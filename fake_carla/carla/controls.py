@@ -0,0 +1,116 @@
+from carla.geometry import Vector3D
+
+class VehicleControl(object):
+
+    def __init__(self, throttle=0.0, steer=0.0, brake=0.0, hand_brake=False, reverse=False, manual_gear_shift=False, gear=0):
+        self.throttle = throttle
+        self.steer = steer
+        self.brake = brake
+        self.hand_brake = hand_brake
+        self.reverse = reverse
+        self.manual_gear_shift = manual_gear_shift
+        self.gear = gear
+
+    def copy(self):
+        return VehicleControl(self.throttle, self.steer, self.brake, self.hand_brake, self.reverse, self.manual_gear_shift, self.gear)
+
+    def __eq__(self, other):
+        return isinstance(other, VehicleControl) and vars(self) == vars(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "VehicleControl(throttle=%f, steer=%f, brake=%f, hand_brake=%s, reverse=%s, manual_gear_shift=%s, gear=%d)" % (
+            self.throttle, self.steer, self.brake, self.hand_brake, self.reverse, self.manual_gear_shift, self.gear)
+
+class VehicleAckermannControl(object):
+
+    def __init__(self, steer=0.0, steer_speed=0.0, speed=0.0, acceleration=0.0, jerk=0.0):
+        self.steer = steer
+        self.steer_speed = steer_speed
+        self.speed = speed
+        self.acceleration = acceleration
+        self.jerk = jerk
+
+class WalkerControl(object):
+
+    def __init__(self, direction=None, speed=0.0, jump=False):
+        self.direction = Vector3D(direction) if direction is not None else Vector3D(1.0, 0.0, 0.0)
+        self.speed = speed
+        self.jump = jump
+
+    def copy(self):
+        return WalkerControl(self.direction, self.speed, self.jump)
+
+    def __repr__(self):
+        return f"WalkerControl(direction={self.direction}, speed={self.speed:.6f}, jump={self.jump})"
+
+class VehiclePhysicsControl(object):
+    """
+    Only the values used by the kinematic model are interpreted
+    """
+
+    def __init__(self, max_acceleration=3.5, max_deceleration=8.0, max_steer_angle=70.0, wheelbase=2.8):
+        self.max_acceleration = max_acceleration
+        self.max_deceleration = max_deceleration
+        self.max_steer_angle = max_steer_angle
+        self.wheelbase = wheelbase
+        self.mass = 1500.0
+        self.drag_coefficient = 0.3
+        self.use_sweep_wheel_collision = False
+        self.use_gear_autobox = True
+        self.wheels = []
+
+class Color(object):
+
+    def __init__(self, r=0, g=0, b=0, a=255):
+        self.r = r
+        self.g = g
+        self.b = b
+        self.a = a
+
+class WeatherParameters(object):
+
+    def __init__(self, cloudiness=0.0, precipitation=0.0, precipitation_deposits=0.0, wind_intensity=0.0,
+                 sun_azimuth_angle=0.0, sun_altitude_angle=0.0, fog_density=0.0, wetness=0.0):
+        self.cloudiness = cloudiness
+        self.precipitation = precipitation
+        self.precipitation_deposits = precipitation_deposits
+        self.wind_intensity = wind_intensity
+        self.sun_azimuth_angle = sun_azimuth_angle
+        self.sun_altitude_angle = sun_altitude_angle
+        self.fog_density = fog_density
+        self.wetness = wetness
+
+    def __repr__(self):
+        return f"WeatherParameters(cloudiness={self.cloudiness}, precipitation={self.precipitation}, sun_altitude_angle={self.sun_altitude_angle})"
+
+WeatherParameters.Default = WeatherParameters(sun_altitude_angle=45.0)
+WeatherParameters.ClearNoon = WeatherParameters(cloudiness=5.0, sun_altitude_angle=45.0)
+WeatherParameters.CloudyNoon = WeatherParameters(cloudiness=60.0, sun_altitude_angle=45.0)
+WeatherParameters.WetNoon = WeatherParameters(cloudiness=5.0, precipitation_deposits=50.0, wetness=50.0, sun_altitude_angle=45.0)
+WeatherParameters.HardRainNoon = WeatherParameters(cloudiness=100.0, precipitation=100.0, precipitation_deposits=90.0, wetness=100.0, sun_altitude_angle=45.0)
+WeatherParameters.ClearSunset = WeatherParameters(cloudiness=5.0, sun_altitude_angle=15.0)
+WeatherParameters.ClearNight = WeatherParameters(cloudiness=5.0, sun_altitude_angle=-80.0)
+
+class WorldSettings(object):
+
+    def __init__(self, synchronous_mode=False, no_rendering_mode=False, fixed_delta_seconds=None):
+        self.synchronous_mode = synchronous_mode
+        self.no_rendering_mode = no_rendering_mode
+        self.fixed_delta_seconds = fixed_delta_seconds
+        self.substepping = True
+        self.max_substep_delta_time = 0.01
+        self.max_substeps = 10
+        self.max_culling_distance = 0.0
+        self.deterministic_ragdolls = False
+        self.tile_stream_distance = 3000.0
+        self.actor_active_distance = 2000.0
+
+    def copy(self):
+        settings = WorldSettings()
+        settings.__dict__.update(self.__dict__)
+        return settings
+
+    def __repr__(self):
+        return f"WorldSettings(synchronous_mode={self.synchronous_mode}, no_rendering_mode={self.no_rendering_mode}, fixed_delta_seconds={self.fixed_delta_seconds})"
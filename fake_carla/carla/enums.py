@@ -0,0 +1,106 @@
+from enum import IntEnum, IntFlag
+
+class LaneType(IntFlag):
+    NONE = 1
+    Driving = 2
+    Stop = 4
+    Shoulder = 8
+    Biking = 16
+    Sidewalk = 32
+    Border = 64
+    Restricted = 128
+    Parking = 256
+    Bidirectional = 512
+    Median = 1024
+    Special1 = 2048
+    Special2 = 4096
+    Special3 = 8192
+    RoadWorks = 16384
+    Tram = 32768
+    Rail = 65536
+    Entry = 131072
+    Exit = 262144
+    OffRamp = 524288
+    OnRamp = 1048576
+    Any = 0xFFFFFFFE
+
+class LaneChange(IntFlag):
+    NONE = 0
+    Right = 1
+    Left = 2
+    Both = 3
+
+class LaneMarkingType(IntEnum):
+    NONE = 0
+    Other = 1
+    Broken = 2
+    Solid = 3
+    SolidSolid = 4
+    SolidBroken = 5
+    BrokenSolid = 6
+    BrokenBroken = 7
+    BottsDots = 8
+    Grass = 9
+    Curb = 10
+
+class LaneMarkingColor(IntEnum):
+    Standard = 0
+    Blue = 1
+    Green = 2
+    Red = 3
+    White = 0
+    Yellow = 4
+    Other = 5
+
+class AttachmentType(IntEnum):
+    Rigid = 0
+    SpringArm = 1
+    SpringArmGhost = 2
+
+class VehicleLightState(IntFlag):
+    NONE = 0
+    Position = 1
+    LowBeam = 2
+    HighBeam = 4
+    Brake = 8
+    RightBlinker = 16
+    LeftBlinker = 32
+    Reverse = 64
+    Fog = 128
+    Interior = 256
+    Special1 = 512
+    Special2 = 1024
+    All = 0xFFFFFFFF
+
+class VehicleDoor(IntEnum):
+    FL = 0
+    FR = 1
+    RL = 2
+    RR = 3
+    All = 6
+
+class TrafficLightState(IntEnum):
+    Red = 0
+    Yellow = 1
+    Green = 2
+    Off = 3
+    Unknown = 4
+
+class MapLayer(IntFlag):
+    NONE = 0
+    Buildings = 1
+    Decals = 2
+    Foliage = 4
+    Ground = 8
+    ParkedVehicles = 16
+    Particles = 32
+    Props = 64
+    StreetLights = 128
+    Walls = 256
+    All = 65535
+
+class ColorConverter(IntEnum):
+    Raw = 0
+    Depth = 1
+    LogarithmicDepth = 2
+    CityScapesPalette = 3
@@ -0,0 +1,260 @@
+import math
+
+class Vector2D(object):
+
+    def __init__(self, x=0.0, y=0.0):
+        self.x = float(x)
+        self.y = float(y)
+
+    def length(self):
+        return math.sqrt(self.x**2 + self.y**2)
+
+    def __add__(self, other):
+        return Vector2D(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return Vector2D(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, k):
+        return Vector2D(self.x * k, self.y * k)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return isinstance(other, Vector2D) and self.x == other.x and self.y == other.y
+
+    def __repr__(self):
+        return f"Vector2D(x={self.x:.6f}, y={self.y:.6f})"
+
+class Vector3D(object):
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, Vector3D):
+            x, y, z = x.x, x.y, x.z
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def _new(self, x, y, z):
+        return type(self)(x, y, z)
+
+    def length(self):
+        return math.sqrt(self.x**2 + self.y**2 + self.z**2)
+
+    def squared_length(self):
+        return self.x**2 + self.y**2 + self.z**2
+
+    def distance(self, other):
+        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2 + (self.z - other.z)**2)
+
+    def distance_squared(self, other):
+        return (self.x - other.x)**2 + (self.y - other.y)**2 + (self.z - other.z)**2
+
+    def distance_2d(self, other):
+        return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def dot_2d(self, other):
+        return self.x * other.x + self.y * other.y
+
+    def cross(self, other):
+        return Vector3D(
+            self.y * other.z - self.z * other.y,
+            self.z * other.x - self.x * other.z,
+            self.x * other.y - self.y * other.x)
+
+    def make_unit_vector(self):
+        length = self.length()
+        if length == 0:
+            return self._new(0, 0, 0)
+        return self._new(self.x / length, self.y / length, self.z / length)
+
+    def get_vector_angle(self, other):
+        denominator = self.length() * other.length()
+        if denominator == 0:
+            return 0.0
+        return math.acos(max(-1.0, min(1.0, self.dot(other) / denominator)))
+
+    def __add__(self, other):
+        return self._new(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return self._new(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, k):
+        return self._new(self.x * k, self.y * k, self.z * k)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, k):
+        return self._new(self.x / k, self.y / k, self.z / k)
+
+    def __neg__(self):
+        return self._new(-self.x, -self.y, -self.z)
+
+    def __abs__(self):
+        return self._new(abs(self.x), abs(self.y), abs(self.z))
+
+    def __eq__(self, other):
+        return isinstance(other, Vector3D) and self.x == other.x and self.y == other.y and self.z == other.z
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(x={self.x:.6f}, y={self.y:.6f}, z={self.z:.6f})"
+
+class Location(Vector3D):
+    __slots__ = ()
+
+class Rotation(object):
+    """
+    Angles in degrees, left-handed (Unreal) coordinate system: x forward, y right, z up
+    """
+
+    __slots__ = ("pitch", "yaw", "roll")
+
+    def __init__(self, pitch=0.0, yaw=0.0, roll=0.0):
+        self.pitch = float(pitch)
+        self.yaw = float(yaw)
+        self.roll = float(roll)
+
+    def _trig(self):
+        p, y, r = math.radians(self.pitch), math.radians(self.yaw), math.radians(self.roll)
+        return math.cos(p), math.sin(p), math.cos(y), math.sin(y), math.cos(r), math.sin(r)
+
+    def get_forward_vector(self):
+        cp, sp, cy, sy, _, _ = self._trig()
+        return Vector3D(cp * cy, cp * sy, sp)
+
+    def get_right_vector(self):
+        cp, sp, cy, sy, cr, sr = self._trig()
+        return Vector3D(cy * sp * sr - sy * cr, sy * sp * sr + cy * cr, -cp * sr)
+
+    def get_up_vector(self):
+        cp, sp, cy, sy, cr, sr = self._trig()
+        return Vector3D(-cy * sp * cr - sy * sr, -sy * sp * cr + cy * sr, cp * cr)
+
+    def matrix(self):
+        """
+        3x3 rotation as nested lists, the columns are the forward, right and up vectors
+        """
+        f, r, u = self.get_forward_vector(), self.get_right_vector(), self.get_up_vector()
+        return [[f.x, r.x, u.x], [f.y, r.y, u.y], [f.z, r.z, u.z]]
+
+    def __eq__(self, other):
+        return isinstance(other, Rotation) and self.pitch == other.pitch and self.yaw == other.yaw and self.roll == other.roll
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Rotation(pitch={self.pitch:.6f}, yaw={self.yaw:.6f}, roll={self.roll:.6f})"
+
+class Transform(object):
+
+    __slots__ = ("location", "rotation")
+
+    def __init__(self, location=None, rotation=None):
+        self.location = Location(location) if location is not None else Location()
+        self.rotation = Rotation(rotation.pitch, rotation.yaw, rotation.roll) if rotation is not None else Rotation()
+
+    def copy(self):
+        return Transform(self.location, self.rotation)
+
+    def transform_vector(self, vector):
+        """
+        Rotates the vector in place and returns it
+        """
+        m = self.rotation.matrix()
+        x, y, z = vector.x, vector.y, vector.z
+        vector.x = m[0][0] * x + m[0][1] * y + m[0][2] * z
+        vector.y = m[1][0] * x + m[1][1] * y + m[1][2] * z
+        vector.z = m[2][0] * x + m[2][1] * y + m[2][2] * z
+        return vector
+
+    def transform(self, point):
+        """
+        Transforms the point from local into world space, in place, and returns it
+        """
+        self.transform_vector(point)
+        point.x += self.location.x
+        point.y += self.location.y
+        point.z += self.location.z
+        return point
+
+    def inverse_transform(self, point):
+        m = self.rotation.matrix()
+        x, y, z = point.x - self.location.x, point.y - self.location.y, point.z - self.location.z
+        point.x = m[0][0] * x + m[1][0] * y + m[2][0] * z
+        point.y = m[0][1] * x + m[1][1] * y + m[2][1] * z
+        point.z = m[0][2] * x + m[1][2] * y + m[2][2] * z
+        return point
+
+    def get_forward_vector(self):
+        return self.rotation.get_forward_vector()
+
+    def get_right_vector(self):
+        return self.rotation.get_right_vector()
+
+    def get_up_vector(self):
+        return self.rotation.get_up_vector()
+
+    def get_matrix(self):
+        m = self.rotation.matrix()
+        t = self.location
+        return [m[0] + [t.x], m[1] + [t.y], m[2] + [t.z], [0.0, 0.0, 0.0, 1.0]]
+
+    def get_inverse_matrix(self):
+        m = self.rotation.matrix()
+        t = self.location
+        rt = [[m[j][i] for j in range(3)] for i in range(3)]
+        translation = [-(rt[i][0] * t.x + rt[i][1] * t.y + rt[i][2] * t.z) for i in range(3)]
+        return [rt[i] + [translation[i]] for i in range(3)] + [[0.0, 0.0, 0.0, 1.0]]
+
+    def __eq__(self, other):
+        return isinstance(other, Transform) and self.location == other.location and self.rotation == other.rotation
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Transform({self.location}, {self.rotation})"
+
+class BoundingBox(object):
+
+    def __init__(self, location=None, extent=None, rotation=None):
+        self.location = Location(location) if location is not None else Location()
+        self.extent = Vector3D(extent) if extent is not None else Vector3D()
+        self.rotation = Rotation(rotation.pitch, rotation.yaw, rotation.roll) if rotation is not None else Rotation()
+
+    def get_local_vertices(self):
+        e = self.extent
+        local = Transform(self.location, self.rotation)
+        return [local.transform(Location(sx * e.x, sy * e.y, sz * e.z))
+                for sx in (-1, 1) for sy in (-1, 1) for sz in (-1, 1)]
+
+    def get_world_vertices(self, transform):
+        return [transform.transform(v) for v in self.get_local_vertices()]
+
+    def contains(self, world_point, transform):
+        local = transform.inverse_transform(Location(world_point))
+        local = Transform(self.location, self.rotation).inverse_transform(local)
+        return abs(local.x) <= self.extent.x and abs(local.y) <= self.extent.y and abs(local.z) <= self.extent.z
+
+    def __repr__(self):
+        return f"BoundingBox({self.location}, Extent(x={self.extent.x:.6f}, y={self.extent.y:.6f}, z={self.extent.z:.6f}), {self.rotation})"
+
+class GeoLocation(object):
+
+    def __init__(self, latitude=0.0, longitude=0.0, altitude=0.0):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = altitude
+
+    def __repr__(self):
+        return f"GeoLocation(latitude={self.latitude:.6f}, longitude={self.longitude:.6f}, altitude={self.altitude:.6f})"
@@ -0,0 +1,450 @@
+import math
+import numpy as np
+from carla.geometry import Location, Rotation, Transform, GeoLocation
+from carla.enums import LaneType, LaneChange, LaneMarkingType, LaneMarkingColor
+
+SAMPLE_DISTANCE = 1.0
+EARTH_RADIUS = 6378137.0
+
+class LaneMarking(object):
+
+    def __init__(self, marking_type=LaneMarkingType.NONE, lane_change=LaneChange.NONE, color=LaneMarkingColor.Standard, width=0.15):
+        self.type = marking_type
+        self.lane_change = lane_change
+        self.color = color
+        self.width = width
+
+    def __repr__(self):
+        return f"LaneMarking(type={self.type.name}, lane_change={self.lane_change.name})"
+
+SOLID = LaneMarking(LaneMarkingType.Solid)
+CENTER = LaneMarking(LaneMarkingType.SolidSolid, color=LaneMarkingColor.Yellow)
+BROKEN = LaneMarking(LaneMarkingType.Broken, LaneChange.Both)
+NO_MARKING = LaneMarking()
+
+class Lane(object):
+    """
+    A single lane as a polyline in driving direction
+    """
+
+    def __init__(self, uid: int, road_id: int, lane_id: int, points, is_junction: bool = False, junction_id: int = -1):
+        self.uid = uid
+        self.road_id = road_id
+        self.section_id = 0
+        self.lane_id = lane_id
+        self.is_junction = is_junction
+        self.junction_id = junction_id
+        self.points = np.asarray(points, dtype=np.float64)
+        segments = np.diff(self.points, axis=0)
+        segment_lengths = np.hypot(segments[:, 0], segments[:, 1])
+        self.s = np.concatenate([[0.0], np.cumsum(segment_lengths)])
+        self.length = float(self.s[-1])
+        self.headings = np.arctan2(segments[:, 1], segments[:, 0])
+        self.successors = []
+        self.predecessors = []
+        # set by the road for regular lanes
+        self.road = None
+        self.left_marking = NO_MARKING
+        self.right_marking = NO_MARKING
+        self.lane_width = 3.5
+
+    def position(self, s: float):
+        s = min(max(s, 0.0), self.length)
+        i = int(np.searchsorted(self.s, s, side="right")) - 1
+        i = min(max(i, 0), len(self.headings) - 1)
+        t = s - self.s[i]
+        heading = self.headings[i]
+        x = self.points[i, 0] + t * math.cos(heading)
+        y = self.points[i, 1] + t * math.sin(heading)
+        return x, y, heading
+
+    def sample(self, distance: float):
+        """
+        Returns (points, s) every distance meters, including both ends
+        """
+        count = max(2, int(math.ceil(self.length / distance)) + 1)
+        s = np.linspace(0.0, self.length, count)
+        points = np.array([self.position(v)[:2] for v in s])
+        return points, s
+
+class Road(object):
+    """
+    Straight road with lanes_per_direction lanes on each side of the reference line.
+    Lanes with negative ids drive along the reference line, the others against it
+    """
+
+    def __init__(self, road_id: int, start, end, lanes_per_direction: int, lane_width: float):
+        self.road_id = road_id
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.lanes_per_direction = lanes_per_direction
+        self.lane_width = lane_width
+        self.lanes = {}
+        direction = self.end - self.start
+        self.length = float(np.hypot(direction[0], direction[1]))
+        self.direction = direction / self.length
+        # right of the reference direction in the left-handed coordinate system
+        self.right = np.array([-self.direction[1], self.direction[0]])
+
+    def lane_points(self, lane_id: int):
+        k = abs(lane_id)
+        offset = (k - 0.5) * self.lane_width * (1.0 if lane_id < 0 else -1.0)
+        a = self.start + offset * self.right
+        b = self.end + offset * self.right
+        return [a, b] if lane_id < 0 else [b, a]
+
+    def lane(self, lane_id: int):
+        return self.lanes.get(lane_id)
+
+class Waypoint(object):
+
+    def __init__(self, carla_map, lane: Lane, s: float):
+        self._map = carla_map
+        self._lane = lane
+        self.s = min(max(s, 0.0), lane.length)
+        x, y, heading = lane.position(self.s)
+        self.transform = Transform(Location(x, y, 0.0), Rotation(yaw=math.degrees(heading)))
+
+    @property
+    def id(self):
+        return hash((self._lane.uid, int(round(self.s * 100))))
+
+    @property
+    def road_id(self):
+        return self._lane.road_id
+
+    @property
+    def section_id(self):
+        return self._lane.section_id
+
+    @property
+    def lane_id(self):
+        return self._lane.lane_id
+
+    @property
+    def is_junction(self):
+        return self._lane.is_junction
+
+    @property
+    def junction_id(self):
+        return self._lane.junction_id
+
+    @property
+    def is_intersection(self):
+        return self._lane.is_junction
+
+    @property
+    def lane_width(self):
+        return self._lane.lane_width
+
+    @property
+    def lane_type(self):
+        return LaneType.Driving
+
+    @property
+    def left_lane_marking(self):
+        return self._lane.left_marking
+
+    @property
+    def right_lane_marking(self):
+        return self._lane.right_marking
+
+    @property
+    def lane_change(self):
+        change = LaneChange.NONE
+        if self._lane.right_marking.lane_change & LaneChange.Right:
+            change |= LaneChange.Right
+        if self._lane.left_marking.lane_change & LaneChange.Left:
+            change |= LaneChange.Left
+        return change
+
+    def get_junction(self):
+        return None
+
+    def get_landmarks(self, distance, stop_at_junction=False):
+        return []
+
+    def next(self, distance: float):
+        return [Waypoint(self._map, lane, s) for lane, s in _advance(self._lane, self.s + distance)]
+
+    def previous(self, distance: float):
+        return [Waypoint(self._map, lane, s) for lane, s in _retreat(self._lane, self.s - distance)]
+
+    def next_until_lane_end(self, distance: float):
+        result = []
+        s = self.s + distance
+        while s < self._lane.length:
+            result.append(Waypoint(self._map, self._lane, s))
+            s += distance
+        result.append(Waypoint(self._map, self._lane, self._lane.length))
+        return result
+
+    def previous_until_lane_start(self, distance: float):
+        result = []
+        s = self.s - distance
+        while s > 0:
+            result.append(Waypoint(self._map, self._lane, s))
+            s -= distance
+        result.append(Waypoint(self._map, self._lane, 0.0))
+        return result
+
+    def _neighbor(self, lane_id: int):
+        road = self._lane.road
+        if road is None or lane_id == 0:
+            return None
+        lane = road.lane(lane_id)
+        if lane is None:
+            return None
+        same_direction = (lane_id < 0) == (self._lane.lane_id < 0)
+        s = self.s if same_direction else lane.length - self.s
+        return Waypoint(self._map, lane, s)
+
+    def get_left_lane(self):
+        lane_id = self._lane.lane_id
+        if lane_id < 0:
+            return self._neighbor(lane_id + 1 if lane_id < -1 else 1)
+        return self._neighbor(lane_id - 1 if lane_id > 1 else -1)
+
+    def get_right_lane(self):
+        lane_id = self._lane.lane_id
+        return self._neighbor(lane_id - 1 if lane_id < 0 else lane_id + 1)
+
+    def __eq__(self, other):
+        return isinstance(other, Waypoint) and self._lane is other._lane and abs(self.s - other.s) < 1e-6
+
+    def __hash__(self):
+        return self.id
+
+    def __repr__(self):
+        return f"Waypoint(road_id={self.road_id}, lane_id={self.lane_id}, s={self.s:.2f}, {self.transform})"
+
+def _advance(lane: Lane, s: float, depth: int = 0):
+    if s <= lane.length or depth > 32:
+        return [(lane, min(s, lane.length))]
+    if len(lane.successors) == 0:
+        return []
+    result = []
+    for successor in lane.successors:
+        result.extend(_advance(successor, s - lane.length, depth + 1))
+    return result
+
+def _retreat(lane: Lane, s: float, depth: int = 0):
+    if s >= 0 or depth > 32:
+        return [(lane, max(s, 0.0))]
+    if len(lane.predecessors) == 0:
+        return []
+    result = []
+    for predecessor in lane.predecessors:
+        result.extend(_retreat(predecessor, predecessor.length + s, depth + 1))
+    return result
+
+def _bezier(a, control, b, distance: float):
+    length = np.hypot(*(control - a)) + np.hypot(*(b - control))
+    count = max(3, int(math.ceil(length / distance)) + 1)
+    t = np.linspace(0.0, 1.0, count)[:, None]
+    return (1 - t)**2 * a + 2 * (1 - t) * t * control + t**2 * b
+
+def _line_intersection(p, u, q, v):
+    denominator = u[0] * v[1] - u[1] * v[0]
+    if abs(denominator) < 1e-9:
+        return None
+    t = ((q[0] - p[0]) * v[1] - (q[1] - p[1]) * v[0]) / denominator
+    return p + t * u
+
+class Map(object):
+    """
+    Synthetic town: a grid of blocks_x x blocks_y blocks, two-way roads with
+    lanes_per_direction lanes along every block edge and a junction at every crossing.
+    Junctions connect straight ahead on every lane, right turns from the rightmost
+    and left turns from the leftmost lane
+    """
+
+    def __init__(self, blocks_x: int = 4, blocks_y: int = 4, block_size: float = 100.0, lanes_per_direction: int = 2,
+                 lane_width: float = 3.5, speed_limit: float = 50.0):
+        self.name = "Carla/Maps/FakeGrid"
+        self.blocks_x = blocks_x
+        self.blocks_y = blocks_y
+        self.block_size = block_size
+        self.lanes_per_direction = lanes_per_direction
+        self.lane_width = lane_width
+        self.speed_limit = speed_limit
+        self.junction_radius = lanes_per_direction * lane_width + 2.0
+        self.roads = []
+        self.lanes = []
+        self.connectors = []
+        # node -> list of (road, lane ids arriving at the node, lane ids leaving the node)
+        self._node_roads = {}
+        self._build()
+        self._build_index()
+
+    def _node_position(self, node):
+        return np.array([node[0] * self.block_size, node[1] * self.block_size], dtype=np.float64)
+
+    def _build(self):
+        r = self.junction_radius
+        L = self.lanes_per_direction
+        edges = []
+        for j in range(self.blocks_y + 1):
+            for i in range(self.blocks_x):
+                edges.append(((i, j), (i + 1, j)))
+        for i in range(self.blocks_x + 1):
+            for j in range(self.blocks_y):
+                edges.append(((i, j), (i, j + 1)))
+
+        for a, b in edges:
+            pa, pb = self._node_position(a), self._node_position(b)
+            direction = (pb - pa) / np.hypot(*(pb - pa))
+            road = Road(len(self.roads), pa + r * direction, pb - r * direction, L, self.lane_width)
+            for k in range(1, L + 1):
+                for lane_id in (-k, k):
+                    lane = Lane(len(self.lanes), road.road_id, lane_id, road.lane_points(lane_id))
+                    lane.road = road
+                    lane.lane_width = self.lane_width
+                    lane.left_marking = CENTER if k == 1 else BROKEN
+                    lane.right_marking = SOLID if k == L else BROKEN
+                    road.lanes[lane_id] = lane
+                    self.lanes.append(lane)
+            self.roads.append(road)
+            # lanes with negative ids drive from a to b
+            self._node_roads.setdefault(b, []).append((road, [-k for k in range(1, L + 1)], [k for k in range(1, L + 1)]))
+            self._node_roads.setdefault(a, []).append((road, [k for k in range(1, L + 1)], [-k for k in range(1, L + 1)]))
+
+        junction_id = 0
+        next_road_id = len(self.roads)
+        for node, roads in sorted(self._node_roads.items()):
+            for in_road, in_lanes, _ in roads:
+                for in_lane_id in in_lanes:
+                    in_lane = in_road.lanes[in_lane_id]
+                    k = abs(in_lane_id)
+                    candidates = []
+                    for out_road, _, out_lanes in roads:
+                        if out_road is in_road:
+                            continue
+                        turn = self._turn(in_lane, out_road.lanes[out_lanes[0]])
+                        candidates.append((turn, out_road, out_lanes))
+                    targets = []
+                    for turn, out_road, out_lanes in candidates:
+                        if turn == "straight" or (turn == "right" and k == L) or (turn == "left" and k == 1):
+                            targets.append(out_road.lanes[out_lanes[min(k, L) - 1]])
+                    if len(targets) == 0:
+                        # dead end for this lane (e.g. at the corners of the town), turn from any lane
+                        targets = [out_road.lanes[out_lanes[min(k, L) - 1]] for _, out_road, out_lanes in candidates]
+                    for out_lane in targets:
+                        connector = Lane(len(self.lanes), next_road_id, -1, self._connector_points(in_lane, out_lane), is_junction=True, junction_id=junction_id)
+                        connector.lane_width = self.lane_width
+                        next_road_id += 1
+                        in_lane.successors.append(connector)
+                        connector.predecessors.append(in_lane)
+                        connector.successors.append(out_lane)
+                        out_lane.predecessors.append(connector)
+                        self.lanes.append(connector)
+                        self.connectors.append(connector)
+            junction_id += 1
+
+    @staticmethod
+    def _turn(in_lane: Lane, out_lane: Lane) -> str:
+        a = in_lane.headings[-1]
+        b = out_lane.headings[0]
+        delta = math.degrees(math.atan2(math.sin(b - a), math.cos(b - a)))
+        if abs(delta) < 30:
+            return "straight"
+        # positive yaw turns right in the left-handed coordinate system
+        return "right" if delta > 0 else "left"
+
+    @staticmethod
+    def _connector_points(in_lane: Lane, out_lane: Lane):
+        a = in_lane.points[-1]
+        b = out_lane.points[0]
+        u = np.array([math.cos(in_lane.headings[-1]), math.sin(in_lane.headings[-1])])
+        v = np.array([math.cos(out_lane.headings[0]), math.sin(out_lane.headings[0])])
+        control = _line_intersection(a, u, b, v)
+        if control is None:
+            return [a, b]
+        return _bezier(a, control, b, SAMPLE_DISTANCE)
+
+    def _build_index(self):
+        points = []
+        owners = []
+        s_values = []
+        # regular lanes first, they win over junction connectors starting at the same location
+        for lane in sorted(self.lanes, key=lambda l: l.is_junction):
+            p, s = lane.sample(SAMPLE_DISTANCE)
+            points.append(p)
+            s_values.append(s)
+            owners.append(np.full(len(s), lane.uid))
+        self._index_points = np.concatenate(points)
+        self._index_s = np.concatenate(s_values)
+        self._index_lanes = np.concatenate(owners)
+
+    def get_waypoint(self, location, project_to_road=True, lane_type=LaneType.Driving):
+        if not (LaneType(lane_type) & LaneType.Driving):
+            return None
+        d = (self._index_points[:, 0] - location.x)**2 + (self._index_points[:, 1] - location.y)**2
+        i = int(np.argmin(d))
+        lane = self.lanes[int(self._index_lanes[i])]
+        s = float(self._index_s[i])
+        # refine the sampled position along the lane
+        x, y, heading = lane.position(s)
+        s += (location.x - x) * math.cos(heading) + (location.y - y) * math.sin(heading)
+        waypoint = Waypoint(self, lane, s)
+        if not project_to_road and waypoint.transform.location.distance_2d(location) > 0.5 * lane.lane_width:
+            return None
+        return waypoint
+
+    def get_waypoint_xodr(self, road_id, lane_id, s):
+        for lane in self.lanes:
+            if lane.road_id == road_id and lane.lane_id == lane_id:
+                return Waypoint(self, lane, s)
+        return None
+
+    def get_topology(self):
+        return [(Waypoint(self, lane, 0.0), Waypoint(self, lane, lane.length)) for lane in self.lanes]
+
+    def generate_waypoints(self, distance: float):
+        result = []
+        for lane in self.lanes:
+            s = 0.0
+            while s < lane.length:
+                result.append(Waypoint(self, lane, s))
+                s += distance
+        return result
+
+    def get_spawn_points(self):
+        spawn_points = []
+        for road in self.roads:
+            for lane_id in sorted(road.lanes.keys()):
+                lane = road.lanes[lane_id]
+                for fraction in (0.25, 0.6):
+                    x, y, heading = lane.position(fraction * lane.length)
+                    spawn_points.append(Transform(Location(x, y, 0.5), Rotation(yaw=math.degrees(heading))))
+        return spawn_points
+
+    def transform_to_geolocation(self, location):
+        latitude = math.degrees(-location.y / EARTH_RADIUS)
+        longitude = math.degrees(location.x / EARTH_RADIUS)
+        return GeoLocation(latitude, longitude, location.z)
+
+    def get_crosswalks(self):
+        return []
+
+    def get_all_landmarks(self):
+        return []
+
+    def get_all_landmarks_of_type(self, landmark_type):
+        return []
+
+    def to_opendrive(self):
+        return ""
+
+    def traffic_light_approaches(self):
+        """
+        Yields (node, road, arriving lane ids) for every approach of a junction with more than two roads
+        """
+        for node, roads in sorted(self._node_roads.items()):
+            if len(roads) < 3:
+                continue
+            for road, in_lanes, _ in roads:
+                yield node, road, in_lanes
+
+    def __repr__(self):
+        return f"Map(name={self.name})"
@@ -0,0 +1,542 @@
+import math
+import numpy as np
+from carla.geometry import Vector3D, Location, Transform
+from carla.enums import ColorConverter
+
+SKY_DEPTH = 1000.0
+# CityScapes tags
+TAG_ROAD = 1
+TAG_VEHICLE = 14
+TAG_PEDESTRIAN = 12
+TAG_SKY = 11
+CITYSCAPES_PALETTE = np.zeros((256, 3), dtype=np.uint8)
+CITYSCAPES_PALETTE[TAG_ROAD] = (128, 64, 128)
+CITYSCAPES_PALETTE[TAG_SKY] = (70, 130, 180)
+CITYSCAPES_PALETTE[TAG_PEDESTRIAN] = (220, 20, 60)
+CITYSCAPES_PALETTE[TAG_VEHICLE] = (0, 0, 142)
+
+class Scene(object):
+    """
+    Boxes of all vehicles and walkers of one tick as arrays, shared by all sensors
+    """
+
+    def __init__(self, actors):
+        actors = list(actors)
+        self.actors = actors
+        self.ids = np.array([a.id for a in actors], dtype=np.int64)
+        self.tags = np.array([TAG_PEDESTRIAN if a.type_id.startswith("walker.") else TAG_VEHICLE for a in actors], dtype=np.uint8)
+        centers = []
+        for a in actors:
+            t = a._transform
+            centers.append((t.location.x, t.location.y, t.location.z + a.bounding_box.location.z))
+        self.centers = np.array(centers, dtype=np.float64).reshape(-1, 3)
+        self.yaws = np.radians(np.array([a._transform.rotation.yaw for a in actors], dtype=np.float64))
+        self.extents = np.array([(a.bounding_box.extent.x, a.bounding_box.extent.y, a.bounding_box.extent.z) for a in actors], dtype=np.float64).reshape(-1, 3)
+        self.velocities = np.array([(a._velocity.x, a._velocity.y, a._velocity.z) for a in actors], dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.actors)
+
+    def raycast(self, origins, directions, max_distance: float, ignore_id: int = -1):
+        """
+        Distance to the first box or the ground hit by each ray (inf for no hit) and the index of the hit box (-1 for ground or no hit)
+        """
+        count = len(directions)
+        distance = np.full(count, np.inf)
+        hit = np.full(count, -1, dtype=np.int64)
+        # ground plane at z = 0
+        down = directions[:, 2] < -1e-6
+        ground = np.where(down, -origins[:, 2] / np.where(down, directions[:, 2], -1.0), np.inf)
+        ground[ground < 0] = np.inf
+        distance = np.minimum(distance, ground)
+        for i in range(len(self.actors)):
+            if self.ids[i] == ignore_id:
+                continue
+            c, s = math.cos(self.yaws[i]), math.sin(self.yaws[i])
+            # into the box frame
+            o = origins - self.centers[i]
+            ox = c * o[:, 0] + s * o[:, 1]
+            oy = -s * o[:, 0] + c * o[:, 1]
+            oz = o[:, 2]
+            dx = c * directions[:, 0] + s * directions[:, 1]
+            dy = -s * directions[:, 0] + c * directions[:, 1]
+            dz = directions[:, 2]
+            t_near = np.full(count, -np.inf)
+            t_far = np.full(count, np.inf)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for origin, direction, extent in ((ox, dx, self.extents[i, 0]), (oy, dy, self.extents[i, 1]), (oz, dz, self.extents[i, 2])):
+                    t1 = (-extent - origin) / direction
+                    t2 = (extent - origin) / direction
+                    parallel = np.abs(direction) < 1e-12
+                    inside = np.abs(origin) <= extent
+                    t1 = np.where(parallel, np.where(inside, -np.inf, np.inf), t1)
+                    t2 = np.where(parallel, np.where(inside, np.inf, -np.inf), t2)
+                    t_near = np.maximum(t_near, np.minimum(t1, t2))
+                    t_far = np.minimum(t_far, np.maximum(t1, t2))
+            box = (t_near <= t_far) & (t_near > 0) & (t_near < distance)
+            distance[box] = t_near[box]
+            hit[box] = i
+        distance[distance > max_distance] = np.inf
+        hit[np.isinf(distance)] = -1
+        return distance, hit
+
+def _sensor_rotation(transform):
+    return np.array(transform.rotation.matrix(), dtype=np.float64)
+
+class SensorData(object):
+
+    def __init__(self, frame: int, timestamp: float, transform):
+        self.frame = frame
+        self.timestamp = timestamp
+        self.transform = transform
+
+class Image(SensorData):
+
+    def __init__(self, frame, timestamp, transform, width: int, height: int, fov: float, pixels, depth=None, tags=None):
+        super().__init__(frame, timestamp, transform)
+        self.width = width
+        self.height = height
+        self.fov = fov
+        self._pixels = pixels
+        self._depth = depth
+        self._tags = tags
+
+    @property
+    def raw_data(self):
+        return memoryview(self._pixels).cast("B")
+
+    def convert(self, color_converter):
+        color_converter = ColorConverter(int(color_converter))
+        if color_converter == ColorConverter.Raw:
+            return
+        if color_converter == ColorConverter.CityScapesPalette:
+            colors = CITYSCAPES_PALETTE[self._pixels[:, :, 2]]
+            self._pixels[:, :, :3] = colors[:, :, ::-1]
+            return
+        if self._depth is None:
+            return
+        normalized = np.clip(self._depth / SKY_DEPTH, 0.0, 1.0)
+        if color_converter == ColorConverter.LogarithmicDepth:
+            normalized = np.clip(1.0 + np.log(np.maximum(normalized, 1e-6)) / 5.70378, 0.0, 1.0)
+        gray = (normalized * 255).astype(np.uint8)
+        self._pixels[:, :, 0] = gray
+        self._pixels[:, :, 1] = gray
+        self._pixels[:, :, 2] = gray
+
+    def save_to_disk(self, path: str, color_converter=ColorConverter.Raw):
+        from PIL import Image as PILImage
+        self.convert(color_converter)
+        if not path.lower().endswith((".png", ".jpg", ".jpeg", ".bmp")):
+            path += ".png"
+        PILImage.fromarray(self._pixels[:, :, 2::-1].copy()).save(path)
+
+    def __len__(self):
+        return self.width * self.height
+
+class DVSEvent(object):
+
+    def __init__(self, x, y, t, pol):
+        self.x = int(x)
+        self.y = int(y)
+        self.t = int(t)
+        self.pol = bool(pol)
+
+class DVSEventArray(SensorData):
+
+    dtype = np.dtype([("x", np.uint16), ("y", np.uint16), ("t", np.int64), ("pol", np.bool_)])
+
+    def __init__(self, frame, timestamp, transform, width: int, height: int, fov: float, events):
+        super().__init__(frame, timestamp, transform)
+        self.width = width
+        self.height = height
+        self.fov = fov
+        self._events = events
+
+    @property
+    def raw_data(self):
+        return memoryview(self._events.tobytes())
+
+    def to_array(self):
+        return np.stack([self._events["x"], self._events["y"], self._events["t"], self._events["pol"]], axis=1).astype(np.int64)
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        return (DVSEvent(*e) for e in self._events)
+
+class LidarDetection(object):
+
+    def __init__(self, x, y, z, intensity):
+        self.point = Location(x, y, z)
+        self.intensity = float(intensity)
+
+class LidarMeasurement(SensorData):
+
+    def __init__(self, frame, timestamp, transform, channels: int, horizontal_angle: float, points, channel_counts):
+        super().__init__(frame, timestamp, transform)
+        self.channels = channels
+        self.horizontal_angle = horizontal_angle
+        self._points = points
+        self._channel_counts = channel_counts
+
+    @property
+    def raw_data(self):
+        return memoryview(self._points).cast("B")
+
+    def get_point_count(self, channel: int) -> int:
+        return int(self._channel_counts[channel])
+
+    def __len__(self):
+        return len(self._points)
+
+    def __iter__(self):
+        return (LidarDetection(*p) for p in self._points)
+
+class RadarDetection(object):
+
+    def __init__(self, velocity, azimuth, altitude, depth):
+        self.velocity = float(velocity)
+        self.azimuth = float(azimuth)
+        self.altitude = float(altitude)
+        self.depth = float(depth)
+
+class RadarMeasurement(SensorData):
+
+    def __init__(self, frame, timestamp, transform, detections):
+        super().__init__(frame, timestamp, transform)
+        # velocity, azimuth, altitude, depth
+        self._detections = detections
+
+    @property
+    def raw_data(self):
+        return memoryview(self._detections).cast("B")
+
+    def get_detection_count(self) -> int:
+        return len(self._detections)
+
+    def __len__(self):
+        return len(self._detections)
+
+    def __iter__(self):
+        return (RadarDetection(*d) for d in self._detections)
+
+class IMUMeasurement(SensorData):
+
+    def __init__(self, frame, timestamp, transform, accelerometer, gyroscope, compass):
+        super().__init__(frame, timestamp, transform)
+        self.accelerometer = accelerometer
+        self.gyroscope = gyroscope
+        self.compass = compass
+
+class GnssMeasurement(SensorData):
+
+    def __init__(self, frame, timestamp, transform, latitude, longitude, altitude):
+        super().__init__(frame, timestamp, transform)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = altitude
+
+class CollisionEvent(SensorData):
+
+    def __init__(self, frame, timestamp, transform, actor, other_actor, normal_impulse):
+        super().__init__(frame, timestamp, transform)
+        self.actor = actor
+        self.other_actor = other_actor
+        self.normal_impulse = normal_impulse
+
+class LaneInvasionEvent(SensorData):
+
+    def __init__(self, frame, timestamp, transform, actor, crossed_lane_markings):
+        super().__init__(frame, timestamp, transform)
+        self.actor = actor
+        self.crossed_lane_markings = crossed_lane_markings
+
+class CameraGenerator(object):
+    """
+    Renders the ground, the sky and every vehicle and walker as a flat shaded box
+    """
+
+    def __init__(self, sensor):
+        self.sensor = sensor
+        self.kind = sensor.type_id.split(".")[-1]
+        self.width = int(float(sensor.attributes.get("image_size_x", "800")))
+        self.height = int(float(sensor.attributes.get("image_size_y", "600")))
+        self.fov = float(sensor.attributes.get("fov", "90"))
+        self.focal = self.width / (2.0 * math.tan(math.radians(self.fov) / 2.0))
+        self._previous_gray = None
+
+    def _project_boxes(self, transform, scene: Scene):
+        """
+        Yields (depth, u0, v0, u1, v1, index) of the boxes in front of the camera, far ones first
+        """
+        if len(scene) == 0:
+            return []
+        rotation = _sensor_rotation(transform)
+        origin = np.array([transform.location.x, transform.location.y, transform.location.z])
+        corners = np.array([(sx, sy, sz) for sx in (-1, 1) for sy in (-1, 1) for sz in (-1, 1)], dtype=np.float64)
+        result = []
+        for i in range(len(scene)):
+            if scene.ids[i] == self.sensor.parent_id:
+                continue
+            c, s = math.cos(scene.yaws[i]), math.sin(scene.yaws[i])
+            local = corners * scene.extents[i]
+            world = np.stack([c * local[:, 0] - s * local[:, 1], s * local[:, 0] + c * local[:, 1], local[:, 2]], axis=1) + scene.centers[i]
+            camera = (world - origin) @ rotation
+            if np.any(camera[:, 0] < 0.1):
+                continue
+            u = self.width / 2.0 + self.focal * camera[:, 1] / camera[:, 0]
+            v = self.height / 2.0 - self.focal * camera[:, 2] / camera[:, 0]
+            u0, u1 = int(max(0, np.floor(u.min()))), int(min(self.width, np.ceil(u.max())))
+            v0, v1 = int(max(0, np.floor(v.min()))), int(min(self.height, np.ceil(v.max())))
+            if u0 >= u1 or v0 >= v1:
+                continue
+            result.append((float(camera[:, 0].min()), u0, v0, u1, v1, i))
+        result.sort(reverse=True)
+        return result
+
+    def _background(self, transform):
+        # depth and tag of each row for a level camera pitched by the sensor pitch
+        rows = np.arange(self.height, dtype=np.float64) + 0.5
+        angle = np.arctan((self.height / 2.0 - rows) / self.focal) + math.radians(transform.rotation.pitch)
+        height = max(transform.location.z, 0.05)
+        below = angle < -1e-3
+        distance = np.where(below, height / np.sin(np.where(below, -angle, 1.0)), SKY_DEPTH)
+        depth = np.minimum(distance * np.cos(angle - math.radians(transform.rotation.pitch)), SKY_DEPTH)
+        return depth, below
+
+    def capture(self, frame, timestamp, transform, scene, dt):
+        row_depth, ground = self._background(transform)
+        depth = np.repeat(row_depth[:, None], self.width, axis=1)
+        tags = np.repeat(np.where(ground, TAG_ROAD, TAG_SKY).astype(np.uint8)[:, None], self.width, axis=1)
+        pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        pixels[:, :, 3] = 255
+        shade = np.clip(255.0 * (1.0 - row_depth / 120.0), 40, 255)[:, None]
+        # BGRA
+        pixels[:, :, 0] = np.where(ground[:, None], 0.45 * shade, 230)
+        pixels[:, :, 1] = np.where(ground[:, None], 0.45 * shade, 180)
+        pixels[:, :, 2] = np.where(ground[:, None], 0.45 * shade, 120)
+        ids = np.zeros((self.height, self.width), dtype=np.int64)
+        for box_depth, u0, v0, u1, v1, i in self._project_boxes(transform, scene):
+            actor_id = int(scene.ids[i])
+            region = depth[v0:v1, u0:u1] > box_depth
+            depth[v0:v1, u0:u1][region] = box_depth
+            tags[v0:v1, u0:u1][region] = scene.tags[i]
+            ids[v0:v1, u0:u1][region] = actor_id
+            color = ((actor_id * 67) % 200 + 40, (actor_id * 131) % 200 + 40, (actor_id * 29) % 200 + 40)
+            for channel in range(3):
+                pixels[v0:v1, u0:u1, channel][region] = color[channel]
+
+        if self.kind == "depth":
+            # depth in meters encoded in R, G and B
+            encoded = np.round(np.clip(depth / SKY_DEPTH, 0.0, 1.0) * (256**3 - 1)).astype(np.uint32)
+            pixels[:, :, 2] = encoded & 0xFF
+            pixels[:, :, 1] = (encoded >> 8) & 0xFF
+            pixels[:, :, 0] = (encoded >> 16) & 0xFF
+        elif self.kind in ("semantic_segmentation", "instance_segmentation"):
+            pixels[:, :, 2] = tags
+            pixels[:, :, 1] = 0
+            pixels[:, :, 0] = 0
+            if self.kind == "instance_segmentation":
+                pixels[:, :, 1] = ids & 0xFF
+                pixels[:, :, 0] = (ids >> 8) & 0xFF
+        elif self.kind == "dvs":
+            gray = pixels[:, :, :3].mean(axis=2)
+            previous = self._previous_gray if self._previous_gray is not None else gray
+            self._previous_gray = gray
+            difference = gray - previous
+            y, x = np.nonzero(np.abs(difference) > 15)
+            events = np.empty(len(x), dtype=DVSEventArray.dtype)
+            events["x"] = x
+            events["y"] = y
+            events["t"] = int(timestamp * 1e9)
+            events["pol"] = difference[y, x] > 0
+            return DVSEventArray(frame, timestamp, transform, self.width, self.height, self.fov, events)
+        return Image(frame, timestamp, transform, self.width, self.height, self.fov, pixels, depth, tags)
+
+class LidarGenerator(object):
+
+    def __init__(self, sensor, rng):
+        attributes = sensor.attributes
+        self.sensor = sensor
+        self.rng = rng
+        self.channels = int(float(attributes["channels"]))
+        self.range = float(attributes["range"])
+        self.points_per_second = int(float(attributes["points_per_second"]))
+        self.rotation_frequency = float(attributes["rotation_frequency"])
+        self.upper_fov = float(attributes["upper_fov"])
+        self.lower_fov = float(attributes["lower_fov"])
+        self.horizontal_fov = float(attributes["horizontal_fov"])
+        self.attenuation = float(attributes["atmosphere_attenuation_rate"])
+        self.dropoff_rate = float(attributes["dropoff_general_rate"])
+        self.noise_stddev = float(attributes["noise_stddev"])
+        self.elevations = np.radians(np.linspace(self.upper_fov, self.lower_fov, self.channels))
+        self.angle = 0.0
+
+    def capture(self, frame, timestamp, transform, scene, dt):
+        # the lidar turns by rotation_frequency * dt per tick, points are spread evenly over the swept angle
+        sweep = min(self.horizontal_fov, 360.0 * self.rotation_frequency * dt)
+        per_channel = max(1, int(self.points_per_second * dt / self.channels))
+        azimuths = np.radians(self.angle + np.linspace(0.0, sweep, per_channel, endpoint=False))
+        self.angle = (self.angle + sweep) % 360.0
+
+        elevation, azimuth = np.meshgrid(self.elevations, azimuths, indexing="ij")
+        local = np.stack([
+            np.cos(elevation) * np.cos(azimuth),
+            np.cos(elevation) * np.sin(azimuth),
+            np.sin(elevation)], axis=-1).reshape(-1, 3)
+        rotation = _sensor_rotation(transform)
+        directions = local @ rotation.T
+        origin = np.array([transform.location.x, transform.location.y, transform.location.z])
+        origins = np.broadcast_to(origin, directions.shape)
+        distance, _ = scene.raycast(origins, directions, self.range, self.sensor.parent_id)
+
+        keep = np.isfinite(distance)
+        if self.dropoff_rate > 0:
+            keep &= self.rng.random(len(keep)) >= self.dropoff_rate
+        if self.noise_stddev > 0:
+            distance = distance + self.rng.normal(0.0, self.noise_stddev, len(distance))
+        points = local[keep] * distance[keep, None]
+        intensity = np.exp(-self.attenuation * distance[keep])
+        data = np.empty((len(points), 4), dtype=np.float32)
+        data[:, :3] = points
+        data[:, 3] = intensity
+        channel_counts = keep.reshape(self.channels, -1).sum(axis=1)
+        return LidarMeasurement(frame, timestamp, transform, self.channels, math.radians(self.angle), data, channel_counts)
+
+class RadarGenerator(object):
+
+    def __init__(self, sensor, rng):
+        attributes = sensor.attributes
+        self.sensor = sensor
+        self.rng = rng
+        self.horizontal_fov = math.radians(float(attributes["horizontal_fov"]))
+        self.vertical_fov = math.radians(float(attributes["vertical_fov"]))
+        self.range = float(attributes["range"])
+        self.points_per_second = int(float(attributes["points_per_second"]))
+
+    def capture(self, frame, timestamp, transform, scene, dt):
+        count = max(1, int(self.points_per_second * dt))
+        azimuth = self.rng.uniform(-0.5, 0.5, count) * self.horizontal_fov
+        altitude = self.rng.uniform(-0.5, 0.5, count) * self.vertical_fov
+        local = np.stack([np.cos(altitude) * np.cos(azimuth), np.cos(altitude) * np.sin(azimuth), np.sin(altitude)], axis=1)
+        rotation = _sensor_rotation(transform)
+        directions = local @ rotation.T
+        origin = np.array([transform.location.x, transform.location.y, transform.location.z])
+        distance, hit = scene.raycast(np.broadcast_to(origin, directions.shape), directions, self.range, self.sensor.parent_id)
+        keep = hit >= 0
+        own = self.sensor.get_velocity()
+        relative = scene.velocities[hit[keep]] - np.array([own.x, own.y, own.z])
+        # negative velocity: the target approaches
+        velocity = np.sum(relative * directions[keep], axis=1)
+        detections = np.empty((int(keep.sum()), 4), dtype=np.float32)
+        detections[:, 0] = velocity
+        detections[:, 1] = azimuth[keep]
+        detections[:, 2] = altitude[keep]
+        detections[:, 3] = distance[keep]
+        return RadarMeasurement(frame, timestamp, transform, detections)
+
+class IMUGenerator(object):
+
+    def __init__(self, sensor):
+        self.sensor = sensor
+
+    def capture(self, frame, timestamp, transform, scene, dt):
+        acceleration = self.sensor.get_acceleration()
+        acceleration.z += 9.81
+        accelerometer = transform.inverse_transform(Location(acceleration) + transform.location)
+        angular = self.sensor.get_angular_velocity()
+        gyroscope = Vector3D(math.radians(angular.x), math.radians(angular.y), math.radians(angular.z))
+        compass = math.radians((transform.rotation.yaw + 90.0) % 360.0)
+        return IMUMeasurement(frame, timestamp, transform, Vector3D(accelerometer), gyroscope, compass)
+
+class GnssGenerator(object):
+
+    def __init__(self, sensor, carla_map):
+        self.sensor = sensor
+        self.map = carla_map
+
+    def capture(self, frame, timestamp, transform, scene, dt):
+        geo = self.map.transform_to_geolocation(transform.location)
+        return GnssMeasurement(frame, timestamp, transform, geo.latitude, geo.longitude, geo.altitude)
+
+class CollisionGenerator(object):
+    """
+    Reports overlaps of the parent's box with other boxes (2D, oriented)
+    """
+
+    def __init__(self, sensor, world):
+        self.sensor = sensor
+        self.world = world
+
+    def capture(self, frame, timestamp, transform, scene, dt):
+        parent = self.sensor.parent
+        if parent is None:
+            return None
+        index = np.nonzero(scene.ids == parent.id)[0]
+        if len(index) == 0:
+            return None
+        i = int(index[0])
+        events = []
+        for j in range(len(scene)):
+            if j != i and _boxes_overlap(scene, i, j):
+                relative = scene.velocities[i] - scene.velocities[j]
+                impulse = Vector3D(*(relative * 1500.0))
+                events.append(CollisionEvent(frame, timestamp, transform, parent, scene.actors[j], impulse))
+        return events
+
+class LaneInvasionGenerator(object):
+
+    def __init__(self, sensor, carla_map):
+        self.sensor = sensor
+        self.map = carla_map
+        self._waypoint = None
+
+    def capture(self, frame, timestamp, transform, scene, dt):
+        waypoint = self.map.get_waypoint(transform.location)
+        previous = self._waypoint
+        self._waypoint = waypoint
+        if previous is None or waypoint is None or previous.road_id != waypoint.road_id or previous.lane_id == waypoint.lane_id:
+            return None
+        right = previous.get_right_lane()
+        crossed = previous.right_lane_marking if right is not None and right.lane_id == waypoint.lane_id else previous.left_lane_marking
+        return LaneInvasionEvent(frame, timestamp, transform, self.sensor.parent, [crossed])
+
+def _boxes_overlap(scene: Scene, i: int, j: int) -> bool:
+    axes = []
+    corners = []
+    for k in (i, j):
+        c, s = math.cos(scene.yaws[k]), math.sin(scene.yaws[k])
+        forward, right = np.array([c, s]), np.array([-s, c])
+        ex, ey = scene.extents[k, 0], scene.extents[k, 1]
+        center = scene.centers[k, :2]
+        corners.append(np.array([center + sx * ex * forward + sy * ey * right for sx in (-1, 1) for sy in (-1, 1)]))
+        axes.extend([forward, right])
+    if abs(scene.centers[i, 2] - scene.centers[j, 2]) > scene.extents[i, 2] + scene.extents[j, 2]:
+        return False
+    for axis in axes:
+        a, b = corners[0] @ axis, corners[1] @ axis
+        if a.max() < b.min() or b.max() < a.min():
+            return False
+    return True
+
+def create_generator(sensor, world, rng):
+    """
+    None for sensors without synthetic data
+    """
+    type_id = sensor.type_id
+    if type_id.startswith("sensor.camera."):
+        return CameraGenerator(sensor)
+    if type_id == "sensor.lidar.ray_cast":
+        return LidarGenerator(sensor, rng)
+    if type_id == "sensor.other.radar":
+        return RadarGenerator(sensor, rng)
+    if type_id == "sensor.other.imu":
+        return IMUGenerator(sensor)
+    if type_id == "sensor.other.gnss":
+        return GnssGenerator(sensor, world.get_map())
+    if type_id == "sensor.other.collision":
+        return CollisionGenerator(sensor, world)
+    if type_id == "sensor.other.lane_invasion":
+        return LaneInvasionGenerator(sensor, world.get_map())
+    return None
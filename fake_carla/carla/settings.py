@@ -0,0 +1,25 @@
+import os
+
+class FakeSettings(object):
+    """
+    Parameters of the synthetic town, can be overridden with environment variables:
+        FAKE_CARLA_BLOCKS       blocks of the grid town, e.g. 4x4
+        FAKE_CARLA_BLOCK_SIZE   distance between two junctions in meters
+        FAKE_CARLA_LANES        lanes per driving direction
+        FAKE_CARLA_SEED         seed of the sensor noise
+        FAKE_CARLA_LIGHT_CYCLE  duration of a full traffic light cycle in seconds
+    """
+
+    def __init__(self):
+        blocks = os.environ.get("FAKE_CARLA_BLOCKS", "4x4").lower().split("x")
+        self.blocks_x = int(blocks[0])
+        self.blocks_y = int(blocks[-1])
+        self.block_size = float(os.environ.get("FAKE_CARLA_BLOCK_SIZE", "100"))
+        self.lanes_per_direction = int(os.environ.get("FAKE_CARLA_LANES", "2"))
+        self.seed = int(os.environ.get("FAKE_CARLA_SEED", "0"))
+        self.light_cycle = float(os.environ.get("FAKE_CARLA_LIGHT_CYCLE", "24"))
+        self.lane_width = 3.5
+        self.speed_limit = 50.0
+        self.server_version = "0.9.15-fake"
+
+fake_settings = FakeSettings()
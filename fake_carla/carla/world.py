@@ -0,0 +1,365 @@
+import itertools
+import math
+import threading
+import time
+import numpy as np
+from carla.geometry import Vector3D, Location, Rotation, Transform
+from carla.controls import WeatherParameters, WorldSettings
+from carla.enums import AttachmentType
+from carla.actors import Actor, Vehicle, Walker, TrafficLight, Sensor, ActorList
+from carla.blueprints import ActorBlueprint, create_blueprint_library
+from carla.road import Map
+from carla.sensors import Scene, create_generator
+from carla.settings import fake_settings
+
+ASYNC_DELTA_SECONDS = 0.02
+SPAWN_CLEARANCE = 0.2
+
+def _box_corners(location, yaw, extent_x, extent_y):
+    c, s = math.cos(math.radians(yaw)), math.sin(math.radians(yaw))
+    forward, right = np.array([c, s]), np.array([-s, c])
+    center = np.array([location.x, location.y])
+    return np.array([center + sx * extent_x * forward + sy * extent_y * right for sx in (-1, 1) for sy in (-1, 1)])
+
+def _corners_overlap(a, b) -> bool:
+    """
+    Separating axis test of two rectangles given by their corners
+    """
+    for corners in (a, b):
+        for axis in (corners[2] - corners[0], corners[1] - corners[0]):
+            pa, pb = a @ axis, b @ axis
+            if pa.max() < pb.min() or pb.max() < pa.min():
+                return False
+    return True
+
+class Timestamp(object):
+
+    def __init__(self, frame=0, elapsed_seconds=0.0, delta_seconds=0.0, platform_timestamp=0.0):
+        self.frame = frame
+        self.frame_count = frame
+        self.elapsed_seconds = elapsed_seconds
+        self.delta_seconds = delta_seconds
+        self.platform_timestamp = platform_timestamp
+
+    def __repr__(self):
+        return f"Timestamp(frame={self.frame}, elapsed_seconds={self.elapsed_seconds:.6f}, delta_seconds={self.delta_seconds:.6f})"
+
+class ActorSnapshot(object):
+
+    __slots__ = ("id", "_transform", "_velocity", "_angular_velocity", "_acceleration")
+
+    def __init__(self, actor_id, transform, velocity, angular_velocity, acceleration):
+        self.id = actor_id
+        self._transform = transform
+        self._velocity = velocity
+        self._angular_velocity = angular_velocity
+        self._acceleration = acceleration
+
+    def get_transform(self):
+        return Transform(self._transform.location, self._transform.rotation)
+
+    def get_velocity(self):
+        return Vector3D(self._velocity)
+
+    def get_angular_velocity(self):
+        return Vector3D(self._angular_velocity)
+
+    def get_acceleration(self):
+        return Vector3D(self._acceleration)
+
+class WorldSnapshot(object):
+
+    def __init__(self, world_id, timestamp, actor_snapshots):
+        self.id = world_id
+        self.timestamp = timestamp
+        self._actors = actor_snapshots
+
+    @property
+    def frame(self):
+        return self.timestamp.frame
+
+    @property
+    def elapsed_seconds(self):
+        return self.timestamp.elapsed_seconds
+
+    @property
+    def delta_seconds(self):
+        return self.timestamp.delta_seconds
+
+    def find(self, actor_id):
+        return self._actors.get(actor_id)
+
+    def has_actor(self, actor_id):
+        return actor_id in self._actors
+
+    def __iter__(self):
+        return iter(self._actors.values())
+
+    def __len__(self):
+        return len(self._actors)
+
+class DebugHelper(object):
+    """
+    Nothing is drawn without a renderer
+    """
+
+    def draw_point(self, location, size=0.1, color=None, life_time=-1.0, persistent_lines=True):
+        pass
+
+    def draw_line(self, begin, end, thickness=0.1, color=None, life_time=-1.0, persistent_lines=True):
+        pass
+
+    def draw_arrow(self, begin, end, thickness=0.1, arrow_size=0.1, color=None, life_time=-1.0, persistent_lines=True):
+        pass
+
+    def draw_box(self, box, rotation, thickness=0.1, color=None, life_time=-1.0, persistent_lines=True):
+        pass
+
+    def draw_string(self, location, text, draw_shadow=False, color=None, life_time=-1.0, persistent_lines=True):
+        pass
+
+class World(object):
+    """
+    Simulates the synthetic town in process. In synchronous mode tick() advances the
+    simulation, otherwise a background thread does at ASYNC_DELTA_SECONDS (or the fixed
+    delta) intervals. Sensor and on_tick callbacks are called on the thread that
+    advanced the simulation, after the world lock has been released.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, map_name: str = "FakeGrid"):
+        self.id = next(World._ids)
+        self._lock = threading.RLock()
+        self._tick_condition = threading.Condition(self._lock)
+        self._map = Map(fake_settings.blocks_x, fake_settings.blocks_y, fake_settings.block_size,
+                        fake_settings.lanes_per_direction, fake_settings.lane_width, fake_settings.speed_limit)
+        self._map.name = f"Carla/Maps/{map_name}"
+        self._blueprints = create_blueprint_library()
+        self._settings = WorldSettings()
+        self._weather = WeatherParameters.Default
+        self._rng = np.random.default_rng(fake_settings.seed)
+        self._actor_ids = itertools.count(1)
+        self._actors = {}
+        self._traffic_lights = []
+        self._sensors = []
+        self._on_tick_callbacks = {}
+        self._callback_ids = itertools.count(1)
+        self._timestamp = Timestamp(0, 0.0, 0.0, time.time())
+        self._snapshot = self._make_snapshot()
+        self.debug = DebugHelper()
+        self._spectator = self._add_actor(Actor, ActorBlueprint("spectator"), Transform(Location(0, 0, 50), Rotation(pitch=-90)))
+        self._create_traffic_lights()
+        self._alive = True
+        self._async_thread = threading.Thread(target=self._run_async, name="fake-carla", daemon=True)
+        self._async_thread.start()
+
+    def _create_traffic_lights(self):
+        blueprint = ActorBlueprint("traffic.traffic_light")
+        half_width = 0.5 * self._map.lanes_per_direction * self._map.lane_width
+        for node, road, lane_ids in self._map.traffic_light_approaches():
+            inner = road.lanes[lane_ids[0]]
+            x, y, heading = inner.position(inner.length - 3.0)
+            right = (-math.sin(heading), math.cos(heading))
+            # the trigger volume covers all lanes of the approach
+            offset = half_width - 0.5 * self._map.lane_width
+            transform = Transform(Location(x + right[0] * offset, y + right[1] * offset, 0.0), Rotation(yaw=math.degrees(heading)))
+            group = 0 if abs(math.cos(heading)) > 0.5 else 1
+            junction_id = node[1] * (self._map.blocks_x + 1) + node[0]
+            light = self._add_actor(TrafficLight, blueprint, transform, Vector3D(2.0, half_width, 2.0), junction_id, group, lane_ids, road.road_id)
+            cycle = fake_settings.light_cycle
+            light.green_time = 0.5 * cycle - 2.0
+            light.yellow_time = 2.0
+            light.red_time = 0.5 * cycle
+            light.update(0.0, 0.0)
+            self._traffic_lights.append(light)
+
+    def _add_actor(self, cls, blueprint, transform, *args, **kwargs):
+        actor = cls(self, next(self._actor_ids), blueprint, transform, *args, **kwargs)
+        self._actors[actor.id] = actor
+        return actor
+
+    def get_map(self):
+        return self._map
+
+    def get_blueprint_library(self):
+        return self._blueprints
+
+    def get_settings(self):
+        return self._settings.copy()
+
+    def apply_settings(self, settings):
+        with self._lock:
+            self._settings = settings.copy()
+            self._tick_condition.notify_all()
+            return self._timestamp.frame
+
+    def get_weather(self):
+        return self._weather
+
+    def set_weather(self, weather):
+        self._weather = weather
+
+    def get_spectator(self):
+        return self._spectator
+
+    def load_map_layer(self, map_layers):
+        pass
+
+    def unload_map_layer(self, map_layers):
+        pass
+
+    def get_random_location_from_navigation(self):
+        spawn_points = self._map.get_spawn_points()
+        return spawn_points[int(self._rng.integers(len(spawn_points)))].location
+
+    def _overlaps(self, blueprint, transform) -> bool:
+        extent = blueprint.extent
+        candidate = _box_corners(transform.location, transform.rotation.yaw, extent.x + SPAWN_CLEARANCE, extent.y + SPAWN_CLEARANCE)
+        for actor in self._actors.values():
+            if not isinstance(actor, (Vehicle, Walker)) or actor.parent is not None:
+                continue
+            other = actor.bounding_box.extent
+            if actor._transform.location.distance_2d(transform.location) > math.hypot(extent.x, extent.y) + math.hypot(other.x, other.y) + 2 * SPAWN_CLEARANCE:
+                continue
+            corners = _box_corners(actor._transform.location, actor._transform.rotation.yaw, other.x, other.y)
+            if _corners_overlap(candidate, corners):
+                return True
+        return False
+
+    def spawn_actor(self, blueprint, transform, attach_to=None, attachment_type=AttachmentType.Rigid):
+        with self._lock:
+            if attach_to is not None and not attach_to.is_alive:
+                raise RuntimeError("Spawn failed because the parent actor has been destroyed")
+            tags = blueprint.tags
+            if tags[0] == "vehicle":
+                cls = Vehicle
+            elif tags[0] == "walker":
+                cls = Walker
+            elif tags[0] == "sensor":
+                cls = Sensor
+            else:
+                cls = Actor
+            if cls in (Vehicle, Walker) and attach_to is None and self._overlaps(blueprint, transform):
+                raise RuntimeError("Spawn failed because of collision at spawn position")
+            parent = self._actors.get(attach_to.id) if attach_to is not None else None
+            actor = self._add_actor(cls, blueprint.copy(), transform, parent, attachment_type)
+            if isinstance(actor, Sensor):
+                actor._generator = create_generator(actor, self, self._rng)
+                self._sensors.append(actor)
+            return actor
+
+    def try_spawn_actor(self, blueprint, transform, attach_to=None, attachment_type=AttachmentType.Rigid):
+        try:
+            return self.spawn_actor(blueprint, transform, attach_to, attachment_type)
+        except RuntimeError:
+            return None
+
+    def _destroy_actor(self, actor_id) -> bool:
+        with self._lock:
+            actor = self._actors.pop(actor_id, None)
+            if actor is None or isinstance(actor, TrafficLight) or actor is self._spectator:
+                if actor is not None:
+                    self._actors[actor_id] = actor
+                return False
+            actor.is_alive = False
+            if isinstance(actor, Sensor):
+                actor.stop()
+                self._sensors.remove(actor)
+            # attached actors go with their parent
+            for child in [a for a in self._actors.values() if a.parent is actor]:
+                self._destroy_actor(child.id)
+            return True
+
+    def get_actor(self, actor_id):
+        return self._actors.get(actor_id)
+
+    def get_actors(self, actor_ids=None):
+        with self._lock:
+            if actor_ids is None:
+                return ActorList(self._actors.values())
+            return ActorList(self._actors[i] for i in actor_ids if i in self._actors)
+
+    def get_snapshot(self):
+        return self._snapshot
+
+    def on_tick(self, callback) -> int:
+        callback_id = next(self._callback_ids)
+        self._on_tick_callbacks[callback_id] = callback
+        return callback_id
+
+    def remove_on_tick(self, callback_id):
+        self._on_tick_callbacks.pop(callback_id, None)
+
+    def tick(self, seconds=10.0) -> int:
+        if not self._settings.synchronous_mode:
+            return self.wait_for_tick(seconds).frame
+        return self._step(self._settings.fixed_delta_seconds or ASYNC_DELTA_SECONDS)
+
+    def wait_for_tick(self, seconds=10.0):
+        # in synchronous mode another client (or thread) has to tick
+        with self._tick_condition:
+            frame = self._timestamp.frame
+            if not self._tick_condition.wait_for(lambda: self._timestamp.frame > frame, seconds):
+                raise RuntimeError("time-out of %d ms while waiting for the simulator" % int(seconds * 1000))
+            return self._snapshot.timestamp
+
+    def _make_snapshot(self):
+        actors = {}
+        for actor in self._actors.values():
+            if isinstance(actor, (Vehicle, Walker)) or (actor.parent is None and not isinstance(actor, Sensor)):
+                actors[actor.id] = ActorSnapshot(actor.id, actor.get_transform(), actor.get_velocity(), actor.get_angular_velocity(), actor.get_acceleration())
+            else:
+                actors[actor.id] = ActorSnapshot(actor.id, actor.get_transform(), Vector3D(), Vector3D(), Vector3D())
+        return WorldSnapshot(self.id, self._timestamp, actors)
+
+    def _step(self, dt: float) -> int:
+        with self._lock:
+            for actor in self._actors.values():
+                actor.step(dt)
+            elapsed = self._timestamp.elapsed_seconds + dt
+            for light in self._traffic_lights:
+                light.update(elapsed, dt)
+            self._timestamp = Timestamp(self._timestamp.frame + 1, elapsed, dt, time.time())
+            self._snapshot = self._make_snapshot()
+            snapshot = self._snapshot
+            deliveries = self._capture_sensors(dt)
+            on_tick = list(self._on_tick_callbacks.values())
+            self._tick_condition.notify_all()
+
+        for callback, data in deliveries:
+            callback(data)
+        for callback in on_tick:
+            callback(snapshot)
+        return snapshot.frame
+
+    def _capture_sensors(self, dt: float):
+        listening = [s for s in self._sensors if s.is_listening and s._generator is not None and s.is_due(self._timestamp.elapsed_seconds)]
+        if len(listening) == 0:
+            return []
+        scene = Scene(a for a in self._actors.values() if isinstance(a, (Vehicle, Walker)))
+        deliveries = []
+        for sensor in listening:
+            data = sensor._generator.capture(self._timestamp.frame, self._timestamp.elapsed_seconds, sensor.get_transform(), scene, dt)
+            if data is None:
+                continue
+            for item in (data if isinstance(data, list) else [data]):
+                deliveries.append((sensor._callback, item))
+        return deliveries
+
+    def _run_async(self):
+        while self._alive:
+            with self._tick_condition:
+                if self._settings.synchronous_mode:
+                    self._tick_condition.wait(0.1)
+                    continue
+                dt = self._settings.fixed_delta_seconds or ASYNC_DELTA_SECONDS
+            time.sleep(dt)
+            if not self._settings.synchronous_mode:
+                self._step(dt)
+
+    def shutdown(self):
+        self._alive = False
+
+    def __repr__(self):
+        return f"World(id={self.id})"
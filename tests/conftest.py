@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests import carla_kickstart from the repository root, like the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from carla_kickstart.sensors.bus import BLOCK, DROP_OLDEST, SensorBus
+
+class FakeActor(object):
+
+    def __init__(self, sensor_tick: float):
+        self.attributes = {"sensor_tick": str(sensor_tick)}
+
+class FakeSensor(object):
+
+    def __init__(self, streaming: bool = True, sensor_tick: float = 0.0):
+        self.streaming = streaming
+        self.sensor = FakeActor(sensor_tick)
+        self.bus = None
+        self.bus_name = None
+
+class FakeData(object):
+
+    def __init__(self, frame: int, timestamp: float):
+        self.frame = frame
+        self.timestamp = timestamp
+
+def test_bundle_is_released_once_all_sensors_delivered():
+    bus = SensorBus(timeout=10.0)
+    bus.register("camera", FakeSensor())
+    bus.register("imu", FakeSensor())
+    bundles = bus.subscribe()
+
+    bus.advance(1, 0.05)
+    bus.publish("camera", FakeData(1, 0.05))
+    assert bundles.get_nowait() is None
+    bus.publish("imu", FakeData(1, 0.05))
+
+    bundle = bundles.get_nowait()
+    assert bundle.frame == 1
+    assert bundle.complete
+    assert bundle["camera"].frame == bundle["imu"].frame == 1
+
+def test_drop_oldest_keeps_the_newest_bundles():
+    bus = SensorBus(timeout=0.0)
+    bundles = bus.subscribe(maxsize=2, policy=DROP_OLDEST)
+
+    for frame in range(1, 6):
+        bus.advance(frame, 0.05 * frame)
+
+    assert bundles.dropped == 3
+    assert [bundles.get_nowait().frame for _ in range(2)] == [4, 5]
+
+def test_block_gives_up_after_timeout_without_deadlocking():
+    bus = SensorBus(timeout=0.0)
+    bundles = bus.subscribe(maxsize=1, policy=BLOCK, timeout=0.05)
+
+    # nobody drains the queue, e.g. the consumer runs on the ticking thread
+    start = time.perf_counter()
+    for frame in range(1, 4):
+        bus.advance(frame, 0.05 * frame)
+    assert time.perf_counter() - start < 1.0
+
+    assert bundles.dropped == 2
+    assert bundles.latest().frame == 3
+
+def test_block_waits_for_a_consumer_on_another_thread():
+    bus = SensorBus(timeout=0.0)
+    bundles = bus.subscribe(maxsize=1, policy=BLOCK, timeout=5.0)
+    received = []
+
+    def consume():
+        while len(received) < 5:
+            received.append(bundles.get(timeout=5.0).frame)
+            time.sleep(0.01)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for frame in range(1, 6):
+        bus.advance(frame, 0.05 * frame)
+    consumer.join(10.0)
+
+    assert received == [1, 2, 3, 4, 5]
+    assert bundles.dropped == 0
+
+def test_annotations_are_added_to_later_bundles():
+    bus = SensorBus(timeout=0.0)
+    bundles = bus.subscribe(maxsize=8)
+
+    bus.advance(1, 0.05)
+    bus.annotate("camera.detections", FakeData(1, 0.05))
+    bus.advance(2, 0.10)
+
+    assert "camera.detections" not in bundles.get_nowait()
+    assert bundles.get_nowait()["camera.detections"].frame == 1
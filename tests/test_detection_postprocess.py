@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+
+from carla_kickstart.sensors.object_detection import postprocess_yolo
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# yolo_outputs.npz holds the outputs of two YOLO heads (48 and 192 rows, 85 columns) for
+# two 320x320 frames, in the format of benchmarks/detection_postprocess.py --fixtures.
+# Frame 0: three overlapping car boxes (scores 0.9, 0.8, 0.7) spread over both heads, one
+# person box on its own (0.6), a stop sign on the car box (0.75) and a box below the
+# score threshold (0.45). Frame 1: no class scores above the threshold
+CAR, PERSON, STOP_SIGN = 2, 0, 11
+
+def load_frames():
+    data = np.load(os.path.join(FIXTURES, "yolo_outputs.npz"))
+    return [[data[f"frame{frame}_out{out}"] for out in range(2)] for frame in range(2)]
+
+def detections(outs, allowed_class_ids = None):
+    boxes, scores, class_ids = postprocess_yolo(outs, 320, 320, 0.5, 0.4, allowed_class_ids)
+    return [(tuple(box), round(float(score), 2), int(class_id)) for box, score, class_id in zip(boxes.tolist(), scores, class_ids)]
+
+def test_nms_keeps_the_best_box_per_class_and_single_boxes():
+    frame, _ = load_frames()
+    assert detections(frame) == [
+        ((64, 64, 64, 64), 0.9, CAR),
+        # same box as the car, NMS is per class
+        ((64, 64, 64, 64), 0.75, STOP_SIGN),
+        # a single box is kept (groupRectangles, used before, dropped clusters of one box)
+        ((208, 192, 32, 64), 0.6, PERSON)]
+
+def test_allowed_class_ids_filter_before_nms():
+    frame, _ = load_frames()
+    assert detections(frame, np.array([PERSON])) == [((208, 192, 32, 64), 0.6, PERSON)]
+
+def test_no_detections_below_the_score_threshold():
+    _, frame = load_frames()
+    assert detections(frame) == []
@@ -0,0 +1,44 @@
+import numpy as np
+
+from carla_kickstart.sensors.bev import BevRasterizer
+from carla_kickstart.sensors.obstacles import ObstacleClusterer
+
+def make_box(center, size, count, rng):
+    xyz = rng.uniform(-0.5, 0.5, (count, 3)) * size + center
+    return np.hstack([xyz, np.ones((count, 1))]).astype(np.float32)
+
+def make_sweep(rng):
+    # a car 8 m ahead, a pole 5 m to the right and a single stray point
+    return np.vstack([
+        make_box((8.0, 0.0, 0.0), (4.0, 1.8, 1.5), 400, rng),
+        make_box((2.0, 5.0, 0.5), (0.2, 0.2, 3.0), 50, rng),
+        make_box((-10.0, -10.0, 0.0), (0.0, 0.0, 0.0), 1, rng)])
+
+def test_rasterize_publishes_the_other_grids():
+    bev = BevRasterizer((320, 320), 15.0)
+    rng = np.random.default_rng(0)
+    first = bev.rasterize(make_sweep(rng))
+    assert bev.grids is first
+    assert first.occupancy.sum() == 451
+
+    # a reader holding the first grids is not affected by the next sweep
+    second = bev.rasterize(make_sweep(rng)[:400])
+    assert bev.grids is second and second is not first
+    assert first.occupancy.sum() == 451
+    assert second.occupancy.sum() == 400
+
+def test_clusters_are_sorted_by_range_and_noise_is_dropped():
+    bev = BevRasterizer((320, 320), 15.0)
+    clusterer = ObstacleClusterer(bev, cell_size=0.5, min_points=5)
+    points = make_sweep(np.random.default_rng(0))
+    grids = bev.rasterize(points)
+    # rasterizing another sweep does not change the clusters of the first one
+    bev.rasterize(points[:10])
+
+    obstacles = clusterer.cluster(points, grids)
+    assert [o.points for o in obstacles] == [50, 400]
+    pole, car = obstacles
+    assert abs(pole.centroid[1] - 5.0) < 0.2
+    assert abs(car.centroid[0] - 8.0) < 0.2
+    assert abs(car.extent[0] - 2.0) < 0.1
+    assert abs(car.range - 6.0) < 0.1